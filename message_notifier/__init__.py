@@ -0,0 +1 @@
+# Message Notifier plugin package for SwiftBar, run through plugins/message_notifier.1m.py
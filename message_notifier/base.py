@@ -0,0 +1,178 @@
+import logging
+import textwrap
+from abc import ABC, abstractmethod
+from importlib import import_module
+from pathlib import Path
+from subprocess import call, DEVNULL, STDOUT
+from typing import Dict, List, Type
+
+from message_notifier.config import ANSI_OFF, ANSI_YELLOW, BLANK_CHAR, unicode_regex_pattern
+from message_notifier.utils import convert_timestamp, encode_image, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • MENUBAR PLUGIN BASE CLASSES ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+# noinspection PyShadowingNames
+class Icons(object):
+
+    def __init__(self, directory: Path, unread_count: int = 0, standard_error: bool = False):
+
+        # check if macOS device is using a dark mode or light mode
+        if call("defaults read -g AppleInterfaceStyle", shell=True, stdout=DEVNULL, stderr=STDOUT) == 0:
+            macos_display_mode = "dark"
+        else:
+            macos_display_mode = "light"
+
+        self.all_read_icon = encode_image(
+            directory / "resources" / "images" / f"message_notifier_icon_{macos_display_mode}.png",
+            standard_error=standard_error
+        )
+        self.unread_icon = encode_image(
+            directory / "resources" / "images" / f"message_notifier_icon_{macos_display_mode}.png",
+            unread_count=unread_count,
+            standard_error=standard_error
+        )
+
+
+class BaseMessage(object):
+
+    def __init__(self, df_row, max_line_characters, menubar_msg_display_str):
+        self.id = df_row.id
+        self.cid = df_row.cid
+        self.title = df_row.title
+        self.timestamp = convert_timestamp(df_row.timestamp)
+        self.timestamp_str = format_timestamp(df_row.timestamp)
+        self.sender = df_row.sender
+        # required to remove unicode special characters
+        self.body = unicode_regex_pattern.sub("", df_row.body) if df_row.body else ""
+        self.body = self.body.replace("\n", " ").replace("\r", "").strip() if df_row.body else ""
+        self.body_short = f"{self.body[:max_line_characters]}..."
+        self.body_wrapped = textwrap.wrap(self.body, max_line_characters + 1, break_long_words=False)
+        self.attachment = 0
+        self.menubar_msg_display_str = menubar_msg_display_str
+        self.system = False
+
+    def get_message_len(self) -> int:
+        # return len(self.body.encode("ascii", "ignore"))
+        return len(self.body.replace(BLANK_CHAR, ""))
+
+    def __repr__(self):
+        return str(vars(self))
+
+    def __str__(self):
+        return str(vars(self))
+
+
+# noinspection DuplicatedCode
+class BaseConversation(object):
+
+    def __init__(self, message_obj: BaseMessage):
+        self.id = message_obj.cid
+        self.title = f"{ANSI_OFF}{message_obj.title}{ANSI_YELLOW}" if message_obj.title else ""
+        self.most_recent_timestamp = message_obj.timestamp
+        self.messages = [message_obj]
+        self.message_ids = [message_obj.id]
+        self.participants = {message_obj.sender}
+        self.is_group_conversation = False
+        self.menubar_msg_display_str = message_obj.menubar_msg_display_str
+
+    def add_message(self, message_obj: BaseMessage, sort_after_add: bool = True) -> None:
+        if message_obj.cid == self.id and message_obj.id not in self.message_ids:
+            self.most_recent_timestamp = (
+                message_obj.timestamp
+                if message_obj.timestamp > self.most_recent_timestamp
+                else self.most_recent_timestamp
+            )
+            self.messages.append(message_obj)
+            self.message_ids.append(message_obj.id)
+            self.participants.add(message_obj.sender)
+            if len(self.participants) > 1:
+                self.is_group_conversation = True
+                if not self.title:
+                    self.title = f"{ANSI_OFF}Group Message{ANSI_YELLOW}"
+
+            if sort_after_add:
+                self.sort_messages()
+        elif message_obj.id in self.message_ids:
+            logger.debug("Skipping addition of duplicate Message (matching preexisting ID) to Conversation.")
+        else:
+            raise ValueError("Cannot add Message with mismatching id to Conversation!")
+
+    def get_message_count(self) -> int:
+        return len(self.messages)
+
+    def get_participants_str(self) -> str:
+        if self.is_group_conversation:
+            return (
+                f"{', '.join(participant for participant in self.participants)}"
+                f"{', ...' if len(self.participants) == 1 else ''}"
+            )
+        else:
+            return "".join(participant for participant in self.participants)
+
+    def sort_messages(self, descending: bool = False) -> None:
+        self.messages.sort(key=lambda x: x.timestamp, reverse=descending)
+
+    def __repr__(self):
+        return str(vars(self))
+
+    def __str__(self):
+        return str(vars(self))
+
+
+# noinspection PyShadowingNames
+class BaseOutput(ABC):
+
+    message_type = None  # type: str
+    requires_network = False
+
+    @abstractmethod
+    def __init__(self, credentials: Dict, project_root_dir: Path):
+        self.credentials = credentials
+        self.project_root_dir = project_root_dir
+        self.unread_count = None
+        self.standard_error = []
+
+    @abstractmethod
+    def _get_messages(self) -> None:
+        pass
+
+    def get_unread_count(self) -> int:
+        return self.unread_count
+
+    def get_conversations(self) -> Dict:
+        return getattr(self, "conversations", {})
+
+    @abstractmethod
+    def get_console_output(self) -> List[str]:
+        pass
+
+
+# message type -> BaseOutput subclass, populated by register_message_output when each provider module is imported
+MESSAGE_OUTPUT_REGISTRY = {}  # type: Dict[str, Type[BaseOutput]]
+
+
+def register_message_output(message_type: str):
+
+    def decorator(output_class: Type[BaseOutput]) -> Type[BaseOutput]:
+        output_class.message_type = message_type
+        MESSAGE_OUTPUT_REGISTRY[message_type] = output_class
+        return output_class
+
+    return decorator
+
+
+def get_message_output(message_type: str) -> Type[BaseOutput]:
+    if message_type not in MESSAGE_OUTPUT_REGISTRY:
+        # provider modules are named after their message type and register themselves when imported
+        try:
+            import_module(f"message_notifier.{message_type}")
+        except ModuleNotFoundError:
+            raise ValueError(f"Unsupported message type: {message_type}")
+
+    return MESSAGE_OUTPUT_REGISTRY[message_type]
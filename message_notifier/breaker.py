@@ -0,0 +1,78 @@
+import logging
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from message_notifier.config import (
+    CIRCUIT_BREAKER_BASE_BACKOFF_SECONDS, CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_MAX_BACKOFF_SECONDS,
+    CONNECTIVITY_CHECK_ADDRESS, CONNECTIVITY_CHECK_TIMEOUT_SECONDS
+)
+from message_notifier.state import get_data_dir, load_json_state, update_json_state
+
+logger = logging.getLogger(__name__)
+
+# guards circuit_breaker_state.json between provider threads (the file lock only guards it between processes)
+CIRCUIT_BREAKER_LOCK = threading.Lock()
+
+
+def is_online(address=CONNECTIVITY_CHECK_ADDRESS, timeout: float = CONNECTIVITY_CHECK_TIMEOUT_SECONDS) -> bool:
+    # connecting to an IP address avoids a DNS lookup, which can stall for a long time without a network connection
+    try:
+        with socket.create_connection(address, timeout=timeout):
+            return True
+    except OSError as e:
+        logger.debug(f"Connectivity check to {address[0]}:{address[1]} failed with error {repr(e)}")
+        return False
+
+
+class CircuitBreaker(object):
+    """Pauses a message type after repeated failures with exponential backoff, persisted across plugin runs."""
+
+    def __init__(self, project_root: Path):
+        self.state_path = get_data_dir(project_root) / "circuit_breaker_state.json"
+
+    def get_open_reason(self, message_type: str, now: float = None) -> Optional[str]:
+        # returns why the message type is currently paused, or None if it can be retrieved
+        with CIRCUIT_BREAKER_LOCK:
+            message_type_state = load_json_state(self.state_path).get(message_type, {})
+
+        retry_in = message_type_state.get("open_until", 0) - (now or time.time())
+        if retry_in <= 0:
+            return None
+
+        return (
+            f"paused after {message_type_state.get('failures')} failures "
+            f"(retrying in {int(retry_in // 60) + 1}m): {message_type_state.get('last_error')}"
+        )
+
+    def record_success(self, message_type: str) -> None:
+        def reset(state: Dict) -> Dict:
+            state.pop(message_type, None)
+            return state
+
+        with CIRCUIT_BREAKER_LOCK:
+            if message_type in load_json_state(self.state_path):
+                update_json_state(self.state_path, reset)
+
+    def record_failure(self, message_type: str, error: str, now: float = None) -> None:
+        def add_failure(state: Dict) -> Dict:
+            message_type_state = state.get(message_type, {})
+
+            failures = message_type_state.get("failures", 0) + 1
+            message_type_state["failures"] = failures
+            message_type_state["last_error"] = error
+            if failures >= CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+                backoff = min(
+                    CIRCUIT_BREAKER_BASE_BACKOFF_SECONDS * (2 ** (failures - CIRCUIT_BREAKER_FAILURE_THRESHOLD)),
+                    CIRCUIT_BREAKER_MAX_BACKOFF_SECONDS
+                )
+                message_type_state["open_until"] = (now or time.time()) + backoff
+                logger.warning(f"Pausing {message_type} messages for {backoff}s after {failures} failures.")
+
+            state[message_type] = message_type_state
+            return state
+
+        with CIRCUIT_BREAKER_LOCK:
+            update_json_state(self.state_path, add_failure)
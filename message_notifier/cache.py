@@ -0,0 +1,115 @@
+import logging
+import pickle
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from message_notifier.base import BaseOutput
+from message_notifier.config import ANSI_OFF, ANSI_RED, CSS_GRAY, FONT_ITALIC, FONT_SIZE_FOR_TIMESTAMP
+from message_notifier.state import atomic_write, get_data_dir
+
+logger = logging.getLogger(__name__)
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    elif seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    elif seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    else:
+        return f"{int(seconds // 86400)}d"
+
+
+class ProviderResult(object):
+    """Conversations, unread count and rendered menu section retrieved by one message type provider."""
+
+    def __init__(self, message_type: str, console_output: List[str], unread_count: int, standard_error: bool,
+                 conversations: Dict = None, fetched_at: float = None, wall_time: float = 0.0, error: str = None):
+        self.message_type = message_type
+        self.console_output = console_output
+        self.unread_count = unread_count or 0
+        self.standard_error = standard_error
+        self.conversations = conversations
+        self.fetched_at = fetched_at or time.time()
+        self.wall_time = wall_time
+        self.error = error
+
+    @classmethod
+    def from_output(cls, message_output: BaseOutput, console_output: List[str],
+                    wall_time: float = 0.0) -> "ProviderResult":
+        return cls(
+            message_output.message_type,
+            console_output,
+            message_output.get_unread_count(),
+            bool(message_output.standard_error),
+            conversations=message_output.get_conversations(),
+            wall_time=wall_time
+        )
+
+    @classmethod
+    def from_error(cls, message_type: str, error: str, wall_time: float = 0.0) -> "ProviderResult":
+        # compact error section displayed in place of the section of a message type that could not be retrieved
+        console_output = [
+            "---",
+            f"❗ {message_type.capitalize()} messages unavailable",
+            f"--{ANSI_RED}{error}{ANSI_OFF} | ansi=true "
+        ]
+        return cls(message_type, console_output, 0, True, wall_time=wall_time, error=error)
+
+    def get_age(self, now: float = None) -> float:
+        return max((now or time.time()) - self.fetched_at, 0)
+
+    def get_console_output(self, now: float = None, show_age: bool = False) -> List[str]:
+        if not show_age:
+            return self.console_output
+
+        return self.console_output + [
+            f"{self.message_type.capitalize()} messages updated {format_age(self.get_age(now))} ago "
+            f"| font={FONT_ITALIC} color={CSS_GRAY} size={FONT_SIZE_FOR_TIMESTAMP}"
+        ]
+
+    def __repr__(self):
+        return str(vars(self))
+
+    def __str__(self):
+        return str(vars(self))
+
+
+class ProviderResultCache(object):
+    """On-disk copy of the last successful ProviderResult of each message type in resources/data/cache."""
+
+    def __init__(self, project_root: Path):
+        self.cache_dir = get_data_dir(project_root) / "cache"
+        if not self.cache_dir.is_dir():
+            self.cache_dir.mkdir(parents=True)
+
+    def _get_cache_path(self, message_type: str) -> Path:
+        return self.cache_dir / f"{message_type}_result.pickle"
+
+    def load(self, message_type: str) -> Optional[ProviderResult]:
+        try:
+            with open(self._get_cache_path(message_type), "rb") as cache_file:
+                return pickle.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning(f"Discarding unreadable cached {message_type} result with error {repr(e)}")
+            return None
+
+    def save(self, provider_result: ProviderResult) -> None:
+        if provider_result.error:
+            # keep the last successful result instead of replacing it with an error
+            return
+
+        try:
+            provider_result_bytes = pickle.dumps(provider_result)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # some provider conversations reference live API objects, so fall back to caching the rendered section only
+            logger.debug(f"Unable to cache {provider_result.message_type} conversations with error {repr(e)}")
+            provider_result.conversations = None
+            provider_result_bytes = pickle.dumps(provider_result)
+
+        with atomic_write(self._get_cache_path(provider_result.message_type), "wb") as cache_file:
+            cache_file.write(provider_result_bytes)
@@ -0,0 +1,31 @@
+import socket
+from pathlib import Path
+from typing import Optional
+
+from message_notifier.config import WARM_SERVER_SOCKET_PATH, WARM_SERVER_TIMEOUT_SECONDS
+
+WARM_SERVER_REQUEST = b"render\n"
+
+
+def request_menu_from_warm_server(socket_path: Path = WARM_SERVER_SOCKET_PATH,
+                                  timeout: float = WARM_SERVER_TIMEOUT_SECONDS) -> Optional[str]:
+    # the warm server replies with the byte length of the rendered menu on the first line followed by the menu itself,
+    # so an incomplete response (e.g. from a crashed worker) can be detected and discarded
+    if not socket_path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_path))
+            client.sendall(WARM_SERVER_REQUEST)
+            with client.makefile("rb") as response:
+                header = response.readline().strip()
+                payload = response.read()
+    except OSError:
+        return None
+
+    if not header.isdigit() or len(payload) != int(header):
+        return None
+
+    return payload.decode("utf-8")
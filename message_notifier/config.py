@@ -0,0 +1,175 @@
+import logging
+import os
+from pathlib import Path
+from re import compile, UNICODE
+
+# suppress dependency library logs ror running
+logging.getLogger("telethon.network.mtprotosender").setLevel(logging.ERROR)
+
+# suppress dependency library logs ror debugging
+logging.getLogger("telethon.extensions.messagepacker").setLevel(logging.WARN)
+logging.getLogger("PIL.PngImagePlugin").setLevel(logging.WARN)
+logging.getLogger("PIL.TiffImagePlugin").setLevel(logging.WARN)
+logging.getLogger("prawcore").setLevel(logging.WARN)
+logging.getLogger("urllib3.connectionpool").setLevel(logging.WARN)
+logging.getLogger("asyncio").setLevel(logging.WARN)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ START SET CUSTOM LOCAL VARIABLES ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+MAX_LINE_CHARS = 50
+MAX_GROUP_CHAT_SEARCH_RESULTS = 10  # The higher this number, the longer the app will take to run each time.
+MAX_GROUP_CHAT_PARTICIPANT_DISPLAY = 5
+
+THUMBNAIL_PIXEL_SIZE = 500
+# largest attachment preview passed to SwiftBar, in base64 characters (larger previews make the menu slower to open)
+THUMBNAIL_MAX_BASE64_LENGTH = 10000
+# video previews show the frame at this fraction of the video instead of the first frame, which is often black (set to 0
+# to show the first frame)
+VIDEO_THUMBNAIL_SEEK_FRACTION = 0.1
+
+# uses macOS system font: https://developer.apple.com/fonts/
+FONT_FOR_TEXT_PATH = Path("/Library/Fonts/SF-Compact.ttf")
+FONT_FOR_TITLE = "Menlo"
+FONT_ITALIC = "HelveticaNeue-Italic"
+FONT_SIZE_FOR_TITLE = 10
+FONT_SIZE_FOR_TIMESTAMP = 8
+
+LOG_LEVEL = logging.WARN  # Logging levels: logging.DEBUG, logging.INFO, logging.WARN, logging.ERROR
+# LOG_LEVEL = logging.DEBUG
+
+PERSISTENT_DATA_COLUMNS = ["id", "type", "timestamp", "username", "sender"]
+
+SUPPORTED_MESSAGE_TYPES = ["text", "reddit", "telegram"]
+# SUPPORTED_MESSAGE_TYPES = ["text"]
+# SUPPORTED_MESSAGE_TYPES = ["reddit"]
+# SUPPORTED_MESSAGE_TYPES = ["telegram"]
+
+# retrieve messages for all supported message types in parallel (set to False to retrieve them one after another)
+CONCURRENT_EXECUTION = True
+
+# display which deferred third-party modules were actually imported during each run at the bottom of the menu
+SHOW_LOADED_MODULES = False
+
+# optional resident warm server (started with "python3 -m message_notifier.server") that has already imported the plugin
+# and forks a worker for each SwiftBar refresh; the plugin falls back to running in-process if the server is not running
+WARM_SERVER_SOCKET_PATH = Path("/tmp") / f"message_notifier_{os.getuid()}.sock"  # macOS socket paths max 104 chars
+WARM_SERVER_TIMEOUT_SECONDS = 55  # must stay below the refresh interval in the plugin filename (1m)
+WARM_SERVER_REQUEST_TIMEOUT_SECONDS = 1  # connections that do not send a complete request in time are closed
+WARM_SERVER_PRELOAD_MODULES = ["numpy", "pandas"]  # deferred modules imported up front so forked workers inherit them
+
+# seconds between background polls of each message type in the long-running streamable mode (see README)
+STREAM_POLL_INTERVALS = {"text": 5, "reddit": 60, "telegram": 30}
+STREAM_DEFAULT_POLL_INTERVAL = 60
+
+# minimum seconds between refreshes of each message type when run on the SwiftBar timer; message types that are not
+# due yet reuse their last rendered menu section (can be overridden with a "refresh_intervals" object in private.json)
+REFRESH_INTERVALS = {"text": 60, "reddit": 300, "telegram": 300}
+REFRESH_INTERVAL_GRACE_SECONDS = 5  # tolerance for the SwiftBar timer firing slightly early
+
+# render message types that are due for a refresh from their last cached result (marked with its age) right away, and
+# fetch the fresh result in a background process instead of making the menu wait for the slowest service; only the
+# network services are worth the extra process, iMessage/SMS are read locally and fetched right away
+STALE_WHILE_REVALIDATE = True
+STALE_WHILE_REVALIDATE_TYPES = {"reddit", "telegram"}
+STALE_RESULT_MAX_AGE_SECONDS = 3600  # cached results older than this are fetched before rendering instead
+
+# seconds each message type may take before its menu section is replaced by a timeout error
+PROVIDER_TIMEOUT_SECONDS = {"text": 20, "reddit": 30, "telegram": 30}
+PROVIDER_DEFAULT_TIMEOUT_SECONDS = 30
+PROVIDER_CONNECTION_RETRIES = 1  # retries of a failed connection attempt by the Reddit/Telegram clients
+
+# cheap TCP connection attempt used to skip message types that need the network right away when the device is offline
+CONNECTIVITY_CHECK_ADDRESS = ("1.1.1.1", 53)
+CONNECTIVITY_CHECK_TIMEOUT_SECONDS = 1.5
+
+# after this many consecutive failures a message type is paused, starting with the base backoff and doubling for each
+# further failure up to the max backoff (breaker state is stored in resources/data/circuit_breaker_state.json)
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3
+CIRCUIT_BREAKER_BASE_BACKOFF_SECONDS = 120
+CIRCUIT_BREAKER_MAX_BACKOFF_SECONDS = 3600
+
+# seconds an overlapping plugin run waits for a refresh that is already in progress to reuse its menu instead of
+# starting another one (e.g. when clicking "Refresh" while a slow refresh is still running)
+SINGLE_FLIGHT_WAIT_SECONDS = 50
+
+# stretch refresh intervals and postpone media previews while running on battery or while the user is away
+POWER_THROTTLING = True
+# optional JSON file (e.g. {"on_battery": true, "idle_seconds": 600}) read instead of querying macOS for the power state
+POWER_STATE_FILE_PATH = None
+POWER_STATE_CACHE_SECONDS = 30
+IDLE_THRESHOLD_SECONDS = 300
+BATTERY_INTERVAL_MULTIPLIER = 2
+IDLE_INTERVAL_MULTIPLIER = 5
+MAX_THROTTLED_INTERVAL_SECONDS = 1800
+DEFER_MEDIA_PREVIEWS_WHEN_THROTTLED = True
+# seconds between the catch-up refreshes of each message type once the user is back, so they do not all run at once
+CATCH_UP_STAGGER_SECONDS = 60
+
+# reuse the last iMessage/SMS conversations and menu section while chat.db is unchanged, but re-query it at least this
+# often so that the relative message timestamps ("5 minutes ago") do not drift too far
+TEXT_CHANGE_DETECTION = True
+TEXT_SNAPSHOT_MAX_AGE_SECONDS = 600
+
+# only fetch iMessage/SMS messages newer than the last one seen and re-check the read state of the cached unread ones,
+# with a full query of all unread messages at least this often as a consistency check
+TEXT_INCREMENTAL_FETCH = True
+TEXT_FULL_QUERY_INTERVAL_SECONDS = 900
+
+# display the number of rows and time taken by each database query at the bottom of the menu
+SHOW_QUERY_STATS = False
+# seconds to wait for Messages.app to release a lock on chat.db before a query fails
+SQLITE_BUSY_TIMEOUT_SECONDS = 2
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+SQLITE_CACHED_STATEMENTS = 32
+
+# keep a full-text search index of the last TEXT_SEARCH_HISTORY_DAYS of iMessage/SMS messages (in
+# resources/data/cache/text_search.db), updated with at most TEXT_SEARCH_BATCH_SIZE new messages per refresh, and add a
+# "Search" action to the iMessage/SMS menu section
+TEXT_SEARCH_INDEX = True
+TEXT_SEARCH_HISTORY_DAYS = 365
+TEXT_SEARCH_BATCH_SIZE = 5000
+TEXT_SEARCH_RESULT_LIMIT = 20
+
+# keep the thumbnails of iMessage/SMS attachments (in resources/data/cache/thumbnails.db) so that unread photos, videos
+# and PDFs are only decoded once, evicting the least recently shown ones beyond THUMBNAIL_CACHE_MAX_BYTES
+THUMBNAIL_CACHE = True
+THUMBNAIL_CACHE_MAX_BYTES = 20 * 1024 * 1024
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ END SET CUSTOM LOCAL VARIABLES ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+logging.basicConfig(level=LOG_LEVEL)
+
+# regex to remove unicode special characters: https://en.wikipedia.org/wiki/Specials_(Unicode_block)
+unicode_regex_pattern = compile(u"[\uFFF0-\uFFFF]", UNICODE)
+
+# Unicode character "⠀" (U+2800) for blank lines
+BLANK_CHAR = "⠀"
+
+# reference: https://chrisyeh96.github.io/2020/03/28/terminal-colors.html
+ANSI_BLACK = "\u001b[30m"
+ANSI_RED = "\u001b[31m"
+ANSI_GREEN = "\u001b[32m"
+ANSI_YELLOW = "\u001b[33m"
+ANSI_BLUE = "\u001b[34m"
+ANSI_MAGENTA = "\u001b[35m"
+ANSI_CYAN = "\u001b[36m"
+ANSI_WHITE = "\u001b[37m"
+
+ANSI_BLACK_BG = "\u001b[40m"
+ANSI_RED_BG = "\u001b[41m"
+ANSI_GREEN_BG = "\u001b[42m"
+ANSI_YELLOW_BG = "\u001b[43m"
+ANSI_BLUE_BG = "\u001b[44m"
+ANSI_MAGENTA_BG = "\u001b[45m"
+ANSI_CYAN_BG = "\u001b[46m"
+ANSI_WHITE_BG = "\u001b[47m"
+
+ANSI_OFF = "\u001b[0m"
+
+HEX_ORANGE = "#e05415"
+HEX_BLUE = "#7FC3D8"
+
+CSS_TEAL = "teal"
+CSS_GRAY = "gray"
@@ -0,0 +1,136 @@
+import logging
+import pickle
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from message_notifier.database import ReadOnlyDatabase
+from message_notifier.state import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# contact lookups already loaded by this process, keyed by the path of their on-disk cache
+CONTACT_LOOKUPS = {}  # type: Dict[Path, ContactLookup]
+CONTACT_LOOKUPS_LOCK = threading.Lock()
+
+
+def normalize_contact(contact: Optional[str]) -> Optional[str]:
+    # email addresses are matched case-insensitively and phone numbers by their last 10 digits, which ignores
+    # formatting and country codes the same way the original AddressBook joins did
+    if not contact:
+        return None
+    if "@" in contact:
+        return contact.strip().lower()
+    return re.sub(r"\D", "", contact)[-10:] or None
+
+
+def format_contact_name(first_name: Optional[str], middle_name: Optional[str],
+                        last_name: Optional[str]) -> Optional[str]:
+    if last_name is None:
+        return first_name
+    if first_name is None:
+        return None
+    return f"{first_name} {middle_name or ''} {last_name}".replace("  ", " ")
+
+
+class ContactLookup(object):
+    """Maps normalized phone numbers and email addresses from every AddressBook source to a sender name/organization.
+
+    The lookup is stored in resources/data/cache/contacts.pickle and only rebuilt when one of the AddressBook databases
+    changes, so that senders are resolved with one dict lookup each instead of joining the AddressBook in every query.
+    """
+
+    def __init__(self, contact_db_paths: List[Path], cache_path: Path):
+        self.contact_db_paths = contact_db_paths
+        self.cache_path = cache_path
+        self.fingerprint = self._get_fingerprint()
+        self.contacts = {}  # type: Dict[str, Tuple[Optional[str], Optional[str], Optional[str]]]
+
+    def _get_fingerprint(self) -> List:
+        fingerprint = []
+        for contact_db_path in self.contact_db_paths:
+            for db_file_path in [contact_db_path, contact_db_path.with_name(f"{contact_db_path.name}-wal")]:
+                try:
+                    db_file_stat = db_file_path.stat()
+                    fingerprint.append((str(db_file_path), db_file_stat.st_size, db_file_stat.st_mtime_ns))
+                except FileNotFoundError:
+                    pass
+        return fingerprint
+
+    # noinspection SqlResolve
+    @staticmethod
+    def _read_contact_db(contact_db_path: Path) -> List[Tuple[str, str, str, str, str]]:
+        with ReadOnlyDatabase(contact_db_path) as contact_db:
+            return contact_db.execute("contacts", """
+                SELECT pnmbr.ZFULLNUMBER, rcrd.ZFIRSTNAME, rcrd.ZMIDDLENAME, rcrd.ZLASTNAME, rcrd.ZORGANIZATION
+                FROM ZABCDPHONENUMBER pnmbr
+                INNER JOIN ZABCDRECORD rcrd
+                    ON rcrd.Z_PK = pnmbr.ZOWNER
+                UNION ALL
+                SELECT eml.ZADDRESSNORMALIZED, rcrd.ZFIRSTNAME, rcrd.ZMIDDLENAME, rcrd.ZLASTNAME, rcrd.ZORGANIZATION
+                FROM ZABCDEMAILADDRESS eml
+                INNER JOIN ZABCDRECORD rcrd
+                    ON rcrd.Z_PK = eml.ZOWNER
+            """)
+
+    def _build(self) -> None:
+        contacts = {}
+        for contact_db_path in self.contact_db_paths:
+            try:
+                contact_rows = self._read_contact_db(contact_db_path)
+            except sqlite3.Error as e:
+                logger.warning(f"Unable to read contacts from {contact_db_path} with error {repr(e)}")
+                continue
+
+            for address, first_name, middle_name, last_name, organization in contact_rows:
+                contact_key = normalize_contact(address)
+                if not contact_key:
+                    continue
+
+                sender = format_contact_name(first_name, middle_name, last_name)
+                # keep the first entry with a name when the same number/address belongs to several contact cards
+                if contact_key not in contacts or not (contacts[contact_key][1] or contacts[contact_key][2]):
+                    number = contact_key if "@" not in contact_key else None
+                    contacts[contact_key] = (number, sender, organization)
+
+        self.contacts = contacts
+        logger.debug(f"Built contact lookup with {len(contacts)} entries from {len(self.contact_db_paths)} sources.")
+
+    def load(self) -> "ContactLookup":
+        try:
+            with open(self.cache_path, "rb") as cache_file:
+                cached_lookup = pickle.load(cache_file)
+            if cached_lookup.get("fingerprint") == self.fingerprint:
+                self.contacts = cached_lookup["contacts"]
+                return self
+        except FileNotFoundError:
+            pass
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.debug(f"Discarding unreadable contact lookup with error {repr(e)}")
+
+        self._build()
+        if not self.cache_path.parent.is_dir():
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.cache_path, "wb") as cache_file:
+            pickle.dump({"fingerprint": self.fingerprint, "contacts": self.contacts}, cache_file)
+        return self
+
+    def is_stale(self) -> bool:
+        return self.fingerprint != self._get_fingerprint()
+
+    def get(self, contact: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        # returns the (number, sender, organization) of a message handle, or Nones when it is not a known contact
+        return self.contacts.get(normalize_contact(contact), (None, None, None))
+
+
+def get_contact_lookup(contact_db_paths: List[Path], cache_path: Path) -> ContactLookup:
+    with CONTACT_LOOKUPS_LOCK:
+        contact_lookup = CONTACT_LOOKUPS.get(cache_path)
+        if (contact_lookup is None
+                or contact_lookup.contact_db_paths != contact_db_paths
+                or contact_lookup.is_stale()):
+            contact_lookup = ContactLookup(contact_db_paths, cache_path).load()
+            CONTACT_LOOKUPS[cache_path] = contact_lookup
+        return contact_lookup
@@ -0,0 +1,89 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Sequence
+
+from message_notifier.config import SQLITE_BUSY_TIMEOUT_SECONDS, SQLITE_CACHED_STATEMENTS, SQLITE_MMAP_SIZE
+
+logger = logging.getLogger(__name__)
+
+# query name -> execution count, total seconds and total rows of every query run by this process since the last
+# reset_query_stats()
+QUERY_STATS = OrderedDict()  # type: OrderedDict[str, QueryStats]
+QUERY_STATS_LOCK = threading.Lock()
+
+
+class QueryStats(object):
+
+    def __init__(self, query_name: str):
+        self.query_name = query_name
+        self.executions = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+    def record(self, seconds: float, rows: int) -> None:
+        self.executions += 1
+        self.seconds += seconds
+        self.rows += rows
+
+    def __str__(self):
+        return f"{self.query_name}: {self.executions}x, {self.rows} rows, {self.seconds * 1000:.1f}ms"
+
+
+def get_query_stats() -> List[QueryStats]:
+    with QUERY_STATS_LOCK:
+        return list(QUERY_STATS.values())
+
+
+def reset_query_stats() -> None:
+    with QUERY_STATS_LOCK:
+        QUERY_STATS.clear()
+
+
+class ReadOnlyDatabase(object):
+    """Read-only SQLite connection to a database owned by another application (e.g. the Messages chat.db).
+
+    The database is opened with mode=ro and query_only so it can never be written to, waits up to
+    SQLITE_BUSY_TIMEOUT_SECONDS while the owning application holds a lock instead of failing right away, and records the
+    execution time and row count of every query in QUERY_STATS.
+    """
+
+    def __init__(self, db_path: Path, check_same_thread: bool = True):
+        # file: URIs need an absolute path
+        self.db_path = Path(db_path).expanduser().resolve()
+        # sqlite3 caches the prepared statement of each distinct SQL string, so queries are reused by passing the same
+        # SQL string (with parameters) every time
+        self.connection = sqlite3.connect(
+            f"{self.db_path.as_uri()}?mode=ro",
+            uri=True,
+            timeout=SQLITE_BUSY_TIMEOUT_SECONDS,
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+            check_same_thread=check_same_thread
+        )
+        self.connection.execute("PRAGMA query_only = ON")
+        self.connection.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+
+    def execute(self, query_name: str, query: str, parameters: Sequence[Any] = ()) -> List[tuple]:
+        start = time.perf_counter()
+        rows = self.connection.execute(query, parameters).fetchall()
+        seconds = time.perf_counter() - start
+
+        with QUERY_STATS_LOCK:
+            if query_name not in QUERY_STATS:
+                QUERY_STATS[query_name] = QueryStats(query_name)
+            QUERY_STATS[query_name].record(seconds, len(rows))
+        logger.debug(f"Query {query_name} returned {len(rows)} rows in {seconds * 1000:.1f}ms.")
+        return rows
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ReadOnlyDatabase":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from importlib import import_module
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# module name -> seconds spent importing it, in the order the deferred modules were first used during this run
+LAZY_MODULES_LOADED = OrderedDict()  # type: OrderedDict[str, float]
+LAZY_MODULES_LOCK = threading.Lock()
+
+
+class LazyModule(object):
+    """Proxy for a heavy third-party module that is only imported the first time one of its attributes is used."""
+
+    def __init__(self, module_name: str):
+        self.__dict__["_module_name"] = module_name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with LAZY_MODULES_LOCK:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module_name = self.__dict__["_module_name"]
+                    start = time.perf_counter()
+                    module = import_module(module_name)
+                    if module_name not in LAZY_MODULES_LOADED:
+                        LAZY_MODULES_LOADED[module_name] = time.perf_counter() - start
+                    logger.debug(f"Loaded deferred module {module_name} in {LAZY_MODULES_LOADED[module_name]:.3f}s")
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __setattr__(self, key, value):
+        setattr(self._load(), key, value)
+
+    def __repr__(self):
+        return f"<LazyModule {self.__dict__['_module_name']} (loaded={self.__dict__['_module'] is not None})>"
+
+
+def get_loaded_lazy_modules() -> List[str]:
+    with LAZY_MODULES_LOCK:
+        return [f"{module_name} ({load_time:.3f}s)" for module_name, load_time in LAZY_MODULES_LOADED.items()]
+
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+cv2 = LazyModule("cv2")
+pdf2image = LazyModule("pdf2image")
+pyheif = LazyModule("pyheif")
+pymediainfo = LazyModule("pymediainfo")
+# pync raises on import outside of macOS, so importing it lazily keeps the providers importable elsewhere (e.g. to run
+# resources/scripts/benchmark_text_output.py on Linux)
+pync = LazyModule("pync")
+praw = LazyModule("praw")
+prawcore_exceptions = LazyModule("prawcore.exceptions")
+# telethon.sync must be imported to patch the TelegramClient methods to be synchronous
+telethon_sync = LazyModule("telethon.sync")
+telethon_sessions = LazyModule("telethon.sessions")
+telethon_types = LazyModule("telethon.tl.types")
+telethon_utils = LazyModule("telethon.utils")
+vobject = LazyModule("vobject")
+
+
+def preload_lazy_modules(module_names: List[str]) -> None:
+    for lazy_module in list(globals().values()):
+        if isinstance(lazy_module, LazyModule) and lazy_module.__dict__["_module_name"] in module_names:
+            # noinspection PyProtectedMember
+            lazy_module._load()
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from pathlib import Path
+from subprocess import DEVNULL, Popen
+from typing import Dict, List
+
+from message_notifier.base import BaseOutput, Icons, get_message_output
+from message_notifier.breaker import CircuitBreaker, is_online
+from message_notifier.cache import ProviderResult, ProviderResultCache
+from message_notifier.config import (
+    CONCURRENT_EXECUTION, CSS_GRAY, FONT_ITALIC, HEX_BLUE, HEX_ORANGE, PROVIDER_DEFAULT_TIMEOUT_SECONDS,
+    PROVIDER_TIMEOUT_SECONDS, SHOW_LOADED_MODULES, SHOW_QUERY_STATS, STALE_RESULT_MAX_AGE_SECONDS,
+    STALE_WHILE_REVALIDATE, STALE_WHILE_REVALIDATE_TYPES, SUPPORTED_MESSAGE_TYPES
+)
+from message_notifier.database import get_query_stats, reset_query_stats
+from message_notifier.lazy import get_loaded_lazy_modules
+from message_notifier.power import PowerThrottle
+from message_notifier.scheduler import ProviderScheduler, get_refresh_intervals
+from message_notifier.singleflight import single_flight
+from message_notifier.thumbnails import THUMBNAIL_CACHE_STATS, reset_thumbnail_cache_stats
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ MENUBAR PLUGIN MAIN • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+def load_credentials(project_root: Path) -> Dict:
+    with open(project_root / "resources" / "credentials" / "private.json", "r") as credentials_json:
+        return json.load(credentials_json)
+
+
+def run_message_account_output(message_account_type: str, credentials: Dict, project_root: Path) -> ProviderResult:
+    # telethon.sync requires an event loop in the current thread, which worker threads do not have by default
+    try:
+        asyncio.get_event_loop()
+    except RuntimeError:
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+    start = time.perf_counter()
+
+    MessageOutput = get_message_output(message_account_type)
+    message_account_output = MessageOutput(credentials.get(message_account_type), project_root)  # type: BaseOutput
+    console_output = message_account_output.get_console_output()
+
+    return ProviderResult.from_output(message_account_output, console_output, time.perf_counter() - start)
+
+
+def get_message_account_timeout(message_account_type: str) -> float:
+    return PROVIDER_TIMEOUT_SECONDS.get(message_account_type, PROVIDER_DEFAULT_TIMEOUT_SECONDS)
+
+
+def get_message_account_results(project_root: Path, credentials: Dict,
+                                message_account_types: List[str]) -> List[ProviderResult]:
+
+    if not message_account_types:
+        return []
+
+    start = time.perf_counter()
+    circuit_breaker = CircuitBreaker(project_root)
+    # thumbnails/previews of attachments are skipped while running on battery or while the user is away
+    PowerThrottle(project_root).apply_media_preview_policy()
+    online = None
+
+    # message types that are paused by their circuit breaker or need the network while offline are skipped right away
+    skipped_message_account_results = {}  # type: Dict[str, ProviderResult]
+    for message_account_type in message_account_types:
+        open_reason = circuit_breaker.get_open_reason(message_account_type)
+        if open_reason:
+            skipped_message_account_results[message_account_type] = ProviderResult.from_error(
+                message_account_type, open_reason
+            )
+        elif get_message_output(message_account_type).requires_network:
+            if online is None:
+                online = is_online()
+            if not online:
+                skipped_message_account_results[message_account_type] = ProviderResult.from_error(
+                    message_account_type, "offline"
+                )
+
+    # provider threads that exceed their deadline cannot be killed, so the executor is never waited on
+    executor = ThreadPoolExecutor(max_workers=len(message_account_types) if CONCURRENT_EXECUTION else 1)
+    message_account_futures = OrderedDict(
+        (message_account_type, executor.submit(
+            run_message_account_output, message_account_type, credentials, project_root
+        ))
+        for message_account_type in message_account_types
+        if message_account_type not in skipped_message_account_results
+    )
+    executor.shutdown(wait=False)
+
+    # results are collected in the order of message_account_types regardless of completion order
+    message_account_results = []
+    deadline = start
+    for message_account_type in message_account_types:
+        if message_account_type in skipped_message_account_results:
+            message_account_results.append(skipped_message_account_results[message_account_type])
+            continue
+
+        timeout = get_message_account_timeout(message_account_type)
+        # without concurrent execution each message type only starts once the previous one finished
+        deadline = (deadline if not CONCURRENT_EXECUTION else start) + timeout
+        try:
+            message_account_result = message_account_futures[message_account_type].result(
+                timeout=max(deadline - time.perf_counter(), 0)
+            )
+        except TimeoutError:
+            message_account_result = ProviderResult.from_error(
+                message_account_type, f"timed out after {timeout}s", time.perf_counter() - start
+            )
+        except Exception as e:
+            logger.error(f"Unable to retrieve {message_account_type} messages with error {repr(e)}")
+            message_account_result = ProviderResult.from_error(
+                message_account_type, repr(e), time.perf_counter() - start
+            )
+
+        if message_account_result.error or message_account_result.standard_error:
+            circuit_breaker.record_failure(
+                message_account_type, message_account_result.error or "retrieval returned errors"
+            )
+        else:
+            circuit_breaker.record_success(message_account_type)
+
+        message_account_results.append(message_account_result)
+        logger.debug(
+            f"Message Notifier {message_account_type} wall time: {message_account_result.wall_time:.3f}s"
+        )
+
+    return message_account_results
+
+
+def exit_without_waiting_for_timed_out_threads() -> None:
+    # provider threads that exceeded their deadline would otherwise keep the plugin process alive at interpreter exit
+    if any(thread.is_alive() and not thread.daemon for thread in threading.enumerate()
+           if thread is not threading.main_thread()):
+        sys.stdout.flush()
+        logging.shutdown()
+        os._exit(0)
+
+
+def generate_menu_footer(cumulative_stats: bool = False) -> List[str]:
+
+    # the query and thumbnail cache stats cover the current menu pass, or everything since the process started with
+    # cumulative_stats (stream mode, whose message types are polled independently of each rendered menu)
+    stats_scope = " since start" if cumulative_stats else ""
+    standard_output = []
+    standard_output.append("---")
+    standard_output.append(F"Refresh | font={FONT_ITALIC} color={HEX_BLUE} refresh=true")
+    standard_output.append("---")
+
+    loaded_modules = get_loaded_lazy_modules()
+    logger.debug(f"Message Notifier deferred modules loaded: {', '.join(loaded_modules) or 'none'}")
+    if SHOW_LOADED_MODULES:
+        standard_output.append(f"Loaded modules: {len(loaded_modules)} | font={FONT_ITALIC} color={CSS_GRAY}")
+        for loaded_module in loaded_modules:
+            standard_output.append(f"--{loaded_module} | font={FONT_ITALIC} color={CSS_GRAY}")
+        standard_output.append("---")
+
+    query_stats = get_query_stats()
+    for stats in query_stats:
+        logger.debug(f"Message Notifier query{stats_scope} {stats}")
+    logger.debug(f"Message Notifier thumbnail cache{stats_scope}: {THUMBNAIL_CACHE_STATS}")
+    if SHOW_QUERY_STATS and query_stats:
+        standard_output.append(
+            f"Database queries{stats_scope}: {len(query_stats)} | font={FONT_ITALIC} color={CSS_GRAY}"
+        )
+        for stats in query_stats:
+            standard_output.append(f"--{stats} | font={FONT_ITALIC} color={CSS_GRAY}")
+        standard_output.append("---")
+
+    return standard_output
+
+
+def generate_menubar_icon(project_root: Path, unread_count: int, standard_error: bool) -> str:
+
+    if unread_count > 0:
+        unread_icon = Icons(project_root, unread_count, standard_error).unread_icon
+        return f"| color={HEX_ORANGE} image={unread_icon}"
+    else:
+        all_read_icon = Icons(project_root, standard_error=standard_error).all_read_icon
+        return f"| image={all_read_icon} dropdown=false"
+
+
+def generate_menu(project_root: Path, credentials: Dict) -> List[str]:
+
+    # the footer only shows the stats of this pass (which warm server workers would otherwise inherit from the server)
+    reset_query_stats()
+    reset_thumbnail_cache_stats()
+
+    now = time.time()
+    power_throttle = PowerThrottle(project_root)
+    scheduler = ProviderScheduler(project_root, get_refresh_intervals(credentials), power_throttle)
+    if power_throttle.has_become_active():
+        scheduler.schedule_catch_up(SUPPORTED_MESSAGE_TYPES, now)
+    result_cache = ProviderResultCache(project_root)
+
+    message_account_results = {}  # type: Dict[str, ProviderResult]
+    fetch_message_account_types = []
+    revalidate_message_account_types = []
+    for message_account_type in SUPPORTED_MESSAGE_TYPES:
+        cached_result = result_cache.load(message_account_type)
+        if cached_result is None:
+            fetch_message_account_types.append(message_account_type)
+            continue
+
+        message_account_results[message_account_type] = cached_result
+        if scheduler.is_due(message_account_type, now):
+            if (STALE_WHILE_REVALIDATE and message_account_type in STALE_WHILE_REVALIDATE_TYPES
+                    and cached_result.get_age(now) <= STALE_RESULT_MAX_AGE_SECONDS):
+                revalidate_message_account_types.append(message_account_type)
+            else:
+                fetch_message_account_types.append(message_account_type)
+
+    fresh_message_account_types = set()
+    for message_account_result in get_message_account_results(project_root, credentials, fetch_message_account_types):
+        message_account_results[message_account_result.message_type] = message_account_result
+        fresh_message_account_types.add(message_account_result.message_type)
+        result_cache.save(message_account_result)
+        scheduler.record_run(message_account_result.message_type)
+
+    if revalidate_message_account_types:
+        # render the stale results right away and let a background process replace them with fresh ones
+        start_background_refresh(project_root, revalidate_message_account_types)
+        for message_account_type in revalidate_message_account_types:
+            scheduler.record_run(message_account_type, now)
+
+    scheduler.save()
+
+    unread_count = 0
+    standard_output = []
+    standard_error = False
+    for message_account_type in SUPPORTED_MESSAGE_TYPES:
+        # results that were not fetched during this run are marked with their age
+        message_account_result = message_account_results[message_account_type]
+        standard_output.extend(message_account_result.get_console_output(
+            now, show_age=message_account_type not in fresh_message_account_types
+        ))
+        unread_count += message_account_result.unread_count
+        standard_error = standard_error or message_account_result.standard_error
+
+    standard_output.extend(generate_menu_footer())
+
+    return [generate_menubar_icon(project_root, unread_count, standard_error)] + standard_output
+
+
+def start_background_refresh(project_root: Path, message_account_types: List[str]) -> None:
+    logger.debug(f"Starting background refresh of {', '.join(message_account_types)}")
+    # detach the refresh from this process (and from SwiftBar, which waits for the output of this process to close)
+    Popen(
+        [sys.executable, "-m", "message_notifier.refresh"] + message_account_types,
+        cwd=str(project_root),
+        stdin=DEVNULL,
+        stdout=DEVNULL,
+        stderr=DEVNULL,
+        start_new_session=True
+    )
+
+
+def main() -> None:
+
+    start = time.process_time()
+    wall_start = time.perf_counter()
+
+    credentials = load_credentials(PROJECT_ROOT)
+    for line in single_flight(PROJECT_ROOT, lambda: generate_menu(PROJECT_ROOT, credentials)):
+        print(line)
+
+    logger.debug(f"Message Notifier completion time: {time.process_time() - start}")
+    logger.debug(f"Message Notifier wall time: {time.perf_counter() - wall_start:.3f}s")
+
+    exit_without_waiting_for_timed_out_threads()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import json
+import logging
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from subprocess import run, PIPE
+from typing import Dict, List
+
+from message_notifier.config import (
+    BATTERY_INTERVAL_MULTIPLIER, DEFER_MEDIA_PREVIEWS_WHEN_THROTTLED, IDLE_INTERVAL_MULTIPLIER, IDLE_THRESHOLD_SECONDS,
+    MAX_THROTTLED_INTERVAL_SECONDS, POWER_STATE_CACHE_SECONDS, POWER_STATE_FILE_PATH, POWER_THROTTLING
+)
+from message_notifier.state import get_data_dir, update_json_state
+
+logger = logging.getLogger(__name__)
+
+# set while the current process should skip generating thumbnails/previews for message attachments
+MEDIA_PREVIEWS_DEFERRED = threading.Event()
+
+# the power state is queried at most once per POWER_STATE_CACHE_SECONDS, since every provider run checks it
+POWER_STATE_CACHE = {}  # type: Dict[str, PowerState]
+POWER_STATE_CACHE_LOCK = threading.Lock()
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ POWER AND IDLE PROBES • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+class PowerState(object):
+
+    def __init__(self, on_battery: bool = False, idle_seconds: float = 0.0, probed_at: float = None):
+        self.on_battery = on_battery
+        self.idle_seconds = idle_seconds
+        self.probed_at = probed_at or time.time()
+
+    def is_idle(self) -> bool:
+        return self.idle_seconds >= IDLE_THRESHOLD_SECONDS
+
+    def __repr__(self):
+        return f"PowerState(on_battery={self.on_battery}, idle_seconds={self.idle_seconds:.0f})"
+
+
+class PowerProbe(ABC):
+
+    @abstractmethod
+    def get_power_state(self) -> PowerState:
+        raise NotImplementedError
+
+
+class MacOSPowerProbe(PowerProbe):
+    """Reads the power source from pmset and the time since the last keyboard/mouse input from the IOHIDSystem."""
+
+    @staticmethod
+    def _get_command_output(commands: List[str]) -> str:
+        try:
+            return run(commands, stdout=PIPE, stderr=PIPE, universal_newlines=True, timeout=5).stdout
+        except (OSError, ValueError) as e:
+            logger.debug(f"Unable to run {commands[0]} with error {repr(e)}")
+            return ""
+
+    def get_power_state(self) -> PowerState:
+        # first line of output is "Now drawing from 'AC Power'" or "Now drawing from 'Battery Power'"
+        on_battery = "'Battery Power'" in self._get_command_output(["pmset", "-g", "batt"])
+
+        # HIDIdleTime is reported in nanoseconds
+        idle_time_match = re.search(
+            r"\"HIDIdleTime\" = (\d+)", self._get_command_output(["ioreg", "-c", "IOHIDSystem", "-d", "4"])
+        )
+        idle_seconds = int(idle_time_match.group(1)) / 1e9 if idle_time_match else 0.0
+
+        return PowerState(on_battery, idle_seconds)
+
+
+class FilePowerProbe(PowerProbe):
+    """Reads the power state from a JSON file, e.g. {"on_battery": true, "idle_seconds": 600}."""
+
+    def __init__(self, power_state_file_path: Path):
+        self.power_state_file_path = power_state_file_path
+
+    def get_power_state(self) -> PowerState:
+        try:
+            with open(self.power_state_file_path, "r") as power_state_file:
+                power_state = json.load(power_state_file)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Unable to read power state from {self.power_state_file_path} with error {repr(e)}")
+            power_state = {}
+
+        return PowerState(bool(power_state.get("on_battery", False)), float(power_state.get("idle_seconds", 0)))
+
+
+def get_power_probe() -> PowerProbe:
+    if POWER_STATE_FILE_PATH:
+        return FilePowerProbe(Path(POWER_STATE_FILE_PATH))
+    return MacOSPowerProbe()
+
+
+def get_power_state(power_probe: PowerProbe = None) -> PowerState:
+    with POWER_STATE_CACHE_LOCK:
+        power_state = POWER_STATE_CACHE.get("power_state")
+        if power_probe or power_state is None or time.time() - power_state.probed_at > POWER_STATE_CACHE_SECONDS:
+            power_state = (power_probe or get_power_probe()).get_power_state()
+            POWER_STATE_CACHE["power_state"] = power_state
+            logger.debug(f"Current power state: {power_state}")
+        return power_state
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ POWER THROTTLE • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+class PowerThrottle(object):
+    """Decides how much to slow down refreshes based on the power state, and notices when the user comes back."""
+
+    def __init__(self, project_root: Path, power_probe: PowerProbe = None):
+        self.state_path = get_data_dir(project_root) / "power_state.json"
+        self.power_state = get_power_state(power_probe) if POWER_THROTTLING else PowerState()
+
+    def is_throttled(self) -> bool:
+        return self.power_state.on_battery or self.power_state.is_idle()
+
+    def get_interval_multiplier(self) -> float:
+        interval_multiplier = 1
+        if self.power_state.on_battery:
+            interval_multiplier = max(interval_multiplier, BATTERY_INTERVAL_MULTIPLIER)
+        if self.power_state.is_idle():
+            interval_multiplier = max(interval_multiplier, IDLE_INTERVAL_MULTIPLIER)
+        return interval_multiplier
+
+    def get_interval(self, interval: float) -> float:
+        # throttling never shortens an interval that is already longer than the throttled maximum
+        if not self.is_throttled():
+            return interval
+        return max(interval, min(interval * self.get_interval_multiplier(), MAX_THROTTLED_INTERVAL_SECONDS))
+
+    def should_defer_media_previews(self) -> bool:
+        return DEFER_MEDIA_PREVIEWS_WHEN_THROTTLED and self.is_throttled()
+
+    def apply_media_preview_policy(self) -> None:
+        if self.should_defer_media_previews():
+            MEDIA_PREVIEWS_DEFERRED.set()
+        else:
+            MEDIA_PREVIEWS_DEFERRED.clear()
+
+    def has_become_active(self) -> bool:
+        # record whether the user is idle and report the transition from idle back to active exactly once
+        transition = {}
+
+        def record_idle(state: Dict) -> Dict:
+            transition["was_idle"] = state.get("idle", False)
+            state["idle"] = self.power_state.is_idle()
+            return state
+
+        update_json_state(self.state_path, record_idle)
+        return transition["was_idle"] and not self.power_state.is_idle()
+
+
+def are_media_previews_deferred() -> bool:
+    return MEDIA_PREVIEWS_DEFERRED.is_set()
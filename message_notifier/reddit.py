@@ -0,0 +1,293 @@
+# Some portions of the code used to retrieve Reddit messages was adapted from code originally written by /u/HeyItsShuga:
+# https://github.com/matryer/bitbar-plugins/blob/master/Web/Reddit/redditnotify.30s.py
+
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Union
+
+from message_notifier.base import BaseConversation, BaseMessage, BaseOutput, register_message_output
+from message_notifier.config import (
+    ANSI_BLUE, ANSI_MAGENTA, ANSI_OFF, ANSI_RED, MAX_LINE_CHARS, PROVIDER_DEFAULT_TIMEOUT_SECONDS, PROVIDER_TIMEOUT_SECONDS
+)
+from message_notifier.lazy import pd, praw, prawcore_exceptions
+from message_notifier.utils import generate_output_read, generate_output_unread, sanitize_url
+
+logger = logging.getLogger(__name__)
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • MENUBAR PLUGIN REDDIT CLASSES • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+# noinspection DuplicatedCode
+class RedditMessage(BaseMessage):
+
+    def __init__(self, df_row, max_line_characters, display_string):
+        super().__init__(df_row, max_line_characters, display_string)
+
+        self.recipient = df_row.recipient
+        self.subreddit = df_row.subreddit
+        self.is_comment = bool(df_row.comment)
+        self.is_modmail = bool(df_row.modmail)
+
+        if self.is_comment:
+            self.cid = self.id
+
+        if df_row.context:
+            self.context = df_row.context
+        else:
+            self.context = f"/message/messages/{df_row.id}"
+
+        if self.is_modmail:
+            link_unread_message = sanitize_url(f"https://mod.reddit.com{self.context}")
+        else:
+            link_unread_message = sanitize_url(f"https://www.reddit.com{self.context}")
+        self.menubar_msg_display_str = f"href={link_unread_message} tooltip={link_unread_message} "
+
+
+class RedditConversation(BaseConversation):
+
+    def __init__(self, reddit_message_obj: RedditMessage):
+        super().__init__(reddit_message_obj)
+        if reddit_message_obj.is_modmail:
+            self.type_str = f"{ANSI_BLUE} (modmail for /r/{reddit_message_obj.subreddit}){ANSI_OFF}"
+        elif reddit_message_obj.is_comment:
+            self.type_str = f"{ANSI_MAGENTA} (comment){ANSI_OFF}"
+        else:
+            self.type_str = f"{ANSI_RED} (message){ANSI_OFF}"
+
+    def get_participants_str(self) -> str:
+        if self.is_group_conversation:
+            return (
+                f"{', '.join(participant for participant in self.participants)}"
+                f"{', ...' if len(self.participants) == 1 else ''}{self.type_str}"
+            )
+        else:
+            return f"{''.join(participant for participant in self.participants)}{self.type_str}"
+
+
+# noinspection PyShadowingNames,DuplicatedCode
+@register_message_output("reddit")
+class RedditOutput(BaseOutput):
+
+    requires_network = True
+
+    def __init__(self, credentials: Union[Dict, List], project_root_dir: Path):
+
+        self.project_root_dir = project_root_dir
+        self.message_type = "reddit"
+
+        self.reddit_account_credentials_list = []
+        if type(credentials) == dict:
+            self.reddit_account_credentials_list.append(credentials)
+        elif type(credentials) == list:
+            self.reddit_account_credentials_list = credentials
+
+        self.accounts_conversations = {}  # type: Dict[str, OrderedDict]
+        self.unread_count = 0
+        link_unread = "https://www.reddit.com/message/unread/"
+        self.unread_display_str = (
+            f"href={link_unread} "
+            f"tooltip={link_unread} "
+            f"refresh=true "
+        )
+        self.all_unread_message_senders = set()
+
+        # https://gist.github.com/leviroth/dafcf1331737e2b55dd6fb86257dcb8d
+        self.modmail_conversation_states = {
+            "new": 0,
+            "inprogress": 1,
+            "archived": 2,
+            "mod": 0
+        }
+
+        self.standard_error = []
+
+    def _get_messages(self) -> None:
+
+        for reddit_account_credentials in self.reddit_account_credentials_list:
+
+            try:
+                reddit = praw.Reddit(
+                    client_id=reddit_account_credentials.get("client_id"),
+                    client_secret=reddit_account_credentials.get("client_secret"),
+                    refresh_token=reddit_account_credentials.get("refresh_token"),
+                    user_agent="macOS Menubar Notifier for Reddit",
+                    timeout=PROVIDER_TIMEOUT_SECONDS.get(self.message_type, PROVIDER_DEFAULT_TIMEOUT_SECONDS)
+                )
+
+                reddit_user = reddit.user.me()
+                reddit_username = reddit_user.name
+
+                unread_messages = list(reddit.inbox.unread(limit=None))
+                # getting all messages instead of just unread
+                # all_messages = reddit.inbox.all(limit=5)
+
+                if reddit_user.is_mod and reddit_user.has_mod_mail and reddit_user.new_modmail_exists:
+                    modmail_conversations = []
+                    for subreddit in reddit_user.moderated():
+                        try:
+                            # https://praw.readthedocs.io/en/stable/code_overview/other/modmail.html
+                            # subreddit.modmail returns ALL modmail across ALL subreddits regardless of subreddit object
+                            subreddit_modmail = subreddit.modmail
+                            for state, unread_conversation_count in subreddit_modmail.unread_count().items():
+                                logger.debug(f"Modmail (state: {state}) unread count: {unread_conversation_count}")
+                                original_unread_conversation_count = unread_conversation_count
+                                # https://praw.readthedocs.io/en/stable/code_overview/models/modmailconversation.html
+                                for modmail_conversation in subreddit_modmail.conversations(state=state, sort="unread"):
+                                    if (self.modmail_conversation_states.get(state) == modmail_conversation.state
+                                            and unread_conversation_count > 0):
+                                        setattr(modmail_conversation, "subreddit", subreddit)
+                                        modmail_conversations.append(
+                                            (modmail_conversation, original_unread_conversation_count)
+                                        )
+                                        unread_conversation_count -= 1
+                        except prawcore_exceptions.Forbidden as fe:
+                            logger.debug(
+                                f"Unable to retrieve modmail from private subreddit "
+                                f"/r/{subreddit.display_name} with error {repr(fe)}."
+                            )
+
+                    for modmail_conversation, unread_modmail_conversation_count in modmail_conversations:
+                        if modmail_conversation.last_unread:
+                            message_sent_after_last_user_mod_reply = True
+                            # https://praw.readthedocs.io/en/stable/code_overview/other/modmailmessage.html
+                            for modmail_message in reversed(modmail_conversation.messages):
+                                if message_sent_after_last_user_mod_reply:
+                                    # TODO: figure out how to check reddit mod discussions for actual unread count
+                                    if (
+                                            modmail_message.author.id != reddit_user.id
+                                            # and unread_modmail_conversation_count > 0
+                                    ):
+                                        setattr(modmail_message, "parent_id", modmail_conversation.id)
+                                        setattr(modmail_message, "subject", modmail_conversation.subject)
+                                        setattr(modmail_message, "created_utc", modmail_message.date)
+                                        setattr(modmail_message, "created_utc", datetime.strptime(
+                                            modmail_message.date, "%Y-%m-%dT%H:%M:%S.%f%z"
+                                        ).replace(tzinfo=timezone.utc).timestamp())
+                                        setattr(modmail_message, "body", modmail_message.body_markdown)
+                                        setattr(modmail_message, "dest",
+                                                f"Modmail for /r/{modmail_conversation.subreddit}")
+                                        setattr(modmail_message, "subreddit", modmail_conversation.subreddit)
+                                        setattr(modmail_message, "was_comment", False)
+                                        setattr(modmail_message, "was_modmail", True)
+                                        setattr(modmail_message, "context", f"/mail/all/{modmail_conversation.id}")
+
+                                        unread_messages.append(modmail_message)
+                                        unread_modmail_conversation_count -= 1
+                                    else:
+                                        message_sent_after_last_user_mod_reply = False
+
+                self.unread_count += len(unread_messages)
+                self.all_unread_message_senders.update(
+                    [message.author.name if message.author
+                     else f"{message.distinguished} of {message.subreddit_name_prefixed}"
+                     for message in unread_messages]
+                )
+
+                unread_df = pd.DataFrame(
+                    columns=[
+                        "id", "cid", "title", "timestamp", "sender", "body", "recipient", "subreddit", "comment",
+                        "modmail", "context"
+                    ]
+                )
+
+                for unread_message in unread_messages:
+                    logger.debug(f"Unread message vars:\n{vars(unread_message)}\n")
+                    unread_df.loc[len(unread_df)] = [
+                        unread_message.id,
+                        unread_message.parent_id,
+                        unread_message.subject,
+                        unread_message.created_utc,
+                        # message.created,
+                        (unread_message.author.name if unread_message.author
+                         else f"{unread_message.distinguished} of {unread_message.subreddit_name_prefixed}"),
+                        unread_message.body,
+                        unread_message.dest,
+                        unread_message.subreddit,
+                        unread_message.was_comment,
+                        unread_message.was_modmail if hasattr(unread_message, "was_modmail") else False,
+                        unread_message.context
+                    ]
+                logger.debug(f"\n{unread_df.to_string()}\n")
+
+                # display messages in reverse order they were received (newest to oldest, top to bottom)
+                # unread_df.sort_values("timestamp", inplace=True, ascending=False)
+
+                conversations = OrderedDict()
+                for row in unread_df.itertuples():
+
+                    # noinspection PyTypeChecker
+                    unread_message = RedditMessage(row, MAX_LINE_CHARS, self.unread_display_str)
+                    if unread_message.cid not in conversations.keys():
+                        conversations[unread_message.cid] = RedditConversation(unread_message)
+                    else:
+                        conversations.get(unread_message.cid).add_message(unread_message)
+
+                self.accounts_conversations[reddit_username] = conversations
+
+            except (prawcore_exceptions.ResponseException, prawcore_exceptions.RequestException) as e:
+                logger.error(repr(e))
+                self.standard_error.extend([
+                    "---",
+                    "❗",
+                    f"--{ANSI_RED}UNABLE TO RETRIEVE REDDIT ACCOUNT CONTENT WITH ERROR: {repr(e)}!{ANSI_OFF} | "
+                    f"ansi=true "
+                ])
+
+    def get_conversations(self) -> Dict[str, OrderedDict]:
+        return self.accounts_conversations
+
+    def get_console_output(self) -> List[str]:
+
+        self._get_messages()
+
+        reddit_link = "https://www.reddit.com/message/inbox/"
+
+        standard_output = []
+        for reddit_username, conversations in self.accounts_conversations.items():
+
+            if len(conversations) == 0:
+
+                read_display_str = (
+                    f"href={reddit_link} "
+                    f"tooltip={reddit_link} "
+                    f"refresh=true "
+                )
+
+                standard_output.extend(
+                    generate_output_read(
+                        self.project_root_dir,
+                        self.message_type,
+                        read_display_str,
+                        reddit_username
+                    )
+                )
+
+            else:
+                arg_dict = {
+                    "contentImage": self.project_root_dir / "resources" / "images" / "icon_reddit.png",
+                    "sound": "Glass"
+                }
+
+                standard_output.extend(
+                    generate_output_unread(
+                        self.project_root_dir,
+                        self.message_type,
+                        self.unread_display_str,
+                        self.unread_count,
+                        conversations,
+                        MAX_LINE_CHARS,
+                        arg_dict,
+                        reddit_username,
+                        all_unread_message_senders=self.all_unread_message_senders
+                    )
+                )
+
+        if self.standard_error:
+            standard_output.extend(self.standard_error)
+
+        return standard_output
@@ -0,0 +1,43 @@
+import logging
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from typing import List
+
+from message_notifier.cache import ProviderResultCache
+from message_notifier.main import (
+    PROJECT_ROOT, exit_without_waiting_for_timed_out_threads, get_message_account_results, load_credentials
+)
+from message_notifier.scheduler import ProviderScheduler, get_refresh_intervals
+from message_notifier.state import file_lock, get_data_dir
+
+logger = logging.getLogger(__name__)
+
+
+def refresh(project_root: Path, message_account_types: List[str]) -> None:
+    # fetch fresh results for the given message types and replace their cached copies (run in the background by main)
+    credentials = load_credentials(project_root)
+    result_cache = ProviderResultCache(project_root)
+    data_dir = get_data_dir(project_root)
+
+    with ExitStack() as refresh_locks:
+        # skip message types that another background refresh is still retrieving
+        refreshable_message_account_types = [
+            message_account_type for message_account_type in message_account_types
+            if refresh_locks.enter_context(file_lock(data_dir / f".refresh_{message_account_type}.lock", blocking=False))
+        ]
+        message_account_results = get_message_account_results(
+            project_root, credentials, refreshable_message_account_types
+        )
+        for message_account_result in message_account_results:
+            result_cache.save(message_account_result)
+
+    scheduler = ProviderScheduler(project_root, get_refresh_intervals(credentials))
+    for message_account_result in message_account_results:
+        scheduler.record_run(message_account_result.message_type, message_account_result.fetched_at)
+    scheduler.save()
+
+
+if __name__ == "__main__":
+    refresh(PROJECT_ROOT, sys.argv[1:])
+    exit_without_waiting_for_timed_out_threads()
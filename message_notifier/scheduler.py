@@ -0,0 +1,72 @@
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from message_notifier.config import CATCH_UP_STAGGER_SECONDS, REFRESH_INTERVAL_GRACE_SECONDS, REFRESH_INTERVALS
+from message_notifier.power import PowerThrottle
+from message_notifier.state import get_data_dir, load_json_state, update_json_state
+
+logger = logging.getLogger(__name__)
+
+
+def get_refresh_intervals(credentials: Dict) -> Dict[str, int]:
+    refresh_intervals = dict(REFRESH_INTERVALS)
+    refresh_intervals.update(credentials.get("refresh_intervals", {}))
+    return refresh_intervals
+
+
+class ProviderScheduler(object):
+    """Tracks when each message type last refreshed (in resources/data/scheduler_state.json) and which ones are due."""
+
+    def __init__(self, project_root: Path, refresh_intervals: Dict[str, int], power_throttle: PowerThrottle = None):
+        self.state_path = get_data_dir(project_root) / "scheduler_state.json"
+        self.refresh_intervals = refresh_intervals
+        self.power_throttle = power_throttle
+        self.state = load_json_state(self.state_path)
+        self.recorded_message_types = set()
+
+    def is_due(self, message_type: str, now: float = None) -> bool:
+        message_type_state = self.state.get(message_type)
+        if not message_type_state:
+            return True
+
+        now = now or time.time()
+        last_run = message_type_state.get("last_run", 0)
+        catch_up_at = message_type_state.get("catch_up_at")
+        if catch_up_at and catch_up_at > last_run:
+            return now >= catch_up_at
+
+        refresh_interval = self.refresh_intervals.get(message_type, 0)
+        if self.power_throttle:
+            refresh_interval = self.power_throttle.get_interval(refresh_interval)
+        return now - last_run >= refresh_interval - REFRESH_INTERVAL_GRACE_SECONDS
+
+    def get_due_message_types(self, message_types: List[str], now: float = None) -> List[str]:
+        now = now or time.time()
+        due_message_types = [message_type for message_type in message_types if self.is_due(message_type, now)]
+        logger.debug(f"Message types due for refresh: {', '.join(due_message_types) or 'none'}")
+        return due_message_types
+
+    def schedule_catch_up(self, message_types: List[str], now: float = None) -> None:
+        # refresh every message type once more after a throttled period, one at a time instead of all at once
+        now = now or time.time()
+        for stagger_index, message_type in enumerate(message_types):
+            message_type_state = self.state.setdefault(message_type, {})
+            message_type_state["catch_up_at"] = now + stagger_index * CATCH_UP_STAGGER_SECONDS
+            self.recorded_message_types.add(message_type)
+        logger.debug(f"Scheduled catch-up refresh of {', '.join(message_types)}")
+
+    def record_run(self, message_type: str, now: float = None) -> None:
+        self.state[message_type] = {"last_run": now or time.time()}
+        self.recorded_message_types.add(message_type)
+
+    def save(self) -> None:
+        # only the runs recorded by this process are merged, since other plugin processes may have updated the state
+        def merge_recorded_runs(state: Dict) -> Dict:
+            for message_type in self.recorded_message_types:
+                state[message_type] = self.state[message_type]
+            return state
+
+        self.state = update_json_state(self.state_path, merge_recorded_runs)
+        self.recorded_message_types.clear()
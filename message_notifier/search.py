@@ -0,0 +1,345 @@
+import argparse
+import logging
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from message_notifier.config import (
+    SQLITE_BUSY_TIMEOUT_SECONDS, TEXT_SEARCH_BATCH_SIZE, TEXT_SEARCH_HISTORY_DAYS, TEXT_SEARCH_RESULT_LIMIT
+)
+from message_notifier.database import ReadOnlyDatabase
+from message_notifier.state import file_lock, get_data_dir, get_lock_path
+from message_notifier.typedstream import decode_attributed_body
+from message_notifier.utils import get_subprocess_output
+
+logger = logging.getLogger(__name__)
+
+# chat.db message dates are nanoseconds since 2001-01-01 (the Apple epoch)
+APPLE_EPOCH_OFFSET_SECONDS = 978307200
+# how often messages that fell out of the TEXT_SEARCH_HISTORY_DAYS window are removed from the index
+SEARCH_INDEX_PRUNE_INTERVAL_SECONDS = 86400
+
+
+def get_search_index_path(project_root: Path) -> Path:
+    return get_data_dir(project_root) / "cache" / "text_search.db"
+
+
+def get_chat_db_date(timestamp: float) -> int:
+    return int((timestamp - APPLE_EPOCH_OFFSET_SECONDS) * 1000000000)
+
+
+def build_match_query(search_query: str) -> Optional[str]:
+    # every word of the search is matched as a quoted prefix, so that user input never has to follow the FTS5 query
+    # syntax (quotes, AND/OR/NOT, column filters) and partially typed words still match
+    search_terms = re.findall(r"\w+", search_query)
+    if not search_terms:
+        return None
+    return " ".join(f'"{search_term}"*' for search_term in search_terms)
+
+
+class SearchResult(object):
+
+    def __init__(self, search_row: Tuple):
+        self.rowid, self.cid, self.contact, self.title, self.date, self.is_from_me, self.snippet = search_row
+        self.timestamp = datetime.fromtimestamp(self.date / 1000000000 + APPLE_EPOCH_OFFSET_SECONDS)
+
+    def get_display_str(self, sender: Optional[str] = None) -> str:
+        sender = "Me" if self.is_from_me else (sender or self.contact or "Unknown")
+        conversation = f" in {self.title}" if self.title else ""
+        return f"{self.timestamp.strftime('%b %-d, %Y %-I:%M %p')} - {sender}{conversation}: {self.snippet}"
+
+
+class MessageSearchIndex(object):
+    """Full-text (FTS5) index of the recent iMessage/SMS history, stored next to the plugin data instead of in chat.db.
+
+    The index is filled incrementally from chat.db in ROWID order: each update only reads the messages after the last
+    indexed ROWID, so searching never has to run a LIKE scan over the whole message history. Messages older than
+    TEXT_SEARCH_HISTORY_DAYS are never indexed and are pruned once they age out.
+    """
+
+    def __init__(self, index_path: Path, chat_db_path: Path):
+        self.index_path = index_path
+        self.chat_db_path = chat_db_path
+        self.lock_path = get_lock_path(index_path)
+
+        if not self.index_path.parent.is_dir():
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(index_path), timeout=SQLITE_BUSY_TIMEOUT_SECONDS)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(
+                body,
+                title,
+                cid UNINDEXED,
+                contact UNINDEXED,
+                date UNINDEXED,
+                is_from_me UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS search_index_state (
+                key TEXT PRIMARY KEY,
+                value
+            );
+        """)
+
+    # noinspection SqlResolve
+    @staticmethod
+    def _sqlite_query_get_first_recent_message_rowid() -> str:
+        # the first message inside the indexed history window, found through the message date index, and the last
+        # message, which is where indexing starts when there are no messages inside the window
+        return """
+            SELECT
+                (SELECT ROWID FROM message WHERE date >= ? ORDER BY date LIMIT 1),
+                (SELECT max(ROWID) FROM message)
+        """
+
+    # noinspection SqlResolve
+    @staticmethod
+    def _sqlite_query_get_messages_after() -> str:
+        # the next batch of messages after the ROWID passed as the first parameter, read through the primary key
+        return """
+            SELECT
+                msg.ROWID,
+                msg.date,
+                msg.is_from_me,
+                msg.text,
+                CASE
+                    WHEN msg.text IS NULL
+                    THEN msg.attributedBody
+                END as att_body,
+                hdl.id as contact,
+                cht.chat_identifier as cid,
+                cht.display_name as title
+            FROM message msg
+            LEFT JOIN handle hdl
+                ON hdl.ROWID = msg.handle_id
+            LEFT JOIN chat_message_join cmj
+                ON cmj.message_id = msg.ROWID
+            LEFT JOIN chat cht
+                ON cht.ROWID = cmj.chat_id
+            WHERE msg.ROWID > ?
+            ORDER BY msg.ROWID
+            LIMIT ?
+        """
+
+    def _get_state(self, key: str, default=None):
+        state_row = self.connection.execute("SELECT value FROM search_index_state WHERE key = ?", (key,)).fetchone()
+        return state_row[0] if state_row else default
+
+    def _set_state(self, key: str, value) -> None:
+        self.connection.execute("INSERT OR REPLACE INTO search_index_state (key, value) VALUES (?, ?)", (key, value))
+
+    def _get_history_start_rowid(self, chat_db: ReadOnlyDatabase) -> int:
+        history_start_date = get_chat_db_date(time.time() - TEXT_SEARCH_HISTORY_DAYS * 86400)
+        first_recent_message_rowid, last_message_rowid = chat_db.execute(
+            "search_history_start", self._sqlite_query_get_first_recent_message_rowid(), (history_start_date,)
+        )[0]
+        if first_recent_message_rowid is None:
+            return last_message_rowid or 0
+        return first_recent_message_rowid - 1
+
+    def _index_batch(self, chat_db: ReadOnlyDatabase, watermark: int, batch_size: int) -> Tuple[int, int]:
+        # returns the new watermark and the number of messages read from chat.db
+        message_rows = chat_db.execute(
+            "search_index_batch", self._sqlite_query_get_messages_after(), (watermark, batch_size)
+        )
+
+        indexed_rows = []
+        for rowid, date, is_from_me, text, attributed_body, contact, cid, title in message_rows:
+            body = text if text is not None else decode_attributed_body(attributed_body)
+            if body and body.strip():
+                indexed_rows.append((rowid, body, title, cid, contact, date, is_from_me))
+
+        # a message that belongs to several chats is only indexed once
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO message_fts (rowid, body, title, cid, contact, date, is_from_me) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            indexed_rows
+        )
+        return (message_rows[-1][0] if message_rows else watermark), len(message_rows)
+
+    def _prune(self, chat_db: ReadOnlyDatabase) -> None:
+        history_start_rowid = self._get_history_start_rowid(chat_db)
+        self.connection.execute("DELETE FROM message_fts WHERE rowid <= ?", (history_start_rowid,))
+        self._set_state("pruned_at", time.time())
+
+    def update(self, chat_db: ReadOnlyDatabase = None, max_batches: int = None,
+               batch_size: int = TEXT_SEARCH_BATCH_SIZE, blocking: bool = False) -> int:
+        """Indexes the messages added to chat.db since the last update and returns how many were read.
+
+        The plugin passes max_batches so that a refresh never spends long catching up on a large history, and the
+        search itself indexes everything that is left before searching.
+        """
+        with file_lock(self.lock_path, blocking=blocking, timeout=SQLITE_BUSY_TIMEOUT_SECONDS) as acquired:
+            if not acquired:
+                logger.debug("Search index is already being updated by another process.")
+                return 0
+
+            owns_chat_db = chat_db is None
+            chat_db = ReadOnlyDatabase(self.chat_db_path) if owns_chat_db else chat_db
+            try:
+                watermark = self._get_state("watermark")
+                if watermark is None:
+                    watermark = self._get_history_start_rowid(chat_db)
+
+                message_count = 0
+                batch_count = 0
+                while max_batches is None or batch_count < max_batches:
+                    with self.connection:
+                        watermark, batch_message_count = self._index_batch(chat_db, watermark, batch_size)
+                        self._set_state("watermark", watermark)
+                    message_count += batch_message_count
+                    batch_count += 1
+                    if batch_message_count < batch_size:
+                        break
+
+                if time.time() - self._get_state("pruned_at", 0) > SEARCH_INDEX_PRUNE_INTERVAL_SECONDS:
+                    with self.connection:
+                        self._prune(chat_db)
+            finally:
+                if owns_chat_db:
+                    chat_db.close()
+
+        logger.debug(f"Indexed {message_count} iMessage/SMS messages for search up to ROWID {watermark}.")
+        return message_count
+
+    def rebuild(self) -> int:
+        with file_lock(self.lock_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS):
+            with self.connection:
+                self.connection.execute("DELETE FROM message_fts")
+                self.connection.execute("DELETE FROM search_index_state")
+        return self.update(blocking=True)
+
+    def search(self, search_query: str, limit: int = TEXT_SEARCH_RESULT_LIMIT) -> List[SearchResult]:
+        match_query = build_match_query(search_query)
+        if not match_query:
+            return []
+
+        search_rows = self.connection.execute("""
+            SELECT
+                rowid,
+                cid,
+                contact,
+                title,
+                date,
+                is_from_me,
+                snippet(message_fts, 0, '', '', '…', 12)
+            FROM message_fts
+            WHERE message_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, (match_query, limit)).fetchall()
+        return [SearchResult(search_row) for search_row in search_rows]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "MessageSearchIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ SEARCH CLI • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+def prompt_for_search_query() -> Optional[str]:
+    search_query, exit_code = get_subprocess_output([
+        "osascript",
+        "-e", 'display dialog "Search iMessage/SMS messages:" default answer "" with title "Message Notifier"',
+        "-e", "text returned of result"
+    ], return_stdout_and_exit_code=True)
+    # the dialog exits with an error when it is cancelled
+    return search_query.strip() if exit_code == 0 else None
+
+
+def choose_search_result(search_query: str, search_results: List[SearchResult],
+                         senders: Dict[str, str]) -> Optional[SearchResult]:
+    if not search_results:
+        get_subprocess_output([
+            "osascript", "-e", "on run argv", "-e", 'display alert "No messages found for " & item 1 of argv',
+            "-e", "end run", search_query
+        ])
+        return None
+
+    display_strs = [
+        f"{result_num}. {search_result.get_display_str(senders.get(search_result.contact))}"
+        for result_num, search_result in enumerate(search_results, start=1)
+    ]
+    # the results are passed as arguments instead of being interpolated into the script so they need no escaping
+    chosen_display_str, exit_code = get_subprocess_output([
+        "osascript",
+        "-e", "on run argv",
+        "-e", 'choose from list (items 2 thru -1 of argv) with title "Message Notifier" '
+              'with prompt ("Messages matching " & item 1 of argv & ":") OK button name "Open"',
+        "-e", "end run",
+        search_query
+    ] + display_strs, return_stdout_and_exit_code=True)
+
+    chosen_display_str = chosen_display_str.strip()
+    if exit_code != 0 or chosen_display_str not in display_strs:
+        return None
+    return search_results[display_strs.index(chosen_display_str)]
+
+
+def main() -> int:
+    # imported here because the iMessage/SMS provider itself imports this module to keep the index up to date
+    from message_notifier.contacts import get_contact_lookup
+    from message_notifier.main import PROJECT_ROOT, load_credentials
+    from message_notifier.text import TextOutput
+
+    argument_parser = argparse.ArgumentParser(description="Search the recent iMessage/SMS history.")
+    argument_parser.add_argument("query", nargs="*", help="words to search for (prefixes match as well)")
+    argument_parser.add_argument("-n", "--limit", type=int, default=TEXT_SEARCH_RESULT_LIMIT)
+    argument_parser.add_argument("--dialog", action="store_true",
+                                 help="ask for the search in a dialog and open the conversation of the chosen result")
+    argument_parser.add_argument("--rebuild", action="store_true", help="rebuild the index before searching")
+    arguments = argument_parser.parse_args()
+
+    search_query = " ".join(arguments.query)
+    if arguments.dialog:
+        search_query = prompt_for_search_query()
+    if not search_query and not arguments.rebuild:
+        return 0
+
+    text_output = TextOutput(load_credentials(PROJECT_ROOT).get("text"), PROJECT_ROOT)
+    with MessageSearchIndex(get_search_index_path(PROJECT_ROOT), text_output.chat_db_path) as search_index:
+        start = time.perf_counter()
+        if arguments.rebuild:
+            search_index.rebuild()
+        else:
+            search_index.update(blocking=True)
+        search_results = search_index.search(search_query, arguments.limit) if search_query else []
+        logger.debug(f"Searched iMessage/SMS messages for '{search_query}' in {time.perf_counter() - start:.3f}s")
+
+    # noinspection PyProtectedMember
+    contact_lookup = get_contact_lookup(text_output._get_contact_db_paths(), text_output.contact_lookup_path)
+    senders = {}
+    for search_result in search_results:
+        number, sender, org = contact_lookup.get(search_result.contact)
+        senders[search_result.contact] = sender or org
+
+    if arguments.dialog:
+        chosen_search_result = choose_search_result(search_query, search_results, senders)
+        if chosen_search_result and chosen_search_result.cid:
+            get_subprocess_output([
+                str(PROJECT_ROOT / "resources" / "scripts" / "open_text_messages_to_conversation.sh"),
+                chosen_search_result.cid
+            ])
+        return 0
+
+    for search_result in search_results:
+        print(search_result.get_display_str(senders.get(search_result.contact)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
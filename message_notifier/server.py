@@ -0,0 +1,139 @@
+import logging
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from message_notifier.base import get_message_output
+from message_notifier.client import WARM_SERVER_REQUEST
+from message_notifier.config import (
+    SUPPORTED_MESSAGE_TYPES, WARM_SERVER_PRELOAD_MODULES, WARM_SERVER_REQUEST_TIMEOUT_SECONDS, WARM_SERVER_SOCKET_PATH
+)
+from message_notifier.lazy import preload_lazy_modules
+from message_notifier.main import PROJECT_ROOT, generate_menu, load_credentials
+from message_notifier.singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ MENUBAR PLUGIN WARM SERVER ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+class WarmServer(object):
+    """Resident process that imports the plugin once and forks a worker to render the menu for every client request."""
+
+    def __init__(self, project_root: Path, socket_path: Path):
+        self.project_root = project_root
+        self.socket_path = socket_path
+        self.credentials_path = project_root / "resources" / "credentials" / "private.json"
+        self.credentials = None  # type: Dict
+        self.credentials_mtime = None
+        self.server_socket = None  # type: socket.socket
+
+    def _get_credentials(self) -> Optional[Dict]:
+        # private.json is only re-read when it has been modified since it was last loaded
+        try:
+            credentials_mtime = self.credentials_path.stat().st_mtime
+        except FileNotFoundError:
+            logger.warning(f"Warm server found no credentials at {self.credentials_path}")
+            self.credentials, self.credentials_mtime = None, None
+            return None
+        if self.credentials is None or credentials_mtime != self.credentials_mtime:
+            self.credentials = load_credentials(self.project_root)
+            self.credentials_mtime = credentials_mtime
+            logger.debug(f"Warm server loaded credentials from {self.credentials_path}")
+        return self.credentials
+
+    def _is_running(self) -> bool:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(self.socket_path))
+            return True
+        except OSError:
+            return False
+
+    def _handle_connection(self, connection: socket.socket) -> None:
+        # a client that connects without sending its request must not block the server from accepting other clients
+        connection.settimeout(WARM_SERVER_REQUEST_TIMEOUT_SECONDS)
+        try:
+            request = connection.recv(len(WARM_SERVER_REQUEST))
+        except socket.timeout:
+            request = None
+        if request != WARM_SERVER_REQUEST:
+            connection.close()
+            return
+        connection.settimeout(None)
+
+        # without a response, the client renders the menu in its own process (which reports the missing credentials)
+        credentials = self._get_credentials()
+        if credentials is None:
+            connection.close()
+            return
+
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                self.server_socket.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+                menu = single_flight(self.project_root, lambda: generate_menu(self.project_root, credentials))
+                menu_bytes = ("\n".join(menu) + "\n").encode("utf-8")
+                connection.sendall(f"{len(menu_bytes)}\n".encode("utf-8") + menu_bytes)
+                exit_code = 0
+            except Exception as e:
+                logger.error(f"Warm server worker failed to render the menu with error {repr(e)}")
+            finally:
+                connection.close()
+                logging.shutdown()
+                os._exit(exit_code)
+
+        connection.close()
+
+    def _shutdown(self, signal_number, frame) -> None:
+        raise SystemExit(0)
+
+    def serve_forever(self) -> None:
+        if self._is_running():
+            logger.error(f"Warm server is already running on {self.socket_path}.")
+            sys.exit(1)
+
+        # import everything the workers need before forking so each worker starts with a warm interpreter
+        for message_type in SUPPORTED_MESSAGE_TYPES:
+            get_message_output(message_type)
+        preload_lazy_modules(WARM_SERVER_PRELOAD_MODULES)
+        self._get_credentials()
+
+        # forked workers are reaped automatically
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, self._shutdown)
+
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        self.server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.server_socket.bind(str(self.socket_path))
+            os.chmod(self.socket_path, 0o600)
+            self.server_socket.listen()
+            logger.info(f"Warm server listening on {self.socket_path}")
+
+            while True:
+                try:
+                    connection, _ = self.server_socket.accept()
+                except InterruptedError:
+                    continue
+                self._handle_connection(connection)
+        finally:
+            self.server_socket.close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+
+if __name__ == "__main__":
+    WarmServer(PROJECT_ROOT, WARM_SERVER_SOCKET_PATH).serve_forever()
@@ -0,0 +1,42 @@
+import logging
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from message_notifier.config import SINGLE_FLIGHT_WAIT_SECONDS
+from message_notifier.state import file_lock, get_data_dir, load_json_state, save_json_state
+
+logger = logging.getLogger(__name__)
+
+
+def single_flight(project_root: Path, generate_menu: Callable[[], List[str]],
+                  wait_timeout: float = SINGLE_FLIGHT_WAIT_SECONDS) -> List[str]:
+    # only one plugin process generates the menu at a time; a process that starts while another one is generating waits
+    # for it and reuses the menu it produced instead of hitting every message service a second time
+    data_dir = get_data_dir(project_root)
+    last_menu_path = data_dir / "last_menu.json"
+    requested_at = time.time()
+
+    with file_lock(data_dir / ".refresh.lock", blocking=False) as acquired:
+        if acquired:
+            return _generate_and_share(last_menu_path, generate_menu)
+
+    logger.debug("Menu refresh already in progress, waiting for it to finish.")
+    with file_lock(data_dir / ".refresh.lock", timeout=wait_timeout) as acquired:
+        last_menu = load_json_state(last_menu_path)
+        if last_menu.get("generated_at", 0) >= requested_at:
+            logger.debug("Reusing the menu generated by the concurrent refresh.")
+            return last_menu["menu"]
+
+        if acquired:
+            # the concurrent refresh did not produce a menu (e.g. it failed), so generate one now
+            return _generate_and_share(last_menu_path, generate_menu)
+
+    logger.warning(f"Timed out after {wait_timeout}s waiting for the concurrent menu refresh.")
+    return last_menu.get("menu") or generate_menu()
+
+
+def _generate_and_share(last_menu_path: Path, generate_menu: Callable[[], List[str]]) -> List[str]:
+    menu = generate_menu()
+    save_json_state(last_menu_path, {"generated_at": time.time(), "menu": menu})
+    return menu
@@ -0,0 +1,88 @@
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, IO
+
+logger = logging.getLogger(__name__)
+
+
+def get_data_dir(project_root: Path) -> Path:
+    # create data directory if it does not exist
+    data_dir = project_root / "resources" / "data"
+    if not data_dir.is_dir():
+        data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+@contextmanager
+def atomic_write(file_path: Path, mode: str = "w") -> Iterator[IO]:
+    # write to a temporary file in the same directory and rename it over the target, so that concurrent readers only
+    # ever see the complete old or the complete new file
+    file_descriptor, temp_file_path = tempfile.mkstemp(
+        dir=str(file_path.parent), prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, mode) as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+        raise
+
+
+@contextmanager
+def file_lock(lock_path: Path, blocking: bool = True, timeout: float = None) -> Iterator[bool]:
+    # exclusive advisory lock shared between plugin processes, yields whether the lock was acquired
+    with open(lock_path, "a") as lock_file:
+        start = time.perf_counter()
+        acquired = False
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if not blocking or (timeout is not None and time.perf_counter() - start >= timeout):
+                    break
+                time.sleep(0.05)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def get_lock_path(file_path: Path) -> Path:
+    return file_path.parent / f".{file_path.name}.lock"
+
+
+def load_json_state(state_path: Path) -> Dict:
+    try:
+        with open(state_path, "r") as state_json:
+            return json.load(state_json)
+    except FileNotFoundError:
+        logger.debug(f"File {state_path.name} does not exist, and will be created.")
+    except ValueError as e:
+        logger.warning(f"File {state_path.name} is corrupted and will be replaced: {repr(e)}")
+    return {}
+
+
+def save_json_state(state_path: Path, state: Dict) -> None:
+    with atomic_write(state_path) as state_json:
+        json.dump(state, state_json, indent=2)
+
+
+def update_json_state(state_path: Path, update_state: Callable[[Dict], Dict]) -> Dict:
+    # read, modify and write a state file under a lock so concurrent plugin processes do not lose each other's updates
+    with file_lock(get_lock_path(state_path)):
+        state = update_state(load_json_state(state_path))
+        save_json_state(state_path, state)
+    return state
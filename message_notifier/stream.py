@@ -0,0 +1,143 @@
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from message_notifier.cache import ProviderResult, ProviderResultCache
+from message_notifier.config import (
+    POWER_STATE_CACHE_SECONDS, STREAM_DEFAULT_POLL_INTERVAL, STREAM_POLL_INTERVALS, SUPPORTED_MESSAGE_TYPES
+)
+from message_notifier.main import (
+    PROJECT_ROOT, generate_menu_footer, generate_menubar_icon, get_message_account_results, load_credentials
+)
+from message_notifier.power import PowerThrottle
+from message_notifier.text import CHAT_DB_DATA_VERSION_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# SwiftBar streamable plugins separate each complete menu update with this marker line
+STREAM_MENU_SEPARATOR = "~~~"
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ MENUBAR PLUGIN STREAMABLE MODE • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+class StreamingMenu(object):
+    """Polls every message type in the background and writes a new menu only when the rendered output changes."""
+
+    def __init__(self, project_root: Path, credentials: Dict, poll_intervals: Dict[str, int] = None):
+        self.project_root = project_root
+        self.credentials = credentials
+        self.poll_intervals = poll_intervals or STREAM_POLL_INTERVALS
+
+        # message type -> result of its most recent successful poll, seeded from the on-disk cache of earlier runs
+        self.result_cache = ProviderResultCache(project_root)
+        self.sections = OrderedDict(
+            (message_type, self.result_cache.load(message_type)) for message_type in SUPPORTED_MESSAGE_TYPES
+        )  # type: OrderedDict[str, Optional[ProviderResult]]
+        self.sections_lock = threading.Lock()
+        self.sections_changed = threading.Event()
+        self.stopped = threading.Event()
+
+        # (unread count, standard error) -> menubar icon line, since rendering the icon shells out to macOS tools
+        self.menubar_icons = {}  # type: Dict[Tuple[int, bool], str]
+        self.last_menu = None  # type: List[str]
+
+    def _poll(self, message_type: str) -> None:
+        poll_interval = self.poll_intervals.get(message_type, STREAM_DEFAULT_POLL_INTERVAL)
+
+        while not self.stopped.is_set():
+            try:
+                message_account_result = get_message_account_results(
+                    self.project_root, self.credentials, [message_type]
+                )[0]
+                self.result_cache.save(message_account_result)
+
+                with self.sections_lock:
+                    last_result = self.sections[message_type]
+                    if last_result is None or (
+                            self._get_section(message_account_result) != self._get_section(last_result)):
+                        self.sections[message_type] = message_account_result
+                        self.sections_changed.set()
+
+            except Exception as e:
+                # keep displaying the last successful section and try again at the next poll
+                logger.error(f"Unable to poll {message_type} messages with error {repr(e)}")
+
+            # re-check the power state while waiting, so that polling speeds up again as soon as the user is back
+            poll_start = time.time()
+            while not self.stopped.is_set():
+                remaining = PowerThrottle(self.project_root).get_interval(poll_interval) - (time.time() - poll_start)
+                if remaining <= 0:
+                    break
+                self.stopped.wait(min(remaining, POWER_STATE_CACHE_SECONDS))
+
+    @staticmethod
+    def _get_section(message_account_result: ProviderResult) -> Tuple[List[str], int, bool]:
+        return (
+            message_account_result.console_output,
+            message_account_result.unread_count,
+            message_account_result.standard_error
+        )
+
+    def _get_menubar_icon(self, unread_count: int, standard_error: bool) -> str:
+        if (unread_count, standard_error) not in self.menubar_icons:
+            self.menubar_icons[(unread_count, standard_error)] = generate_menubar_icon(
+                self.project_root, unread_count, standard_error
+            )
+        return self.menubar_icons[(unread_count, standard_error)]
+
+    def _render(self) -> List[str]:
+        unread_count = 0
+        standard_output = []
+        standard_error = False
+        with self.sections_lock:
+            for message_account_result in self.sections.values():
+                if message_account_result is not None:
+                    standard_output.extend(message_account_result.console_output)
+                    unread_count += message_account_result.unread_count
+                    standard_error = standard_error or message_account_result.standard_error
+
+        standard_output.extend(generate_menu_footer(cumulative_stats=True))
+
+        return [self._get_menubar_icon(unread_count, standard_error)] + standard_output
+
+    def run(self) -> None:
+        # the text section is polled by this process for as long as it runs, so chat.db changes can also be detected
+        # with PRAGMA data_version
+        CHAT_DB_DATA_VERSION_ENABLED.set()
+        for message_type in self.sections.keys():
+            threading.Thread(target=self._poll, args=(message_type,), name=f"poll-{message_type}", daemon=True).start()
+
+        # show the cached results of earlier runs right away while the first polls are running
+        if any(message_account_result is not None for message_account_result in self.sections.values()):
+            self.sections_changed.set()
+
+        try:
+            while True:
+                # block without using any CPU until at least one message type has a changed section
+                self.sections_changed.wait()
+                self.sections_changed.clear()
+
+                menu = self._render()
+                if menu != self.last_menu:
+                    if self.last_menu is not None:
+                        sys.stdout.write(f"{STREAM_MENU_SEPARATOR}\n")
+                    sys.stdout.write("\n".join(menu) + "\n")
+                    sys.stdout.flush()
+                    self.last_menu = menu
+        finally:
+            self.stopped.set()
+
+
+def stream() -> None:
+    StreamingMenu(PROJECT_ROOT, load_credentials(PROJECT_ROOT)).run()
+
+
+if __name__ == "__main__":
+    stream()
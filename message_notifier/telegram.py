@@ -0,0 +1,261 @@
+import logging
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from message_notifier.base import BaseConversation, BaseMessage, BaseOutput, register_message_output
+from message_notifier.config import (
+    MAX_GROUP_CHAT_PARTICIPANT_DISPLAY, MAX_LINE_CHARS, PROVIDER_CONNECTION_RETRIES, PROVIDER_DEFAULT_TIMEOUT_SECONDS,
+    PROVIDER_TIMEOUT_SECONDS
+)
+from message_notifier.lazy import pd, telethon_sessions, telethon_sync, telethon_types, telethon_utils
+from message_notifier.power import are_media_previews_deferred
+from message_notifier.utils import encode_thumbnail, generate_output_read, generate_output_unread, sanitize_url
+
+logger = logging.getLogger(__name__)
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ MENUBAR PLUGIN TELEGRAM CLASSES • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+# noinspection DuplicatedCode
+class TelegramMessage(BaseMessage):
+
+    def __init__(self, df_row, max_line_characters, display_string):
+        super().__init__(df_row, max_line_characters, display_string)
+
+        self.id = str(df_row.id)
+        self.cid = str(df_row.cid)
+
+        self.attachment = df_row.attachment
+        self.attachment_type = df_row.attachment_type
+        self.attachment_file = df_row.attachment_file
+        self.attachment_has_thumbnail = df_row.attachment_has_thumbnail
+
+        self.context = f"?{df_row.context}" if df_row.context else ""
+
+        deep_link_unread_message = sanitize_url(f"tg://openmessage{self.context}")
+        self.menubar_msg_display_str = (
+            f"href={deep_link_unread_message} "
+            f"tooltip={deep_link_unread_message} "
+            f"refresh=true "
+        )
+
+        self.system = df_row.system
+
+
+class TelegramConversation(BaseConversation):
+
+    def __init__(self, telegram_message_obj):
+        super().__init__(telegram_message_obj)
+
+    def get_participants_str(self) -> str:
+        if self.is_group_conversation:
+            if len(self.participants) > MAX_GROUP_CHAT_PARTICIPANT_DISPLAY:
+                participants = ', '.join(
+                    participant for participant in list(self.participants)[:MAX_GROUP_CHAT_PARTICIPANT_DISPLAY]
+                )
+                return f"{participants}, ..."
+            else:
+                return f"{', '.join(participant for participant in self.participants)}"
+        else:
+            return f"{''.join(participant for participant in self.participants)}"
+
+
+# noinspection PyTypeChecker,PyShadowingNames
+@register_message_output("telegram")
+class TelegramOutput(BaseOutput):
+
+    requires_network = True
+
+    def __init__(self, credentials: Dict, project_root_dir: Path):
+
+        self.project_root_dir = project_root_dir
+        self.message_type = "telegram"
+
+        self.credentials = credentials
+        self.telegram_username = None
+
+        self.conversations = OrderedDict()
+        self.unread_count = 0
+
+        telegram_deep_link = "tg://"
+        self.unread_display_str = f"href={telegram_deep_link} tooltip={telegram_deep_link} "
+
+        self.standard_error = []
+
+    @staticmethod
+    def _get_message_media(message) -> Tuple[Optional[str], bool]:
+        if are_media_previews_deferred():
+            # skip downloading the media while running on battery or while the user is away
+            return None, False
+
+        media_bytes = BytesIO()
+        message.download_media(file=media_bytes)
+
+        img = Image.open(media_bytes)
+        # img.show()
+        return encode_thumbnail(img)
+
+    def _get_messages(self) -> None:
+
+        with telethon_sync.TelegramClient(
+                telethon_sessions.StringSession(self.credentials.get("session_string")),
+                self.credentials.get("api_id"),
+                self.credentials.get("api_hash"),
+                timeout=PROVIDER_TIMEOUT_SECONDS.get(self.message_type, PROVIDER_DEFAULT_TIMEOUT_SECONDS),
+                connection_retries=PROVIDER_CONNECTION_RETRIES,
+                request_retries=PROVIDER_CONNECTION_RETRIES) as client:  # type: TelegramClient
+
+            telegram_user = client.get_me()  # type: User
+            self.telegram_username = telegram_user.username
+
+            unread_df = pd.DataFrame(
+                columns=[
+                    "id", "cid", "title", "timestamp", "sender", "body", "attachment", "attachment_type",
+                    "attachment_file", "attachment_has_thumbnail", "context", "system"
+                ]
+            )
+
+            for dialog in client.iter_dialogs():  # type: Dialog
+                if not getattr(dialog.entity, "is_private", False) and dialog.unread_count > 0:
+                    self.unread_count += dialog.unread_count
+
+                    unread_count = dialog.unread_count
+                    for message in client.iter_messages(dialog.entity):  # type: Message
+
+                        sender = message.get_sender()  # type: User
+
+                        sender_name = ""
+                        if sender.first_name:
+                            sender_name += f"{sender.first_name} "
+                        if sender.last_name:
+                            sender_name += f"{sender.last_name} "
+                        if sender.username:
+                            sender_name += f"({sender.username})"
+
+                        sender_name = sender_name.strip()
+
+                        setattr(message, "system", False)
+                        if message.action:
+                            if isinstance(message.action, telethon_types.MessageActionContactSignUp):
+                                message.message = f"{sender_name} joined Telegram"
+                                message.system = True
+
+                        media_exists = 0
+                        media_type = None
+                        media_thumb_str = None
+                        media_has_thumbnail = False
+
+                        if message.media:
+
+                            media_exists = 1
+
+                            if isinstance(message.media, telethon_types.MessageMediaDocument):
+                                # telethon mime type reference: https://github.com/LonamiWebs/Telethon/blob/18da855dd4dc787b7aab08fecf3066bac80790ff/telethon/utils.py
+                                media_type = message.media.document.mime_type
+
+                                if "image" in media_type:
+                                    media_thumb_str, media_has_thumbnail = self._get_message_media(message)
+                                elif "video" in media_type:
+                                    # TODO: handle Telegram video attachments
+                                    pass
+                                elif "audio" in media_type:
+                                    # TODO: handle Telegram audio attachments
+                                    # audio_file = None
+                                    # for attribute in message.media.document.attributes:
+                                    #     if isinstance(attribute, DocumentAttributeAudio):
+                                    #         audio_file = attribute
+                                    pass
+
+                            elif isinstance(message.media, telethon_types.MessageMediaPhoto):
+                                if telethon_utils.get_extension(message.media) == ".jpg":
+                                    media_type = "image/jpeg"
+                                media_thumb_str, media_has_thumbnail = self._get_message_media(message)
+
+                        unread_df.loc[len(unread_df)] = [
+                            message.id,
+                            dialog.id,
+                            dialog.name if dialog.is_channel else None,
+                            message.date,
+                            sender_name,
+                            message.message,
+                            media_exists,
+                            media_type,
+                            media_thumb_str,
+                            media_has_thumbnail,
+                            f"user_id={sender.id}&message_id={message.id}",
+                            message.system
+
+                        ]
+
+                        unread_count -= 1
+                        if unread_count == 0:
+                            break
+
+            logger.debug(f"\n{unread_df.to_string()}\n")
+
+            # display messages in reverse order they were received (newest to oldest, top to bottom)
+            # unread_df.sort_values("timestamp", inplace=True, ascending=False)
+
+            for row in unread_df.itertuples():
+
+                # noinspection PyTypeChecker
+                unread_message = TelegramMessage(row, MAX_LINE_CHARS, self.unread_display_str)
+                if unread_message.cid not in self.conversations.keys():
+                    self.conversations[unread_message.cid] = TelegramConversation(unread_message)
+                else:
+                    self.conversations.get(unread_message.cid).add_message(unread_message)
+
+    def get_console_output(self) -> List[str]:
+
+        self._get_messages()
+
+        telegram_deep_link = "tg://"
+
+        standard_output = []
+        if len(self.conversations) == 0:
+
+            read_display_str = (
+                f"href={telegram_deep_link} "
+                f"tooltip={telegram_deep_link} "
+                f"refresh=true "
+            )
+
+            standard_output.extend(
+                generate_output_read(
+                    self.project_root_dir,
+                    self.message_type,
+                    read_display_str,
+                    self.telegram_username
+                )
+            )
+
+        else:
+            arg_dict = {
+                "contentImage": self.project_root_dir / "resources" / "images" / "icon_telegram.png",
+                "sound": "Glass",
+            }
+
+            standard_output.extend(
+                generate_output_unread(
+                    self.project_root_dir,
+                    self.message_type,
+                    self.unread_display_str,
+                    self.unread_count,
+                    self.conversations,
+                    MAX_LINE_CHARS,
+                    arg_dict,
+                    self.telegram_username
+                )
+            )
+
+        if self.standard_error:
+            standard_output.extend(self.standard_error)
+
+        return standard_output
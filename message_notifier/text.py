@@ -0,0 +1,652 @@
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from message_notifier.base import BaseConversation, BaseMessage, BaseOutput, register_message_output
+from message_notifier.config import (
+    ANSI_OFF, ANSI_YELLOW, FONT_ITALIC, HEX_BLUE, MAX_GROUP_CHAT_SEARCH_RESULTS, MAX_LINE_CHARS,
+    TEXT_CHANGE_DETECTION, TEXT_FULL_QUERY_INTERVAL_SECONDS, TEXT_INCREMENTAL_FETCH, TEXT_SEARCH_INDEX,
+    TEXT_SNAPSHOT_MAX_AGE_SECONDS, THUMBNAIL_CACHE
+)
+from message_notifier.contacts import ContactLookup, get_contact_lookup
+from message_notifier.database import ReadOnlyDatabase
+from message_notifier.lazy import np, pd
+from message_notifier.power import are_media_previews_deferred
+from message_notifier.search import MessageSearchIndex, get_search_index_path
+from message_notifier.state import atomic_write, get_data_dir, load_json_state, save_json_state
+from message_notifier.thumbnails import ThumbnailCache, get_thumbnail_cache_path
+from message_notifier.typedstream import decode_attributed_body
+from message_notifier.utils import (
+    encode_attachment, generate_output_read, generate_output_unread, get_subprocess_output
+)
+
+logger = logging.getLogger(__name__)
+
+# columns of the unread messages query (see TextOutput._sqlite_query_get_messages)
+UNREAD_MESSAGE_QUERY_COLUMNS = [
+    "id", "rowid", "cguid", "cid", "groupid", "title", "timestamp", "contact", "attachment", "attchtype", "attchfile",
+    "body", "attbody", "msgrowid", "attchcount"
+]
+
+# chat.db path -> connection kept open to read PRAGMA data_version (see TextOutput._get_chat_db_data_version)
+CHAT_DB_VERSION_CONNECTIONS = {}  # type: Dict[Path, ReadOnlyDatabase]
+CHAT_DB_VERSION_CONNECTIONS_LOCK = threading.Lock()
+# set by processes that refresh more than once (stream mode), the only ones that can compare data_version values read
+# on the same connection; every other process relies on the size and modification time of chat.db and its WAL
+CHAT_DB_DATA_VERSION_ENABLED = threading.Event()
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ MENUBAR PLUGIN iMessage/SMS CLASSES • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+class TextMessage(BaseMessage):
+
+    def __init__(self, df_row, max_line_characters, menubar_msg_display_str, thumbnail_cache: ThumbnailCache = None):
+        super().__init__(df_row, max_line_characters, menubar_msg_display_str)
+
+        self.sender = df_row.sender if df_row.sender else (df_row.org if df_row.org else df_row.contact)
+
+        self.rowid = df_row.rowid
+        self.cguid = df_row.cguid
+        self.groupid = df_row.groupid
+        self.contact = df_row.contact
+        self.number = df_row.number
+        self.attachment = df_row.attachment
+        self.attachment_type = df_row.attchtype
+        # only the first attachment of a message is previewed, but the others are mentioned next to its type
+        if df_row.attchcount and df_row.attchcount > 1:
+            self.attachment_type = f"{self.attachment_type or 'file'} + {df_row.attchcount - 1} more"
+        try:
+            self.attachment_file, self.attachment_has_thumbnail = encode_attachment(df_row, thumbnail_cache)
+        except TypeError:
+            self.attachment_file = None
+        self.org = df_row.org
+
+
+class TextConversation(BaseConversation):
+
+    def __init__(self, text_message_obj, participant_contacts: List[str], contact_lookup: ContactLookup):
+        super().__init__(text_message_obj)
+
+        if "chat" in text_message_obj.cid:
+            self.is_group_conversation = True
+            for participant_contact in participant_contacts:
+                number, sender, org = contact_lookup.get(participant_contact)
+                self.participants.add(sender if sender else (org if org else participant_contact))
+            if not self.title:
+                self.title = f"{ANSI_OFF}Group Message{ANSI_YELLOW}"
+
+
+# noinspection PyShadowingNames,SqlSignature
+@register_message_output("text")
+class TextOutput(BaseOutput):
+
+    def __init__(self, credentials: Dict, project_root_dir: Path):
+
+        self.project_root_dir = project_root_dir
+        self.message_type = "text"
+
+        self.macos_username = credentials.get("username")
+        self.macos_full_name = self._get_macos_full_name(self.macos_username)
+
+        # the Messages and AddressBook locations can be overridden in private.json (e.g. to run against a copy of them
+        # or against the synthetic databases of resources/scripts/generate_text_fixtures.py)
+        user_library_dir = Path(f"/Users/{self.macos_username}/Library")
+        self.chat_db_path = Path(
+            credentials.get("chat_db_path") or user_library_dir / "Messages" / "chat.db"
+        ).expanduser().resolve()
+        self.address_book_dir = Path(
+            credentials.get("address_book_dir") or user_library_dir / "Application Support" / "AddressBook"
+        ).expanduser().resolve()
+        self.chat_db = None  # type: ReadOnlyDatabase
+        self.snapshot_path = get_data_dir(project_root_dir) / "cache" / "text_snapshot.pickle"
+        self.unread_state_path = get_data_dir(project_root_dir) / "cache" / "text_unread_state.pickle"
+
+        # the AddressBook database can be pinned in private.json to skip searching the AddressBook sources
+        self.pinned_contact_db_path = credentials.get("address_book_path")
+        self.contact_lookup_path = get_data_dir(project_root_dir) / "cache" / "contacts.pickle"
+        self.contact_lookup = None  # type: ContactLookup
+        self.group_chat_participants_path = get_data_dir(project_root_dir) / "text_group_chats.json"
+
+        self.conversations = OrderedDict()
+        self.unread_count = 0
+
+        self.standard_error = []
+
+    def _get_chat_db_fingerprint(self) -> List:
+        # new and read messages are written to the WAL first and checkpointed into chat.db later, so the size and
+        # modification time of both files change whenever anything in the database changes
+        fingerprint = []
+        for db_file_path in [self.chat_db_path, self.chat_db_path.with_name(f"{self.chat_db_path.name}-wal")]:
+            try:
+                db_file_stat = db_file_path.stat()
+                fingerprint.append((db_file_stat.st_size, db_file_stat.st_mtime_ns))
+            except FileNotFoundError:
+                fingerprint.append(None)
+
+        # previews skipped while throttled have to be generated once the throttled period ends
+        fingerprint.append(are_media_previews_deferred())
+        return fingerprint
+
+    def _get_chat_db_data_version(self) -> Optional[int]:
+        # PRAGMA data_version only changes when another connection commits, and its value is only comparable between
+        # calls on the same connection, so one connection is kept open for the lifetime of the process (and none is
+        # opened by processes that exit after a single refresh)
+        if not CHAT_DB_DATA_VERSION_ENABLED.is_set():
+            return None
+
+        with CHAT_DB_VERSION_CONNECTIONS_LOCK:
+            chat_db = CHAT_DB_VERSION_CONNECTIONS.get(self.chat_db_path)
+            if chat_db is None:
+                chat_db = ReadOnlyDatabase(self.chat_db_path, check_same_thread=False)
+                CHAT_DB_VERSION_CONNECTIONS[self.chat_db_path] = chat_db
+            return chat_db.execute("data_version", "PRAGMA data_version")[0][0]
+
+    def _load_unchanged_snapshot(self, fingerprint: List, data_version: Optional[int]) -> Optional[Dict]:
+        try:
+            with open(self.snapshot_path, "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.debug(f"Discarding unreadable iMessage/SMS snapshot with error {repr(e)}")
+            return None
+
+        if snapshot.get("fingerprint") != fingerprint:
+            return None
+        if (data_version is not None and snapshot.get("pid") == os.getpid()
+                and snapshot.get("data_version") != data_version):
+            return None
+        if time.time() - snapshot.get("rendered_at", 0) > TEXT_SNAPSHOT_MAX_AGE_SECONDS:
+            return None
+        return snapshot
+
+    def _save_snapshot(self, fingerprint: List, data_version: Optional[int], console_output: List[str]) -> None:
+        snapshot = {
+            "fingerprint": fingerprint,
+            "pid": os.getpid(),
+            "data_version": data_version,
+            "rendered_at": time.time(),
+            "conversations": self.conversations,
+            "unread_count": self.unread_count,
+            "console_output": console_output,
+        }
+        try:
+            snapshot_bytes = pickle.dumps(snapshot)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.debug(f"Unable to save iMessage/SMS snapshot with error {repr(e)}")
+            return
+
+        if not self.snapshot_path.parent.is_dir():
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.snapshot_path, "wb") as snapshot_file:
+            snapshot_file.write(snapshot_bytes)
+
+    def _get_contact_db_paths(self) -> List[Path]:
+
+        if self.pinned_contact_db_path:
+            return [Path(self.pinned_contact_db_path).expanduser().resolve()]
+
+        # contacts can be spread across the local AddressBook database and one database per account (iCloud, Google,
+        # Exchange, etc.) in the Sources directory, so all of them are included in the contact lookup
+        contact_db_paths = [self.address_book_dir / "AddressBook-v22.abcddb"]
+        contact_db_paths.extend(sorted(self.address_book_dir.glob("Sources/*/AddressBook-v22.abcddb")))
+        return [contact_db_path for contact_db_path in contact_db_paths if contact_db_path.is_file()]
+
+    def _resolve_contacts(self, messages_df: "pd.DataFrame") -> None:
+        # add the number, sender and org columns from the contact lookup to a dataframe with a contact column
+        resolved_contacts = [self.contact_lookup.get(contact) for contact in messages_df["contact"]]
+        messages_df["number"] = [resolved_contact[0] for resolved_contact in resolved_contacts]
+        messages_df["sender"] = [resolved_contact[1] for resolved_contact in resolved_contacts]
+        messages_df["org"] = [resolved_contact[2] for resolved_contact in resolved_contacts]
+
+    # noinspection SqlResolve
+    @staticmethod
+    def _sqlite_query_get_messages(incremental: bool = False) -> str:
+        # the unread messages are selected through the is_read/is_from_me index first, so that the chat, handle and
+        # attachment joins (and the attributedBody column, which is only needed when text is NULL) are only read for
+        # those rows; the incremental query only returns messages newer than the message ROWID passed as its parameter
+        return f"""
+            WITH unread_messages AS (
+                SELECT ROWID as msg_rowid 
+                FROM message 
+                WHERE is_read = 0 
+                    AND is_from_me = 0 
+                    {'AND ROWID > ? ' if incremental else ''}
+            )
+            SELECT 
+                msg.guid as id, 
+                cht.rowid as rowid, 
+                cht.guid as cguid, 
+                cht.chat_identifier as cid, 
+                cht.group_id as grp, 
+                cht.display_name as title, 
+                strftime(
+                    '%Y-%m-%d %H:%M:%S', 
+                    datetime(msg.date/1000000000 + strftime('%s', '2001-01-01'), 'unixepoch', 'localtime')
+                ) as timestamp, 
+                CASE 
+                    WHEN instr(hdl.id, '@') > 0 
+                    THEN hdl.id 
+                    ELSE substr(hdl.id, -10) 
+                END contact, 
+                msg.cache_has_attachments, 
+                atc.mime_type, 
+                atc.filename, 
+                replace(replace(msg.text, CHAR(10), ' '), CHAR(13), ' ') as body,
+                CASE 
+                    WHEN msg.text IS NULL 
+                    THEN msg.attributedBody 
+                END as att_body, 
+                msg.ROWID as msg_rowid, 
+                (
+                    SELECT count(*) 
+                    FROM message_attachment_join maj 
+                    WHERE maj.message_id = msg.ROWID
+                ) as attachment_count 
+            FROM unread_messages unr 
+            INNER JOIN message msg 
+                ON msg.ROWID = unr.msg_rowid 
+            INNER JOIN handle hdl 
+                ON hdl.ROWID = msg.handle_id 
+            LEFT JOIN chat_message_join cmj 
+                ON cmj.message_id = msg.ROWID 
+            LEFT JOIN chat cht 
+                ON cht.rowid = cmj.chat_id 
+            LEFT JOIN attachment atc 
+                ON atc.ROWID = (
+                    SELECT min(maj.attachment_id) 
+                    FROM message_attachment_join maj 
+                    WHERE maj.message_id = msg.ROWID 
+                        AND msg.cache_has_attachments = 1
+                ) 
+            WHERE msg.text != 'NULL' 
+                OR length(msg.attributedBody) > 0 
+            ORDER BY msg.date
+        """
+
+    # noinspection SqlResolve
+    @staticmethod
+    def _sqlite_query_get_unread_message_rowids() -> str:
+        # the message ROWIDs are passed as a single JSON array parameter so that any number of them fit in one query,
+        # and the unary + keeps SQLite from scanning all unread messages through the is_read index instead of looking
+        # up only these ROWIDs
+        return """
+            SELECT ROWID 
+            FROM message 
+            WHERE ROWID IN (SELECT value FROM json_each(?)) 
+                AND +is_read = 0
+        """
+
+    # noinspection SqlResolve
+    @staticmethod
+    def _sqlite_query_get_group_chat_last_message_dates() -> str:
+        # the group chat identifiers are passed as a single JSON array parameter
+        return """
+            SELECT 
+                cht.chat_identifier as cid, 
+                max(cmj.message_date) as last_message_date 
+            FROM chat cht 
+            INNER JOIN chat_message_join cmj 
+                ON cmj.chat_id = cht.rowid 
+            WHERE cht.chat_identifier IN (SELECT value FROM json_each(?)) 
+            GROUP BY cht.chat_identifier
+        """
+
+    # noinspection SqlResolve
+    @staticmethod
+    def _sqlite_query_get_group_chat_participants() -> str:
+        # the senders of the most recent messages of every group chat in the JSON array parameter, ranked per chat by
+        # the message date stored in chat_message_join; the CROSS JOIN keeps SQLite from reordering the joins, so that
+        # only the messages of these chats are read through the chat_id/message_date index instead of scanning all of
+        # chat_message_join. The window still sorts those messages in a temporary B-tree (see
+        # resources/scripts/check_text_query_plans.py), and no index can be added to avoid it since chat.db belongs to
+        # Messages and is only opened read-only
+        return """
+            WITH ranked_messages AS (
+                SELECT 
+                    cht.chat_identifier as cid, 
+                    cmj.message_date, 
+                    hdl.id as handle, 
+                    row_number() OVER (PARTITION BY cmj.chat_id ORDER BY cmj.message_date DESC) as message_rank 
+                FROM chat cht 
+                CROSS JOIN chat_message_join cmj 
+                INNER JOIN message msg 
+                    ON msg.rowid = cmj.message_id 
+                INNER JOIN handle hdl 
+                    ON hdl.ROWID = msg.handle_id 
+                WHERE cht.chat_identifier IN (SELECT value FROM json_each(?)) 
+                    AND cmj.chat_id = cht.rowid 
+            )
+            SELECT 
+                cid, 
+                CASE 
+                    WHEN instr(handle, '@') > 0 
+                    THEN handle 
+                    ELSE substr(handle, -10) 
+                END contact 
+            FROM ranked_messages 
+            WHERE message_rank <= ? 
+            ORDER BY cid, message_date DESC
+        """
+
+    @staticmethod
+    def _get_macos_full_name(macos_username: str) -> str:
+
+        output, exit_code = get_subprocess_output(["id", "-F", f"{macos_username}"], return_stdout_and_exit_code=True)
+        if exit_code == 0:
+            return output.strip()
+        else:
+            return macos_username
+
+    @staticmethod
+    def _decode_attributed_body(attributed_body: Optional[bytes]) -> Optional[str]:
+        # starting with macOS Ventura, the text of many messages is only stored in the attributedBody column as a
+        # typedstream archive of an NSAttributedString
+        return decode_attributed_body(attributed_body)
+
+    # noinspection PyTypeChecker,PyUnresolvedReferences
+    def _query_unread_messages(self, watermark: int = None) -> "pd.DataFrame":
+
+        if watermark is None:
+            unread_rows = self.chat_db.execute("unread_messages", self._sqlite_query_get_messages())
+        else:
+            unread_rows = self.chat_db.execute(
+                "new_unread_messages", self._sqlite_query_get_messages(incremental=True), (watermark,)
+            )
+
+        unread_df = pd.DataFrame(unread_rows, columns=UNREAD_MESSAGE_QUERY_COLUMNS)
+
+        logging.debug(f"\n{unread_df.to_string()}\n")
+
+        # decode the NSMutableAttributedString stored in the attbody column to a human-readable string
+        unread_df["attbody"] = unread_df["attbody"].apply(self._decode_attributed_body)
+
+        # replace the contents of the body column with the contents of the attbody column when the body column is empty
+        unread_df["body"] = np.where(~unread_df["body"].isnull(), unread_df["body"], unread_df["attbody"])
+
+        # drop the attbody column after its contents have been copied to the body column
+        unread_df.drop("attbody", axis=1, inplace=True)
+
+        # remove duplicate entries from macOS messages sqlite database (it seems that in macOS Monterey sometimes
+        # there are duplicate rows for the same text which ONLY differ in the attached file name)
+        unread_df = unread_df.drop_duplicates(subset="id")
+
+        # remove rows that do not have a rowid
+        unread_df = unread_df[unread_df["rowid"].notna()]
+
+        unread_df.reset_index(drop=True, inplace=True)
+
+        logging.debug(f"\n{unread_df.to_string()}\n")
+
+        return unread_df
+
+    def _get_group_chat_participants(self, group_chat_ids: List[str]) -> Dict[str, List[str]]:
+        # the participants of a group chat are only queried again once it has received new messages
+        participants_state = load_json_state(self.group_chat_participants_path)
+
+        last_message_dates = dict(self.chat_db.execute(
+            "group_chat_last_message_dates",
+            self._sqlite_query_get_group_chat_last_message_dates(),
+            (json.dumps(group_chat_ids),)
+        ))
+
+        stale_group_chat_ids = [
+            group_chat_id for group_chat_id in group_chat_ids
+            if (participants_state.get(group_chat_id, {}).get("last_message_date")
+                != last_message_dates.get(group_chat_id))
+        ]
+        saved_group_chat_count = len(participants_state)
+        # only the currently unread group chats are kept, so that the state does not grow with every chat ever unread
+        participants_state = {
+            group_chat_id: participants_state[group_chat_id]
+            for group_chat_id in group_chat_ids if group_chat_id in participants_state
+        }
+        if stale_group_chat_ids:
+            participant_rows = self.chat_db.execute(
+                "group_chat_participants",
+                self._sqlite_query_get_group_chat_participants(),
+                (json.dumps(stale_group_chat_ids), MAX_GROUP_CHAT_SEARCH_RESULTS)
+            )
+            participant_contacts = {}  # type: Dict[str, List[str]]
+            for group_chat_id, participant_contact in participant_rows:
+                participant_contacts.setdefault(group_chat_id, []).append(participant_contact)
+
+            for group_chat_id in stale_group_chat_ids:
+                participants_state[group_chat_id] = {
+                    "last_message_date": last_message_dates.get(group_chat_id),
+                    "contacts": participant_contacts.get(group_chat_id, [])
+                }
+        if stale_group_chat_ids or len(participants_state) != saved_group_chat_count:
+            save_json_state(self.group_chat_participants_path, participants_state)
+
+        logger.debug(
+            f"Queried participants of {len(stale_group_chat_ids)} of {len(group_chat_ids)} unread group chats."
+        )
+        return {
+            group_chat_id: participants_state[group_chat_id]["contacts"] for group_chat_id in group_chat_ids
+        }
+
+    def _load_unread_state(self) -> Optional[Dict]:
+        try:
+            with open(self.unread_state_path, "rb") as unread_state_file:
+                return pickle.load(unread_state_file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.debug(f"Discarding unreadable iMessage/SMS unread state with error {repr(e)}")
+            return None
+
+    def _save_unread_state(self, unread_state: Dict) -> None:
+        if not self.unread_state_path.parent.is_dir():
+            self.unread_state_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.unread_state_path, "wb") as unread_state_file:
+            pickle.dump(unread_state, unread_state_file)
+
+    # noinspection PyUnresolvedReferences
+    def _get_unread_messages(self) -> "pd.DataFrame":
+
+        # read before querying, so that messages arriving during the query are fetched again (and deduplicated) later
+        max_message_rowid = self.chat_db.execute("max_message_rowid", "SELECT max(ROWID) FROM message")[0][0] or 0
+
+        now = time.time()
+        unread_state = self._load_unread_state() if TEXT_INCREMENTAL_FETCH else None
+        if (unread_state is None
+                or now - unread_state["full_query_at"] >= TEXT_FULL_QUERY_INTERVAL_SECONDS
+                # unread messages cached before the columns of the query changed cannot be combined with new ones
+                or "attchcount" not in unread_state["unread_df"].columns
+                # the message ROWIDs only go backwards if the database was replaced (e.g. restored from a backup)
+                or max_message_rowid < unread_state["watermark"]):
+            logger.debug("Running full iMessage/SMS unread query.")
+            unread_df = self._query_unread_messages()
+            full_query_at = now
+
+        else:
+            cached_unread_df = unread_state["unread_df"]
+
+            # drop cached messages that have been read since the last run (e.g. on another device)
+            still_unread_message_rowids = {row[0] for row in self.chat_db.execute(
+                "unread_message_rowids",
+                self._sqlite_query_get_unread_message_rowids(),
+                (json.dumps([int(message_rowid) for message_rowid in cached_unread_df["msgrowid"]]),)
+            )}
+            cached_unread_df = cached_unread_df[cached_unread_df["msgrowid"].isin(still_unread_message_rowids)]
+
+            new_unread_df = self._query_unread_messages(unread_state["watermark"])
+            logger.debug(
+                f"Fetched {len(new_unread_df)} new iMessage/SMS messages since ROWID {unread_state['watermark']} "
+                f"and kept {len(cached_unread_df)} of {len(unread_state['unread_df'])} cached unread messages."
+            )
+
+            unread_df = pd.concat([cached_unread_df, new_unread_df], ignore_index=True)
+            unread_df = unread_df.drop_duplicates(subset="id", keep="last")
+            unread_df = unread_df.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
+            full_query_at = unread_state["full_query_at"]
+
+        if TEXT_INCREMENTAL_FETCH:
+            self._save_unread_state({
+                "watermark": max_message_rowid,
+                "full_query_at": full_query_at,
+                "unread_df": unread_df
+            })
+
+        return unread_df
+
+    # noinspection PyTypeChecker,PyUnresolvedReferences
+    def _get_messages(self) -> None:
+
+        self.contact_lookup = get_contact_lookup(self._get_contact_db_paths(), self.contact_lookup_path)
+        unread_df = self._get_unread_messages()
+        # senders are resolved after the cached and new unread messages are combined, so renamed contacts are updated
+        self._resolve_contacts(unread_df)
+
+        # display messages in reverse order they were received (newest to oldest, top to bottom)
+        # unread_df.sort_values("timestamp", inplace=True, ascending=False)
+
+        group_chat_participants = self._get_group_chat_participants(
+            [chat_id for chat_id in unread_df["cid"].unique() if "chat" in chat_id]
+        )
+
+        thumbnail_cache = self._open_thumbnail_cache()
+        try:
+            for row in unread_df.itertuples():
+                self._add_message(row, group_chat_participants, thumbnail_cache)
+        finally:
+            if thumbnail_cache:
+                thumbnail_cache.close()
+
+        self.unread_count = sum([conversation.get_message_count() for conversation in self.conversations.values()])
+
+    def _open_thumbnail_cache(self) -> Optional[ThumbnailCache]:
+        if not THUMBNAIL_CACHE:
+            return None
+        try:
+            return ThumbnailCache(get_thumbnail_cache_path(self.project_root_dir))
+        except sqlite3.Error as e:
+            logger.warning(f"Unable to open the attachment thumbnail cache with error {repr(e)}")
+            return None
+
+    def _add_message(self, row, group_chat_participants: Dict[str, List[str]],
+                     thumbnail_cache: Optional[ThumbnailCache]) -> None:
+        if "chat" in row.cid:
+            open_script = "open_text_messages.sh"
+            script_params = ""
+        else:
+            open_script = "open_text_messages_to_conversation.sh"
+            script_params = f"param1={row.cid}"
+
+        deep_link_conversation = (
+            f"bash={str(self.project_root_dir)}/resources/scripts/{open_script} {script_params} "
+            f"terminal=false "
+            f"tooltip='Open Messages to this conversation' "
+            f"refresh=true "
+        )
+
+        text_message = TextMessage(
+            row,
+            MAX_LINE_CHARS,
+            deep_link_conversation,
+            thumbnail_cache
+        )
+        if text_message.cid not in self.conversations.keys():
+            self.conversations[text_message.cid] = TextConversation(
+                text_message,
+                group_chat_participants.get(text_message.cid, []),
+                self.contact_lookup
+            )
+        else:
+            self.conversations.get(text_message.cid).add_message(text_message)
+
+    def _update_search_index(self) -> None:
+        # only a bounded number of new messages is indexed per refresh, the search itself catches up on the rest
+        try:
+            with MessageSearchIndex(get_search_index_path(self.project_root_dir), self.chat_db_path) as search_index:
+                search_index.update(self.chat_db, max_batches=1)
+        except sqlite3.Error as e:
+            logger.warning(f"Unable to update the iMessage/SMS search index with error {repr(e)}")
+
+    def get_console_output(self) -> List[str]:
+
+        fingerprint, data_version = None, None
+        if TEXT_CHANGE_DETECTION:
+            fingerprint = self._get_chat_db_fingerprint()
+            data_version = self._get_chat_db_data_version()
+            snapshot = self._load_unchanged_snapshot(fingerprint, data_version)
+            if snapshot:
+                logger.debug("Messages database unchanged, reusing last iMessage/SMS conversations.")
+                self.conversations = snapshot["conversations"]
+                self.unread_count = snapshot["unread_count"]
+                return snapshot["console_output"]
+
+        self.chat_db = ReadOnlyDatabase(self.chat_db_path)
+        try:
+            self._get_messages()
+            if TEXT_SEARCH_INDEX:
+                self._update_search_index()
+        finally:
+            self.chat_db.close()
+
+        display_str = (
+            f"bash={str(self.project_root_dir)}/resources/scripts/open_text_messages.sh "
+            f"terminal=false "
+            f"tooltip='Open Messages' "
+            f"refresh=true "
+        )
+
+        standard_output = []
+        if self.unread_count == 0:
+            standard_output.extend(
+                generate_output_read(
+                    self.project_root_dir,
+                    self.message_type,
+                    display_str,
+                    self.macos_username,
+                    user=self.macos_full_name
+                )
+            )
+
+        else:
+            arg_dict = {
+                "contentImage": self.project_root_dir / "resources" / "images" / "icon_text.png",
+                "sound": "Glass",
+            }
+
+            standard_output.extend(
+                generate_output_unread(
+                    self.project_root_dir,
+                    self.message_type,
+                    display_str,
+                    self.unread_count,
+                    self.conversations,
+                    MAX_LINE_CHARS,
+                    arg_dict,
+                    self.macos_username,
+                    user=self.macos_full_name
+                )
+            )
+
+        if TEXT_SEARCH_INDEX:
+            standard_output.append(
+                f"Search {self.message_type.capitalize()} messages… | font={FONT_ITALIC} color={HEX_BLUE} "
+                f"bash='{str(self.project_root_dir)}/resources/scripts/search_text_messages.sh' "
+                f"param1='{sys.executable}' "
+                f"terminal=false "
+                f"tooltip='Search recent messages' "
+            )
+
+        if self.standard_error:
+            standard_output.extend(self.standard_error)
+        elif TEXT_CHANGE_DETECTION:
+            self._save_snapshot(fingerprint, data_version, standard_output)
+
+        return standard_output
@@ -0,0 +1,250 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from message_notifier.config import SQLITE_BUSY_TIMEOUT_SECONDS, THUMBNAIL_CACHE_MAX_BYTES, THUMBNAIL_PIXEL_SIZE
+from message_notifier.state import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# increase whenever attachment thumbnails are generated differently, so that thumbnails cached by a previous version
+# are not shown anymore (they are evicted like any other unused thumbnail)
+THUMBNAIL_FORMAT_VERSION = 3
+# approximate size of the row and index entries stored in addition to the base64 string of each thumbnail
+THUMBNAIL_ROW_OVERHEAD_BYTES = 256
+CONTENT_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class ThumbnailCacheStats(object):
+
+    def __init__(self):
+        self.hits = 0
+        self.content_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_counters(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "content_hits": self.content_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.content_hits} content hits, {self.misses} misses, {self.evictions} evictions"
+        )
+
+
+# hits, misses and evictions of the thumbnail cache in this process since the last reset_thumbnail_cache_stats() (the
+# totals are kept in the cache database)
+THUMBNAIL_CACHE_STATS = ThumbnailCacheStats()
+THUMBNAIL_CACHE_STATS_LOCK = threading.Lock()
+
+
+def reset_thumbnail_cache_stats() -> None:
+    with THUMBNAIL_CACHE_STATS_LOCK:
+        for counter in THUMBNAIL_CACHE_STATS.get_counters():
+            setattr(THUMBNAIL_CACHE_STATS, counter, 0)
+
+
+def get_thumbnail_cache_path(project_root: Path) -> Path:
+    return get_data_dir(project_root) / "cache" / "thumbnails.db"
+
+
+def get_content_hash(file_path: Path) -> str:
+    content_hash = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as attachment_file:
+        for chunk in iter(lambda: attachment_file.read(CONTENT_HASH_CHUNK_BYTES), b""):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+class ThumbnailCache(object):
+    """Persistent cache of the base64 attachment thumbnails created by utils.encode_attachment.
+
+    Thumbnails are stored by content (a hash of the attachment file, its MIME type and the thumbnail format), and each
+    attachment file is mapped to its content by path, size, modification time and MIME type. A file is therefore only
+    hashed the first time it is seen, and a photo forwarded into several conversations is only decoded once. The least
+    recently shown thumbnails are evicted once the cache grows larger than max_bytes.
+    """
+
+    def __init__(self, cache_path: Path, max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES):
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+
+        if not self.cache_path.parent.is_dir():
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(cache_path), timeout=SQLITE_BUSY_TIMEOUT_SECONDS)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS thumbnail (
+                content_key TEXT PRIMARY KEY,
+                thumb TEXT,
+                has_image_thumbnail INTEGER NOT NULL,
+                byte_size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS thumbnail_idx_last_used ON thumbnail (last_used);
+            CREATE TABLE IF NOT EXISTS thumbnail_file (
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                mime_type TEXT NOT NULL,
+                content_key TEXT NOT NULL,
+                PRIMARY KEY (path, size, mtime_ns, mime_type)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS thumbnail_file_idx_content_key ON thumbnail_file (content_key);
+            CREATE TABLE IF NOT EXISTS thumbnail_cache_stats (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+
+    @staticmethod
+    def _get_file_key(file_path: Path, mime_type: str) -> Tuple[str, int, int, str]:
+        file_stat = file_path.stat()
+        return str(file_path), file_stat.st_size, file_stat.st_mtime_ns, mime_type or ""
+
+    @staticmethod
+    def _get_content_key(content_hash: str, mime_type: str) -> str:
+        return f"{content_hash}:{mime_type or ''}:{THUMBNAIL_PIXEL_SIZE}:{THUMBNAIL_FORMAT_VERSION}"
+
+    def _record(self, counter: str, count: int = 1) -> None:
+        with THUMBNAIL_CACHE_STATS_LOCK:
+            setattr(THUMBNAIL_CACHE_STATS, counter, getattr(THUMBNAIL_CACHE_STATS, counter) + count)
+        self.connection.execute(
+            "INSERT INTO thumbnail_cache_stats (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+            (counter, count)
+        )
+
+    def _use_thumbnail(self, content_key: str) -> Optional[Tuple[Optional[str], bool]]:
+        thumbnail_row = self.connection.execute(
+            "SELECT thumb, has_image_thumbnail FROM thumbnail WHERE content_key = ?", (content_key,)
+        ).fetchone()
+        if thumbnail_row:
+            self.connection.execute(
+                "UPDATE thumbnail SET last_used = ? WHERE content_key = ?", (time.time(), content_key)
+            )
+            return thumbnail_row[0], bool(thumbnail_row[1])
+        return None
+
+    def _map_file(self, file_key: Tuple[str, int, int, str], content_key: str) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO thumbnail_file (path, size, mtime_ns, mime_type, content_key) "
+            "VALUES (?, ?, ?, ?, ?)",
+            file_key + (content_key,)
+        )
+
+    def _evict(self) -> None:
+        total_bytes = self.connection.execute("SELECT coalesce(sum(byte_size), 0) FROM thumbnail").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        evicted_content_keys = []
+        for content_key, byte_size in self.connection.execute(
+            "SELECT content_key, byte_size FROM thumbnail ORDER BY last_used"
+        ).fetchall():
+            if total_bytes <= self.max_bytes:
+                break
+            evicted_content_keys.append((content_key,))
+            total_bytes -= byte_size
+
+        self.connection.executemany("DELETE FROM thumbnail WHERE content_key = ?", evicted_content_keys)
+        self.connection.executemany("DELETE FROM thumbnail_file WHERE content_key = ?", evicted_content_keys)
+        self._record("evictions", len(evicted_content_keys))
+        logger.debug(f"Evicted {len(evicted_content_keys)} attachment thumbnails from the thumbnail cache.")
+
+    def get(self, file_path: Path, mime_type: str, hash_contents: bool = True) -> Optional[Tuple[Optional[str], bool]]:
+        """Returns the cached thumbnail string and image thumbnail flag of an attachment, or None if not cached.
+
+        Without hash_contents, only files that were seen before under the same path, size and modification time are
+        found, which never requires reading the attachment itself. A cache that cannot be read (e.g. while it is locked
+        by another process for too long) only costs the thumbnail being created again.
+        """
+        return self._get(file_path, mime_type, hash_contents)[0]
+
+    def _get(self, file_path: Path, mime_type: str,
+             hash_contents: bool) -> Tuple[Optional[Tuple[Optional[str], bool]], Optional[str]]:
+        # also returns the content key if the attachment was hashed, so that a miss does not have to hash it again
+        file_key = self._get_file_key(file_path, mime_type)
+        content_key = None
+        try:
+            with self.connection:
+                content_key_row = self.connection.execute(
+                    "SELECT content_key FROM thumbnail_file "
+                    "WHERE path = ? AND size = ? AND mtime_ns = ? AND mime_type = ?",
+                    file_key
+                ).fetchone()
+                if content_key_row:
+                    thumbnail = self._use_thumbnail(content_key_row[0])
+                    if thumbnail:
+                        self._record("hits")
+                        return thumbnail, None
+
+                if hash_contents:
+                    content_key = self._get_content_key(get_content_hash(file_path), mime_type)
+                    thumbnail = self._use_thumbnail(content_key)
+                    if thumbnail:
+                        self._map_file(file_key, content_key)
+                        self._record("content_hits")
+                        return thumbnail, content_key
+        except sqlite3.Error as e:
+            logger.warning(f"Unable to read the thumbnail cache with error {repr(e)}")
+        return None, content_key
+
+    def put(self, file_path: Path, mime_type: str, thumb_str: Optional[str], has_image_thumbnail: bool,
+            content_key: str = None) -> None:
+        # the attachment is only hashed if its content key was not already computed by get
+        file_key = self._get_file_key(file_path, mime_type)
+        if content_key is None:
+            content_key = self._get_content_key(get_content_hash(file_path), mime_type)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO thumbnail (content_key, thumb, has_image_thumbnail, byte_size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (content_key, thumb_str, int(has_image_thumbnail),
+                 len(thumb_str or "") + THUMBNAIL_ROW_OVERHEAD_BYTES, time.time())
+            )
+            self._map_file(file_key, content_key)
+            self._evict()
+
+    def get_or_create(self, file_path: Path, mime_type: str,
+                      create_thumbnail: Callable[[], Tuple[Optional[str], bool]]) -> Tuple[Optional[str], bool]:
+        thumbnail, content_key = self._get(file_path, mime_type, hash_contents=True)
+        if thumbnail:
+            return thumbnail
+
+        thumb_str, has_image_thumbnail = create_thumbnail()
+        # the thumbnail is returned even if it cannot be cached (e.g. when the attachment was removed in the meantime)
+        try:
+            with self.connection:
+                self._record("misses")
+            self.put(file_path, mime_type, thumb_str, has_image_thumbnail, content_key=content_key)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Unable to write to the thumbnail cache with error {repr(e)}")
+        return thumb_str, has_image_thumbnail
+
+    def get_stats(self) -> Dict[str, int]:
+        # totals over all processes since the cache was created
+        stats = dict(self.connection.execute("SELECT key, value FROM thumbnail_cache_stats").fetchall())
+        stats["thumbnails"], stats["bytes"] = self.connection.execute(
+            "SELECT count(*), coalesce(sum(byte_size), 0) FROM thumbnail"
+        ).fetchone()
+        return stats
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ThumbnailCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,242 @@
+import logging
+import struct
+from typing import List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# typedstream (the NSArchiver format of the message.attributedBody column) tags, as unsigned bytes
+TAG_INTEGER_2 = 0x81
+TAG_INTEGER_4 = 0x82
+TAG_FLOATING_POINT = 0x83
+TAG_NEW = 0x84
+TAG_NIL = 0x85
+TAG_END_OF_OBJECT = 0x86
+# references to earlier shared strings/objects are encoded as signed integers counting up from -110 (0x92)
+FIRST_REFERENCE_NUMBER = -110
+
+TYPEDSTREAM_SIGNATURE = b"streamtyped"
+STRING_CLASS_NAMES = {b"NSString", b"NSMutableString"}
+
+# nested objects deeper than this are treated as a corrupt blob instead of recursing until the stack overflows
+MAX_OBJECT_DEPTH = 32
+
+
+class TypedStreamError(ValueError):
+    pass
+
+
+class _StringPayloadFound(Exception):
+
+    def __init__(self, payload: memoryview):
+        super().__init__()
+        self.payload = payload
+
+
+class _TypedStreamClass(object):
+
+    def __init__(self, name: bytes, version: int, superclass: Optional["_TypedStreamClass"]):
+        self.name = name
+        self.version = version
+        self.superclass = superclass
+
+    def is_string_class(self) -> bool:
+        typedstream_class = self
+        while typedstream_class is not None:
+            if typedstream_class.name in STRING_CLASS_NAMES:
+                return True
+            typedstream_class = typedstream_class.superclass
+        return False
+
+
+class TypedStreamReader(object):
+    """Streaming reader for the typedstream archives that macOS stores in the message.attributedBody column.
+
+    Only as much of the archive is read as is needed to reach the first string payload (the text of the root
+    NSAttributedString), and every read works on slices of a memoryview of the original BLOB, so nothing is copied or
+    decoded except the text itself.
+    """
+
+    def __init__(self, data: Union[bytes, memoryview]):
+        self.data = data if isinstance(data, memoryview) else memoryview(data)
+        self.position = 0
+        self.shared_strings = []  # type: List[memoryview]
+        self.shared_objects = []  # type: List[Optional[_TypedStreamClass]]
+
+    def _read_bytes(self, length: int) -> memoryview:
+        if length < 0 or self.position + length > len(self.data):
+            raise TypedStreamError(f"unexpected end of typedstream at byte {self.position}")
+        data = self.data[self.position:self.position + length]
+        self.position += length
+        return data
+
+    def _read_head(self) -> int:
+        if self.position >= len(self.data):
+            raise TypedStreamError(f"unexpected end of typedstream at byte {self.position}")
+        head = self.data[self.position]
+        self.position += 1
+        return head
+
+    def _read_integer(self, head: int = None, signed: bool = True) -> int:
+        head = self._read_head() if head is None else head
+        if head == TAG_INTEGER_2:
+            return struct.unpack("<h" if signed else "<H", self._read_bytes(2))[0]
+        elif head == TAG_INTEGER_4:
+            return struct.unpack("<i" if signed else "<I", self._read_bytes(4))[0]
+        elif head in (TAG_FLOATING_POINT, TAG_NEW, TAG_NIL, TAG_END_OF_OBJECT):
+            raise TypedStreamError(f"unexpected tag {head:#x} instead of an integer at byte {self.position - 1}")
+        return head - 0x100 if signed and head > 0x7f else head
+
+    def _read_reference(self, head: int, table: list):
+        reference_index = self._read_integer(head) - FIRST_REFERENCE_NUMBER
+        if not 0 <= reference_index < len(table):
+            raise TypedStreamError(f"invalid reference {reference_index} at byte {self.position}")
+        return table[reference_index]
+
+    def _read_unshared_string(self) -> memoryview:
+        return self._read_bytes(self._read_integer(signed=False))
+
+    def _read_shared_string(self) -> Optional[memoryview]:
+        head = self._read_head()
+        if head == TAG_NIL:
+            return None
+        elif head == TAG_NEW:
+            shared_string = self._read_unshared_string()
+            self.shared_strings.append(shared_string)
+            return shared_string
+        return self._read_reference(head, self.shared_strings)
+
+    def _read_class(self) -> Optional[_TypedStreamClass]:
+        head = self._read_head()
+        if head == TAG_NIL:
+            return None
+        elif head == TAG_NEW:
+            class_name = self._read_shared_string()
+            if class_name is None:
+                raise TypedStreamError(f"missing class name at byte {self.position}")
+            # classes share the reference table with objects and are added to it before their superclass is read
+            class_index = len(self.shared_objects)
+            self.shared_objects.append(None)
+            version = self._read_integer()
+            typedstream_class = _TypedStreamClass(class_name.tobytes(), version, self._read_class())
+            self.shared_objects[class_index] = typedstream_class
+            return typedstream_class
+
+        typedstream_class = self._read_reference(head, self.shared_objects)
+        if not isinstance(typedstream_class, _TypedStreamClass):
+            raise TypedStreamError(f"reference to a non-class object at byte {self.position}")
+        return typedstream_class
+
+    def _read_object(self, depth: int) -> None:
+        if depth > MAX_OBJECT_DEPTH:
+            raise TypedStreamError(f"objects nested deeper than {MAX_OBJECT_DEPTH} levels")
+
+        head = self._read_head()
+        if head == TAG_NIL:
+            return
+        elif head != TAG_NEW:
+            # a reference to an object that was already read
+            self._read_reference(head, self.shared_objects)
+            return
+
+        # objects are added to the reference table before their class is read
+        self.shared_objects.append(None)
+        typedstream_class = self._read_class()
+        is_string = typedstream_class is not None and typedstream_class.is_string_class()
+
+        while True:
+            if self.position < len(self.data) and self.data[self.position] == TAG_END_OF_OBJECT:
+                self.position += 1
+                return
+            self._read_typed_values(depth + 1, is_string)
+
+    def _read_typed_values(self, depth: int, in_string_object: bool = False) -> None:
+        type_encoding = self._read_shared_string()
+        if type_encoding is None:
+            raise TypedStreamError(f"missing type encoding at byte {self.position}")
+
+        type_encoding = type_encoding.tobytes()
+        encoding_index = 0
+        while encoding_index < len(type_encoding):
+            type_code = type_encoding[encoding_index:encoding_index + 1]
+            encoding_index += 1
+
+            if type_code == b"@":
+                self._read_object(depth)
+            elif type_code == b"+":
+                unshared_string = self._read_unshared_string()
+                if in_string_object:
+                    raise _StringPayloadFound(unshared_string)
+            elif type_code in (b"*", b"%", b":"):
+                self._read_shared_string()
+            elif type_code == b"#":
+                self._read_class()
+            elif type_code in b"cCsSiIlLqQB":
+                self._read_integer()
+            elif type_code in (b"f", b"d"):
+                head = self._read_head()
+                if head == TAG_FLOATING_POINT:
+                    self._read_bytes(4 if type_code == b"f" else 8)
+                else:
+                    self._read_integer(head)
+            elif type_code == b"[":
+                # arrays of chars ("[16c]") are stored as raw bytes
+                array_end = type_encoding.find(b"]", encoding_index)
+                array_encoding = type_encoding[encoding_index:array_end]
+                if array_end < 0 or array_encoding[-1:] not in (b"c", b"C") or not array_encoding[:-1].isdigit():
+                    raise TypedStreamError(f"unsupported array type encoding {type_encoding!r}")
+                self._read_bytes(int(array_encoding[:-1]))
+                encoding_index = array_end + 1
+            else:
+                raise TypedStreamError(f"unsupported type encoding {type_encoding!r}")
+
+    def read_string_payload(self) -> Optional[memoryview]:
+        if self._read_head() not in (4, 3):
+            raise TypedStreamError("unsupported typedstream version")
+        if self._read_unshared_string() != TYPEDSTREAM_SIGNATURE:
+            raise TypedStreamError("missing typedstream signature")
+        self._read_integer()  # system version
+
+        try:
+            while self.position < len(self.data):
+                self._read_typed_values(0)
+        except _StringPayloadFound as payload_found:
+            return payload_found.payload
+        return None
+
+
+def _find_string_payload(data: memoryview) -> Optional[memoryview]:
+    # fallback for archives with type encodings that the reader does not support: the text of the root NSString is
+    # stored as a "+" (unshared string) value directly after the NSString class name
+    data_bytes = data.tobytes()
+    string_class_position = data_bytes.find(b"NSString")
+    if string_class_position < 0:
+        return None
+
+    string_type_position = data_bytes.find(b"\x01+", string_class_position)
+    if string_type_position < 0:
+        return None
+
+    reader = TypedStreamReader(data)
+    reader.position = string_type_position + 2
+    return reader._read_unshared_string()
+
+
+def decode_attributed_body(attributed_body: Union[bytes, memoryview, None]) -> Optional[str]:
+    """Returns the text of a message.attributedBody BLOB, or None when it does not contain any."""
+    if not attributed_body or not isinstance(attributed_body, (bytes, memoryview)):
+        return None
+
+    data = attributed_body if isinstance(attributed_body, memoryview) else memoryview(attributed_body)
+    try:
+        payload = TypedStreamReader(data).read_string_payload()
+    except (ValueError, struct.error, RecursionError) as e:
+        logger.debug(f"Unable to parse attributedBody typedstream ({repr(e)}), searching it for the text instead.")
+        try:
+            payload = _find_string_payload(data)
+        except (ValueError, struct.error) as fallback_error:
+            logger.debug(f"Unable to find text in attributedBody with error {repr(fallback_error)}")
+            payload = None
+
+    if payload is None:
+        return None
+    return str(payload, "utf-8", errors="replace").strip() or None
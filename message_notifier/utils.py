@@ -0,0 +1,855 @@
+import base64
+import calendar
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from random import Random
+from subprocess import call, run, CompletedProcess, DEVNULL, PIPE, STDOUT
+from typing import Dict, Optional, Set, List, Tuple, Union, TYPE_CHECKING
+from urllib import parse
+from uuid import UUID
+
+from PIL import Image, ExifTags, ImageFilter, ImageDraw, ImageFont
+from dateutil import tz
+
+from message_notifier.config import (
+    ANSI_CYAN, ANSI_GREEN, ANSI_MAGENTA, ANSI_OFF, ANSI_RED, ANSI_YELLOW, BLANK_CHAR, CSS_GRAY, CSS_TEAL,
+    FONT_FOR_TEXT_PATH, FONT_FOR_TITLE, FONT_ITALIC, FONT_SIZE_FOR_TIMESTAMP, FONT_SIZE_FOR_TITLE, HEX_ORANGE,
+    PERSISTENT_DATA_COLUMNS, THUMBNAIL_MAX_BASE64_LENGTH, THUMBNAIL_PIXEL_SIZE, VIDEO_THUMBNAIL_SEEK_FRACTION
+)
+from message_notifier.lazy import cv2, np, pd, pdf2image, pyheif, pymediainfo, pync, vobject
+from message_notifier.power import are_media_previews_deferred
+from message_notifier.state import atomic_write, file_lock, get_data_dir, get_lock_path
+
+if TYPE_CHECKING:
+    from message_notifier.base import BaseConversation, BaseMessage
+    from message_notifier.thumbnails import ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+# guards processed_messages.csv between provider threads (the file lock only guards it between processes)
+PROCESSED_MESSAGES_LOCK = threading.RLock()
+
+# JPEG quality range searched for the largest thumbnail that fits within THUMBNAIL_MAX_BASE64_LENGTH, and how often
+# the thumbnail is made smaller when it does not fit even at the lowest quality
+THUMBNAIL_MIN_QUALITY = 20
+THUMBNAIL_MAX_QUALITY = 90
+THUMBNAIL_MAX_RESIZE_ATTEMPTS = 4
+THUMBNAIL_MIN_PIXEL_SIZE = 32
+THUMBNAIL_REDUCING_GAP = 2.0
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+VIDEO_FILE_ICON_PATH = PROJECT_ROOT / "resources" / "images" / "message_notifier_video_file_icon.png"
+# retrievable at /Applications/MediaInfo.app/Contents/Resources/libmediainfo.dylib
+MEDIAINFO_LIBRARY_PATH = PROJECT_ROOT / "resources" / "libmediainfo.dylib"
+# watermark size -> "play" watermark composited onto video thumbnails (see get_video_watermark)
+VIDEO_WATERMARKS = {}  # type: Dict[int, Image.Image]
+VIDEO_WATERMARKS_LOCK = threading.Lock()
+
+# MIME types that do not tell whether an attachment is a video, which are probed with MediaInfo like video MIME types
+AMBIGUOUS_MIME_TYPES = {"application/octet-stream"}
+# (path, size, modification time) -> track types reported by MediaInfo for the most recently probed attachments, kept
+# for the lifetime of the process (i.e. across refreshes only in stream mode, as warm server workers are forked per
+# request); across processes, the thumbnail cache skips the probe along with the rest of the thumbnail creation
+MEDIA_TRACK_TYPES = OrderedDict()  # type: OrderedDict[Tuple[str, int, int], Tuple[str, ...]]
+MEDIA_TRACK_TYPES_LOCK = threading.Lock()
+MEDIA_TRACK_TYPES_CACHE_SIZE = 256
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • MENUBAR PLUGIN BASE FUNCTIONS • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+def create_deterministic_uuid(seed: str) -> str:
+    random_num_gen_with_seed = Random()
+    random_num_gen_with_seed.seed(seed)
+    return str(UUID(int=random_num_gen_with_seed.getrandbits(128), version=4))
+
+
+def get_subprocess_output(commands: list, piped_input: str = None, return_stdout_str: bool = False,
+                          return_stdout_and_exit_code: bool = False,
+                          return_completed_process: bool = False) -> Union[str, Tuple[str, int], CompletedProcess]:
+    if sum([return_stdout_str, return_stdout_and_exit_code, return_completed_process]) > 1:
+        raise ValueError("You cannot specify more than one return type.")
+
+    if piped_input:
+        output = run(commands, stdout=PIPE, stderr=PIPE, universal_newlines=True, input=piped_input)
+    else:
+        output = run(commands, stdout=PIPE, stderr=PIPE, universal_newlines=True)
+
+    exit_code = output.returncode
+
+    if exit_code == 0:
+        if return_stdout_str:
+            return output.stdout
+        elif return_stdout_and_exit_code:
+            return output.stdout, exit_code
+        elif return_completed_process:
+            return output
+        else:
+            return output.stdout
+    else:
+        if return_stdout_str:
+            return output.stderr
+        elif return_stdout_and_exit_code:
+            return output.stderr, exit_code
+        elif return_completed_process:
+            return output
+        else:
+            return output.stderr
+
+
+def convert_timestamp(timestamp: Union[str, float, datetime]) -> datetime:
+    # iMessage/SMS message timestamp: datetime string
+    # Reddit message timestamp: floating point UTC epoch
+    # Telegram message timestamp: pandas datetime
+
+    if isinstance(timestamp, float) or isinstance(timestamp, datetime):
+
+        if isinstance(timestamp, float):
+            timestamp = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+        utc_time_zone = tz.tzutc()
+        local_time_zone = tz.tzlocal()
+        timestamp = timestamp.replace(tzinfo=utc_time_zone)
+        timestamp = timestamp.astimezone(local_time_zone)
+        timestamp = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+
+    return datetime.strptime(str(timestamp), "%Y-%m-%d %H:%M:%S")
+
+
+# noinspection DuplicatedCode
+def format_timestamp(timestamp: Union[str, float, datetime]) -> str:
+    message_timestamp = convert_timestamp(timestamp)
+    # reference for strftime formatting: https://strftime.org
+    # message_timestamp_str = message_timestamp.strftime("%m-%d-%Y %I:%M:%S %p").lower()
+    message_timestamp_str = message_timestamp.strftime("%b %-d, %Y - %-I:%M:%S %p").lower().capitalize()
+
+    today = datetime.today()
+    if today.date() == message_timestamp.date():
+        if today.hour == message_timestamp.hour:
+            if today.minute == message_timestamp.minute:
+                if today.second == message_timestamp.second:
+                    return message_timestamp_str
+                else:
+                    sec_delta = today.second - message_timestamp.second
+                    return f"{message_timestamp_str} (Today - {sec_delta} second{'s' if sec_delta > 1 else ''} ago)"
+            else:
+                minute_delta = today.minute - message_timestamp.minute
+                return f"{message_timestamp_str} (Today - {minute_delta} minute{'s' if minute_delta > 1 else ''} ago)"
+        else:
+            hour_delta = today.hour - message_timestamp.hour
+            return f"{message_timestamp_str} (Today - {hour_delta} hour{'s' if hour_delta > 1 else ''} ago)"
+    else:
+        day_delta = (today.date() - message_timestamp.date()).days
+        logger.debug(
+            f"\n"
+            f"Message time delivery info:\n"
+            f"              Today: {today}\n"
+            f"          Timestamp: {message_timestamp}\n"
+            f"    Diff from today: {today - message_timestamp}\n"
+            f"          Day delta: {day_delta}\n"
+        )
+        if day_delta == 1:
+            weekday_str = "Yesterday"
+        else:
+            weekday_str = calendar.day_name[message_timestamp.weekday()]
+        return f"{message_timestamp_str} ({weekday_str} - {day_delta} day{'s' if day_delta > 1 else ''} ago)"
+
+
+def get_unique_lowercase_df_index_values(df: "pd.DataFrame") -> Set[str]:
+    return set([str(value).lower() for value in df.index.tolist()])
+
+
+def sanitize_url(url_str: str) -> str:
+    url = parse.urlsplit(url_str)
+    url = list(url)
+    url[2] = parse.quote(url[2])
+    return parse.urlunsplit(url)
+
+
+# noinspection PyShadowingNames
+def encode_image(image_file_path: Path, unread_count: int = 0, standard_error: bool = False) -> str:
+    image_bytes = BytesIO()
+    img = Image.open(image_file_path)
+
+    # TODO: figure out why menubar icon is pixelated/displayed in low resolution
+    # check if macOS device is using a retina screen
+    if call("system_profiler SPDisplaysDataType | grep -i 'retina'", shell=True, stdout=DEVNULL, stderr=STDOUT) == 0:
+        # max_menubar_icon_height = 74
+        # menubar_icon_font_size = 54
+        max_menubar_icon_height = 18
+        menubar_icon_font_size = 14
+    else:
+        # max_menubar_icon_height = 37
+        # menubar_icon_font_size = 27
+        max_menubar_icon_height = 9
+        menubar_icon_font_size = 7
+
+    img_width, img_height = img.size
+
+    if img_width > img_height:
+        thumbnail_max = int((img_width * max_menubar_icon_height) / img_height)
+    else:
+        thumbnail_max = img_height
+
+    img.thumbnail((thumbnail_max, thumbnail_max))
+
+    img_width, img_height = img.size
+
+    unread_count_str = f"{unread_count if unread_count > 0 else '...'}{'E' if standard_error else ''}"
+
+    font = ImageFont.truetype(str(FONT_FOR_TEXT_PATH), menubar_icon_font_size)
+    ascent, descent = font.getmetrics()
+    # offset_y = space above letters
+    # ascent - offset_y = height of letters (not counting tails)
+    # descent = space below letters (for tails)
+    # noinspection PyUnresolvedReferences
+    (width, baseline), (offset_x, offset_y) = font.font.getsize(unread_count_str)
+
+    percent_width_shift = int(img_width * 0.00)
+    percent_height_shift = int(img_height * 0.06)
+    x = int((img_width - (width - percent_width_shift)) / 2)
+    y = int((img_height - ((ascent + offset_y + descent) - percent_height_shift)) / 2)
+    position = (x, y)
+
+    draw = ImageDraw.Draw(img)
+
+    # macOS colors: https://developer.apple.com/design/human-interface-guidelines/macos/visual-design/color/
+    # reddit colors: https://www.designpieces.com/palette/reddit-brand-colors-hex-and-rgb/
+    if unread_count > 0:
+        menubar_icon_text_color = (255, 69, 0, 255)  # reddit orange
+        # menubar_icon_text_color = (255, 69, 58, 255)  # macos red (dark)
+    else:
+        menubar_icon_text_color = (152, 152, 157, 255)  # macos grey (dark)
+    draw.text(position, unread_count_str, menubar_icon_text_color, font=font)
+
+    # include only the below code to remove menubar icon text
+    img.save(image_bytes, format="PNG")
+
+    # img.show()
+
+    return base64.b64encode(image_bytes.getvalue()).decode("utf-8")
+
+
+def get_jpeg_compatible_image(image: Image) -> Image:
+    # JPEG has no alpha channel or palette, so transparent images are flattened onto white like Messages displays them
+    if image.mode in ("RGB", "L"):
+        return image
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        flattened_image = Image.new("RGB", image.size, (255, 255, 255))
+        flattened_image.paste(image, mask=image.getchannel("A"))
+        return flattened_image
+    return image.convert("RGB")
+
+
+def save_image_to_bytes(image: Image, image_format: str, quality: int = THUMBNAIL_MAX_QUALITY) -> bytes:
+    output = BytesIO()
+    if image_format == "JPEG":
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def resize_image(image: Image, max_size: int) -> Image:
+    scale = min(1.0, max_size / max(image.size))
+    size = (max(1, round(image.size[0] * scale)), max(1, round(image.size[1] * scale)))
+    if size == image.size:
+        return image
+    # large photos are first reduced by an integer factor, which is much faster than resampling them in one pass
+    return image.resize(size, Image.LANCZOS, reducing_gap=THUMBNAIL_REDUCING_GAP)
+
+
+def encode_thumbnail(image: Image, max_size: int = THUMBNAIL_PIXEL_SIZE,
+                     max_base64_length: int = THUMBNAIL_MAX_BASE64_LENGTH) -> Tuple[Optional[str], bool]:
+    # base64 turns every 3 bytes into 4 characters
+    byte_budget = max_base64_length // 4 * 3
+
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        # palette images (e.g. GIFs) can only be resized without interpolation
+        has_alpha = "A" in image.mode or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    # every attempt resamples this full size thumbnail of the original image instead of the previous attempt, so the
+    # thumbnail is never shrunk repeatedly
+    reference_image = resize_image(image, max_size)
+    jpeg_reference_image = get_jpeg_compatible_image(reference_image)
+
+    # PNG sizes grow at least linearly with the side of an image (flat graphics) and at most with its area (photos), so
+    # PNG is only encoded when the linear estimate from a quarter size probe can fit within the budget (e.g. not photos)
+    png_probe_image = resize_image(reference_image, max(1, max(reference_image.size) // 4))
+    png_bytes_per_side_pixel = len(save_image_to_bytes(png_probe_image, "PNG")) / max(png_probe_image.size)
+
+    size = max(reference_image.size)
+    for attempt in range(1, THUMBNAIL_MAX_RESIZE_ATTEMPTS + 1):
+        thumbnail_image = resize_image(reference_image, size)
+        jpeg_image = resize_image(jpeg_reference_image, size)
+
+        # lossless PNG is usually smaller for screenshots and graphics, and JPEG for photos
+        candidates = [("JPEG", THUMBNAIL_MAX_QUALITY, save_image_to_bytes(jpeg_image, "JPEG"))]
+        if png_bytes_per_side_pixel * max(thumbnail_image.size) <= byte_budget * 1.5:
+            png_data = save_image_to_bytes(thumbnail_image, "PNG")
+            png_bytes_per_side_pixel = len(png_data) / max(thumbnail_image.size)
+            candidates.append(("PNG", None, png_data))
+        image_format, quality, img_data = min(candidates, key=lambda candidate: len(candidate[2]))
+
+        if len(img_data) > byte_budget:
+            image_format, quality = "JPEG", THUMBNAIL_MIN_QUALITY
+            img_data = save_image_to_bytes(jpeg_image, "JPEG", quality)
+            smallest_jpeg_length = len(img_data)
+            if smallest_jpeg_length > byte_budget:
+                img_data = None
+            else:
+                # binary search for the highest JPEG quality that fits within the budget
+                lowest_quality, highest_quality = THUMBNAIL_MIN_QUALITY + 1, THUMBNAIL_MAX_QUALITY - 1
+                while lowest_quality <= highest_quality:
+                    jpeg_quality = (lowest_quality + highest_quality) // 2
+                    jpeg_data = save_image_to_bytes(jpeg_image, "JPEG", jpeg_quality)
+                    if len(jpeg_data) <= byte_budget:
+                        quality, img_data = jpeg_quality, jpeg_data
+                        lowest_quality = jpeg_quality + 1
+                    else:
+                        highest_quality = jpeg_quality - 1
+
+        if img_data:
+            logger.debug(
+                f"Encoded {thumbnail_image.size[0]}x{thumbnail_image.size[1]} {image_format} thumbnail "
+                f"(quality {quality}, {len(img_data)} bytes) in {attempt} attempt(s)"
+            )
+            return base64.b64encode(img_data).decode("utf-8"), True
+
+        # the encoded size grows with the number of pixels, so the next size is predicted from the size at the lowest
+        # quality (with some margin, since smaller images compress slightly worse)
+        size = int(size * (byte_budget / smallest_jpeg_length) ** 0.5 * 0.9)
+        if size < THUMBNAIL_MIN_PIXEL_SIZE:
+            break
+
+    logger.debug(f"Unable to encode a thumbnail of {max_base64_length} base64 characters or less for {image.size}")
+    return None, False
+
+
+def create_video_watermark(size: int) -> Image:
+    watermark_img = Image.open(VIDEO_FILE_ICON_PATH)
+    watermark_img.thumbnail((size, size), Image.LANCZOS)
+    watermark_img = watermark_img.convert("RGBA").filter(ImageFilter.SMOOTH_MORE)
+
+    # black pixels of the icon become half transparent black, everything else (e.g. white) becomes fully transparent
+    watermark_pixels = np.asarray(watermark_img)
+    is_black_pixel = (watermark_pixels[..., :3] == 0).all(axis=-1) & (watermark_pixels[..., 3] > 0)
+    transparent_watermark_pixels = np.zeros_like(watermark_pixels)
+    transparent_watermark_pixels[..., 3] = np.where(is_black_pixel, 128, 0)
+    return Image.fromarray(transparent_watermark_pixels, "RGBA")
+
+
+def get_video_watermark(size: int) -> Image:
+    with VIDEO_WATERMARKS_LOCK:
+        if size in VIDEO_WATERMARKS:
+            return VIDEO_WATERMARKS[size]
+
+    # watermarks are also kept on disk between runs, and created again whenever the icon changes
+    watermark_path = get_data_dir(PROJECT_ROOT) / "cache" / "video_watermarks" / f"video_watermark_{size}.png"
+    watermark_img = None
+    try:
+        if watermark_path.stat().st_mtime_ns >= VIDEO_FILE_ICON_PATH.stat().st_mtime_ns:
+            watermark_img = Image.open(watermark_path)
+            watermark_img.load()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Unable to load the cached video watermark '{watermark_path}' with error {repr(e)}")
+        watermark_img = None
+
+    if watermark_img is None:
+        watermark_img = create_video_watermark(size)
+        watermark_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(watermark_path, "wb") as watermark_file:
+            watermark_img.save(watermark_file, format="PNG")
+
+    with VIDEO_WATERMARKS_LOCK:
+        VIDEO_WATERMARKS[size] = watermark_img
+    return watermark_img
+
+
+def get_media_track_types(path_str: str) -> Tuple[str, ...]:
+    file_stat = os.stat(path_str)
+    file_key = (path_str, file_stat.st_size, file_stat.st_mtime_ns)
+    with MEDIA_TRACK_TYPES_LOCK:
+        if file_key in MEDIA_TRACK_TYPES:
+            MEDIA_TRACK_TYPES.move_to_end(file_key)
+            return MEDIA_TRACK_TYPES[file_key]
+
+    attachment_media_file = pymediainfo.MediaInfo.parse(path_str, library_file=str(MEDIAINFO_LIBRARY_PATH))
+    track_types = tuple(track.track_type for track in attachment_media_file.tracks)
+
+    with MEDIA_TRACK_TYPES_LOCK:
+        MEDIA_TRACK_TYPES[file_key] = track_types
+        while len(MEDIA_TRACK_TYPES) > MEDIA_TRACK_TYPES_CACHE_SIZE:
+            MEDIA_TRACK_TYPES.popitem(last=False)
+    return track_types
+
+
+def read_video_frame(path_str: str, max_size: int = THUMBNAIL_PIXEL_SIZE,
+                     seek_fraction: float = VIDEO_THUMBNAIL_SEEK_FRACTION) -> Optional[Image]:
+    video_capture = cv2.VideoCapture(path_str)
+    try:
+        if not video_capture.isOpened():
+            return None
+
+        # backends that can decode smaller frames accept the requested size, the others (e.g. FFmpeg) keep decoding
+        # full size frames and refuse it
+        frame_width = video_capture.get(cv2.CAP_PROP_FRAME_WIDTH)
+        frame_height = video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        if frame_width and frame_height and max(frame_width, frame_height) > max_size:
+            scale = max_size / max(frame_width, frame_height)
+            if video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, round(frame_width * scale)):
+                video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, round(frame_height * scale))
+
+        # the first frame is often black (e.g. a fade in), so the frame a bit into the video is shown instead, which is
+        # decoded from the keyframe before it
+        frame_count = video_capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        if seek_fraction and frame_count > 1:
+            video_capture.set(cv2.CAP_PROP_POS_FRAMES, int(frame_count * seek_fraction))
+        success, image_frame = video_capture.read()
+        if not success and seek_fraction:
+            video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, image_frame = video_capture.read()
+        if not success or image_frame is None:
+            return None
+
+        frame_height, frame_width = image_frame.shape[:2]
+        if max(frame_width, frame_height) > max_size:
+            scale = max_size / max(frame_width, frame_height)
+            image_frame = cv2.resize(
+                image_frame,
+                (max(1, round(frame_width * scale)), max(1, round(frame_height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        # OpenCV decodes frames as BGR
+        if image_frame.ndim == 3:
+            image_frame = cv2.cvtColor(image_frame, cv2.COLOR_BGR2RGB)
+        return Image.fromarray(image_frame)
+    finally:
+        video_capture.release()
+
+
+# noinspection DuplicatedCode
+def create_attachment_thumbnail(path_str: str, mime_type: str) -> Tuple[str, bool]:
+    attachment_has_image_thumbnail = False
+
+    if mime_type == "application/pdf":
+
+        # TODO: figure out why SwiftBar is not displaying the image bytes produced within this block
+
+        poppler_info = get_subprocess_output(["brew", "info", "poppler"], return_completed_process=True)
+        poppler_version_info = get_subprocess_output(
+            ["grep", "stable"],
+            piped_input=poppler_info.stdout,
+            return_completed_process=True
+        )
+        poppler_version = get_subprocess_output(
+            ["awk", "{ print $4 }"],
+            piped_input=poppler_version_info.stdout,
+            return_stdout_str=True
+        )
+
+        poppler_path = f"/opt/homebrew/Cellar/poppler/{poppler_version.strip()}/bin"
+
+        pdf_pages = pdf2image.convert_from_path(
+            path_str,
+            fmt="PNG",
+            poppler_path=poppler_path,
+            size=(THUMBNAIL_PIXEL_SIZE, None)
+        )
+
+        thumb_str, attachment_has_image_thumbnail = encode_thumbnail(pdf_pages[0])
+
+        return thumb_str, attachment_has_image_thumbnail
+
+    else:
+        img = None
+        img_format = None
+        thumb_str = None
+
+        # the MIME type from chat.db is enough to recognize images, so MediaInfo only probes attachments that may be
+        # videos (e.g. audio-only QuickTime files have a video MIME type)
+        attachment_is_video = False
+        if not mime_type or mime_type.startswith("video/") or mime_type in AMBIGUOUS_MIME_TYPES:
+            attachment_is_video = "Video" in get_media_track_types(path_str)
+
+        if attachment_is_video:
+
+            # the frame is read at most at the thumbnail size, so only a few distinct watermark sizes are needed
+            img = read_video_frame(path_str)
+            if img is not None:
+                watermark_img = get_video_watermark(min(img.size) // 2)
+
+                x = int((img.size[0] - watermark_img.size[0]) / 2)
+                y = int((img.size[1] - watermark_img.size[1]) / 2)
+                img.paste(watermark_img, (x, y), mask=watermark_img)
+                img_format = "PNG"
+
+            else:
+                img = Image.open(VIDEO_FILE_ICON_PATH)
+                img_format = "PNG"
+
+        else:
+            if mime_type == "image/jpeg":
+                orientation = 0
+                for key in ExifTags.TAGS.keys():
+                    if ExifTags.TAGS[key] == "Orientation":
+                        orientation = key
+
+                img = Image.open(path_str)
+                if hasattr(img, "_getexif"):  # only present in JPEGs
+                    try:
+                        # noinspection PyProtectedMember
+                        exif = img._getexif()
+                        if exif:
+                            exif = dict(exif.items())
+
+                            if exif[orientation] == 3:
+                                img = img.rotate(180, expand=True)
+                            elif exif[orientation] == 6:
+                                img = img.rotate(270, expand=True)
+                            elif exif[orientation] == 8:
+                                img = img.rotate(90, expand=True)
+                    except KeyError:
+                        img = img
+
+                    img_format = "JPEG"
+
+            elif mime_type == "image/gif":
+                # TODO: improve handling of GIFs
+                img = Image.open(path_str)
+                img_format = "GIF"
+
+            elif mime_type == "image/png":
+                img = Image.open(path_str)
+                img_format = "PNG"
+
+            elif mime_type == "image/heic":
+                heif_file = pyheif.read(path_str)
+
+                img = Image.frombytes(
+                    heif_file.mode,
+                    heif_file.size,
+                    heif_file.data,
+                    "raw",
+                    heif_file.mode,
+                    heif_file.stride,
+                )
+                img_format = "HEIC"
+
+            else:
+                # TODO: handle more image MIME types
+                pass
+
+        if img_format:
+            thumb_str, attachment_has_image_thumbnail = encode_thumbnail(img)
+
+        return thumb_str, attachment_has_image_thumbnail
+
+
+# noinspection DuplicatedCode
+def encode_attachment(message_row, thumbnail_cache: "ThumbnailCache" = None) -> Tuple[Union[str, List], bool]:
+    path_str = message_row.attchfile
+    mime_type = message_row.attchtype
+    attachment_has_image_thumbnail = False
+
+    if path_str:
+        path_str = str.replace(path_str, "~", str(Path.home()))
+
+        try:
+            if mime_type != "text/vcard" and are_media_previews_deferred():
+                # thumbnails that were already created are still shown (without reading the attachment to hash it),
+                # the others are generated at the first refresh after the throttled period ends
+                thumbnail = None
+                if thumbnail_cache:
+                    thumbnail = thumbnail_cache.get(Path(path_str), mime_type, hash_contents=False)
+                return thumbnail or (None, attachment_has_image_thumbnail)
+
+            if mime_type == "text/vcard":
+                with open(path_str, "r") as vcf_file:
+                    thumb_str = []
+                    # noinspection PyUnresolvedReferences
+                    vcard_objects = vobject.readComponents(vcf_file.read())
+                    vcard = next(vcard_objects, None)
+                    while vcard is not None:
+                        thumb_str.append(f"{vcard.name}")
+                        for vcard_component in vcard.getChildren():
+                            component_name = vcard_component.name
+                            component_value_list = str(vcard_component.valueRepr()).split("\n")
+
+                            thumb_str.append(f"    {component_name}: {component_value_list[0]}")
+                            for component_value in component_value_list[1:]:
+                                thumb_str.append(f"    {' ' * len(component_name)}  {component_value}")
+                            if vcard_component.params:
+                                thumb_str.append(f"    params for {component_name}:")
+                                for k in vcard_component.params.keys():
+                                    thumb_str.append(f"        {k}: {vcard_component.params[k]}")
+
+                        thumb_str.append(BLANK_CHAR)
+                        vcard = next(vcard_objects, None)
+
+                    thumb_str.pop()
+
+                return thumb_str, attachment_has_image_thumbnail
+
+            else:
+                if thumbnail_cache:
+                    return thumbnail_cache.get_or_create(
+                        Path(path_str), mime_type, lambda: create_attachment_thumbnail(path_str, mime_type)
+                    )
+                return create_attachment_thumbnail(path_str, mime_type)
+
+        except IOError as e:
+            logger.error(f"Unable to create thumbnail for '{path_str}' with error {repr(e)}")
+
+
+# noinspection DuplicatedCode
+def send_macos_notification(unread: int, message_senders: Set[str], title: str, arguments) -> None:
+    notification_group_id = "notifier"
+
+    pync.Notifier.notify(
+        message=(
+            f"Message{'s' if (len(message_senders) > 1 and unread > 1) else ''} from: {', '.join(message_senders)}"
+        ),  # content of notification
+        title=f"{title}: {str(unread)} unread message{'s' if unread > 1 else ''}",  # notification title
+        group=notification_group_id,  # ID used to group notification with previous notifications
+        **arguments
+    )
+
+    pync.Notifier.remove(notification_group_id)
+
+
+# noinspection PyShadowingNames,PyListCreation
+def generate_output_read(local_dir: Path, message_type: str, display_string: str, username: str,
+                         user: str = None) -> List[str]:
+    recipient = user if user else username
+
+    standard_output = []
+    standard_output.append("---")
+    standard_output.append(
+        f"No unread {message_type.capitalize()} messages for {recipient}! (Go to messages ↗︎️) "
+        f"| color={CSS_TEAL} {display_string}"
+    )
+
+    # create data directory if it does not exist
+    data_dir = local_dir / "resources" / "data"
+    if not data_dir.is_dir():
+        os.makedirs(data_dir)
+
+    # clear all processed message UUIDs once messages are read
+    processed_messages_path = data_dir / "processed_messages.csv"
+    with PROCESSED_MESSAGES_LOCK, file_lock(get_lock_path(processed_messages_path)):
+        try:
+            all_processed_messages_df = pd.read_csv(processed_messages_path, index_col=0)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            all_processed_messages_df = pd.DataFrame(columns=PERSISTENT_DATA_COLUMNS)
+        all_other_processed_messages_df = all_processed_messages_df.loc[
+            (all_processed_messages_df["type"] != message_type)
+            | (all_processed_messages_df["username"] != username)
+            ]
+        with atomic_write(processed_messages_path) as processed_messages_csv:
+            all_other_processed_messages_df.to_csv(processed_messages_csv, header=PERSISTENT_DATA_COLUMNS)
+
+    return standard_output
+
+
+# noinspection PyUnresolvedReferences,PyShadowingNames,PyListCreation,DuplicatedCode
+def generate_output_unread(local_dir: Path, message_type: str, display_string: str, unread: int,
+                           conversations: Dict[str, "BaseConversation"], max_line_characters: int, arguments: Dict,
+                           username: str, user: str = None, all_unread_message_senders: Set = None) -> List[str]:
+    recipient = user if user else username
+
+    standard_output = []
+    standard_output.append("---")
+    standard_output.append(
+        f"Go to {message_type.capitalize()} messages for {recipient} ↗︎️ "
+        f"| font={FONT_ITALIC} color={HEX_ORANGE} {display_string}"
+    )
+
+    unread_message_count = sum([conv.get_message_count() for conv in conversations.values()])
+    standard_output.append(
+        f"{ANSI_GREEN}Unread {message_type.capitalize()} messages for "
+        f"{recipient}: {ANSI_RED}{unread_message_count}{ANSI_OFF} "
+        f"| ansi=true {display_string}"
+    )
+
+    ordered_conversations = OrderedDict(
+        [(conversation.id, conversation) for conversation in sorted(
+            conversations.values(), key=lambda x: x.most_recent_timestamp, reverse=True)]
+    )
+
+    unread_messages = {}
+    message_num = 1
+    for cid, conversation in ordered_conversations.items():
+        message_display_str = f"{ANSI_OFF} | ansi=true refresh=true "
+
+        if conversation.title:
+            standard_output.append(
+                f"--{conversation.title}{message_display_str}{conversation.menubar_msg_display_str} "
+                f"font={FONT_FOR_TITLE} size={FONT_SIZE_FOR_TITLE}"
+            )
+
+        standard_output.append(
+            f"--{ANSI_YELLOW}{conversation.get_participants_str()}{message_display_str}"
+            f"{conversation.menubar_msg_display_str}"
+        )
+
+        for message in conversation.messages:  # type: BaseMessage
+
+            timestamp_display_str = (
+                f"--{ANSI_CYAN}{message.timestamp_str}"
+                f"{ANSI_GREEN}{message_display_str}{message.menubar_msg_display_str} "
+                f"size={FONT_SIZE_FOR_TIMESTAMP}"
+            )
+            msg_sender_start_str = f"--{ANSI_RED}({message.sender}) {ANSI_GREEN}"
+            msg_format_str = f"--{ANSI_GREEN if not message.system else ''}"
+            # update display string if message is a system message
+            message_display_str = (
+                f"{ANSI_OFF if not message.system else ''} "
+                f"| ansi={'true' if not message.system else 'false'} refresh=true "
+            )
+            system_format_str = f" {message.menubar_msg_display_str} color={CSS_GRAY} font={FONT_ITALIC}"
+            # add display string if message is a system message
+            msg_system_format_str = system_format_str if message.system else ""
+
+            if message.attachment == 1:
+                if message.get_message_len() == 0:
+                    msg_attachment_str = (
+                        f"{ANSI_MAGENTA}"
+                        f"(attachment{(' - ' + message.attachment_type) if message.attachment_type else ''})"
+                        f"{ANSI_GREEN}"
+                    )
+                else:
+                    # TODO: handle messages that are longer than the max_line_chars with video attachments
+                    msg_attachment_str = (
+                        f"{message.body} {ANSI_MAGENTA}"
+                        f"(attachment{f' - {message.attachment_type}' if message.attachment_type else ''}) {ANSI_GREEN}"
+                    )
+
+                if conversation.is_group_conversation:
+                    standard_output.append(timestamp_display_str)
+                    standard_output.append(
+                        f"{msg_sender_start_str}{msg_attachment_str}"
+                        f"{message_display_str}{message.menubar_msg_display_str}"
+                    )
+                else:
+                    standard_output.append(timestamp_display_str)
+                    standard_output.append(
+                        f"{msg_format_str}{msg_attachment_str}{message_display_str}{message.menubar_msg_display_str}"
+                    )
+                if message.attachment_file:
+                    if message.attachment_has_thumbnail:
+                        standard_output.append(
+                            f"----| image={message.attachment_file} {message.menubar_msg_display_str}"
+                        )
+                    else:
+                        for line in message.attachment_file:
+                            standard_output.append(
+                                f"----{ANSI_OFF}{line}{message_display_str}{message.menubar_msg_display_str}"
+                            )
+
+            elif message.get_message_len() > max_line_characters:
+                if conversation.is_group_conversation:
+                    standard_output.append(timestamp_display_str)
+                    standard_output.append(
+                        f"{msg_sender_start_str}{message.body_short}"
+                        f"{message_display_str}{message.menubar_msg_display_str}{msg_system_format_str}"
+                    )
+                else:
+                    standard_output.append(timestamp_display_str)
+                    standard_output.append(
+                        f"{msg_format_str}{message.body_short}{message_display_str}{message.menubar_msg_display_str}"
+                        f"{msg_system_format_str}"
+                    )
+                for line in message.body_wrapped:
+                    standard_output.append(
+                        f"----{ANSI_OFF}{line}{message_display_str}{message.menubar_msg_display_str}"
+                        f"{msg_system_format_str}"
+                    )
+
+            elif message.get_message_len() == 0:
+                standard_output.append(timestamp_display_str)
+                standard_output.append(f"--No message content | {system_format_str}")
+
+            else:
+                if conversation.is_group_conversation:
+                    standard_output.append(timestamp_display_str)
+                    standard_output.append(
+                        f"{msg_sender_start_str}{message.body}{message_display_str}{message.menubar_msg_display_str}"
+                        f"{msg_system_format_str}"
+                    )
+                else:
+                    standard_output.append(timestamp_display_str)
+                    standard_output.append(
+                        f"{msg_format_str}{message.body}{message_display_str}{message.menubar_msg_display_str}"
+                        f"{msg_system_format_str}"
+                    )
+
+            if conversation.messages.index(message) != (len(conversation.messages) - 1):
+                standard_output.append(f"--{BLANK_CHAR}| size=2")
+
+            message_id = str(message.id).lower()
+            message_uuid = create_deterministic_uuid(message_id)
+            unread_messages[message_uuid] = [message_id, message_type, message.timestamp, username, message.sender]
+
+        standard_output.append("-----")
+        message_num += 1
+
+    unread_messages_df = pd.DataFrame.from_dict(unread_messages, orient="index", columns=PERSISTENT_DATA_COLUMNS)
+    unread_messages_uuids = get_unique_lowercase_df_index_values(unread_messages_df)
+
+    # create data directory if it does not exist
+    data_dir = local_dir / "resources" / "data"
+    if not data_dir.is_dir():
+        os.makedirs(data_dir)
+
+    processed_messages_path = data_dir / "processed_messages.csv"
+    with PROCESSED_MESSAGES_LOCK, file_lock(get_lock_path(processed_messages_path)):
+        all_processed_messages_df = pd.DataFrame(columns=PERSISTENT_DATA_COLUMNS)
+        try:
+            all_processed_messages_df = pd.read_csv(processed_messages_path, index_col=0)
+            all_processed_messages_df.drop_duplicates(inplace=True)
+            all_processed_messages_df.rename_axis("uuid", inplace=True)
+        except FileNotFoundError:
+            logger.debug("File processed_messages.csv does not exist, and will be created.")
+        except pd.errors.EmptyDataError:
+            logger.debug("File processed_messages.csv is empty, and will be populated.")
+
+        processed_messages_df = all_processed_messages_df[all_processed_messages_df["type"] == message_type]
+        processed_message_uuids = get_unique_lowercase_df_index_values(processed_messages_df)
+
+        newly_processed_messages_df = unread_messages_df[
+            unread_messages_df.index.isin(unread_messages_uuids.difference(processed_message_uuids))
+        ]
+
+        if not newly_processed_messages_df.empty:
+            all_processed_messages_df = all_processed_messages_df[all_processed_messages_df["type"] != message_type]
+            # all_processed_messages_df = all_processed_messages_df.append(unread_messages_df)
+            all_processed_messages_df = pd.concat([all_processed_messages_df, unread_messages_df])
+            all_processed_messages_df.drop_duplicates(inplace=True)
+            all_processed_messages_df.rename_axis("uuid", inplace=True)
+            all_processed_messages_df["timestamp"] = pd.to_datetime(all_processed_messages_df["timestamp"])
+            all_processed_messages_df.sort_values(by=["timestamp"], inplace=True)
+
+            with atomic_write(processed_messages_path) as processed_messages_csv:
+                # noinspection PyTypeChecker
+                all_processed_messages_df.to_csv(processed_messages_csv, header=PERSISTENT_DATA_COLUMNS)
+
+    if not set(unread_messages.keys()).issubset(processed_message_uuids):
+        send_macos_notification(
+            unread,
+            all_unread_message_senders or set(unread_messages_df["sender"].to_list()),
+            "Messages",
+            arguments
+        )
+
+    return standard_output
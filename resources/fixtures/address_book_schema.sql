@@ -0,0 +1,42 @@
+-- Subset of the macOS Contacts AddressBook-v22.abcddb schema (tables, columns and indexes) used by
+-- message_notifier.contacts. Column and index names match ~/Library/Application Support/AddressBook on recent macOS
+-- versions.
+
+CREATE TABLE ZABCDRECORD (
+    Z_PK INTEGER PRIMARY KEY,
+    Z_ENT INTEGER,
+    Z_OPT INTEGER,
+    ZFIRSTNAME VARCHAR,
+    ZMIDDLENAME VARCHAR,
+    ZLASTNAME VARCHAR,
+    ZORGANIZATION VARCHAR,
+    ZNICKNAME VARCHAR,
+    ZUNIQUEID VARCHAR
+);
+
+CREATE TABLE ZABCDPHONENUMBER (
+    Z_PK INTEGER PRIMARY KEY,
+    Z_ENT INTEGER,
+    Z_OPT INTEGER,
+    ZISPRIMARY INTEGER,
+    ZORDERINGINDEX INTEGER,
+    ZOWNER INTEGER,
+    ZFULLNUMBER VARCHAR,
+    ZLABEL VARCHAR,
+    ZUNIQUEID VARCHAR
+);
+CREATE INDEX ZABCDPHONENUMBER_ZOWNER_INDEX ON ZABCDPHONENUMBER (ZOWNER);
+
+CREATE TABLE ZABCDEMAILADDRESS (
+    Z_PK INTEGER PRIMARY KEY,
+    Z_ENT INTEGER,
+    Z_OPT INTEGER,
+    ZISPRIMARY INTEGER,
+    ZORDERINGINDEX INTEGER,
+    ZOWNER INTEGER,
+    ZADDRESS VARCHAR,
+    ZADDRESSNORMALIZED VARCHAR,
+    ZLABEL VARCHAR,
+    ZUNIQUEID VARCHAR
+);
+CREATE INDEX ZABCDEMAILADDRESS_ZOWNER_INDEX ON ZABCDEMAILADDRESS (ZOWNER);
@@ -0,0 +1,75 @@
+-- Subset of the macOS Messages chat.db schema (tables, columns and indexes) used by message_notifier.text.
+-- Column and index names match ~/Library/Messages/chat.db on recent macOS versions.
+
+CREATE TABLE handle (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT UNIQUE,
+    id TEXT NOT NULL,
+    country TEXT,
+    service TEXT NOT NULL,
+    uncanonicalized_id TEXT,
+    person_centric_id TEXT,
+    UNIQUE (id, service)
+);
+
+CREATE TABLE message (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT UNIQUE NOT NULL,
+    text TEXT,
+    handle_id INTEGER DEFAULT 0,
+    service TEXT,
+    date INTEGER,
+    date_read INTEGER,
+    is_read INTEGER DEFAULT 0,
+    is_from_me INTEGER DEFAULT 0,
+    item_type INTEGER DEFAULT 0,
+    cache_has_attachments INTEGER DEFAULT 0,
+    attributedBody BLOB
+);
+CREATE INDEX message_idx_is_read ON message (is_read, is_from_me, item_type);
+CREATE INDEX message_idx_handle ON message (handle_id, date);
+CREATE INDEX message_idx_date ON message (date);
+
+CREATE TABLE chat (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT UNIQUE NOT NULL,
+    style INTEGER,
+    state INTEGER,
+    chat_identifier TEXT,
+    service_name TEXT,
+    display_name TEXT,
+    group_id TEXT
+);
+CREATE INDEX chat_idx_chat_identifier ON chat (chat_identifier);
+
+CREATE TABLE chat_handle_join (
+    chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+    handle_id INTEGER REFERENCES handle (ROWID) ON DELETE CASCADE,
+    UNIQUE (chat_id, handle_id)
+);
+
+CREATE TABLE chat_message_join (
+    chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+    message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE,
+    message_date INTEGER DEFAULT 0,
+    PRIMARY KEY (chat_id, message_id)
+);
+CREATE INDEX chat_message_join_idx_message_date_id_chat_id ON chat_message_join (chat_id, message_date, message_id);
+CREATE INDEX chat_message_join_idx_message_id_only ON chat_message_join (message_id);
+
+CREATE TABLE attachment (
+    ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT UNIQUE NOT NULL,
+    created_date INTEGER DEFAULT 0,
+    filename TEXT,
+    uti TEXT,
+    mime_type TEXT,
+    transfer_name TEXT,
+    total_bytes INTEGER DEFAULT 0
+);
+
+CREATE TABLE message_attachment_join (
+    message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE,
+    attachment_id INTEGER REFERENCES attachment (ROWID) ON DELETE CASCADE,
+    UNIQUE (message_id, attachment_id)
+);
+CREATE INDEX message_attachment_join_idx_message_id ON message_attachment_join (message_id);
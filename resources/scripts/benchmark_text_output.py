@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""Benchmarks the iMessage/SMS provider (message_notifier.text.TextOutput) against synthetic Messages databases.
+
+For every size, a chat.db and AddressBook are generated with resources/scripts/generate_text_fixtures.py (and reused by
+later runs with the same parameters), and each scenario is timed --repeat times in a temporary project root:
+
+    get_messages_cold            TextOutput._get_messages without any cached state (contacts, unread messages, etc.)
+    get_messages_warm            TextOutput._get_messages with the state left behind by the previous run
+    get_console_output_cold      TextOutput.get_console_output without any cached state
+    get_console_output_unchanged TextOutput.get_console_output while chat.db is unchanged since the previous run
+
+The results are printed and saved as JSON (in resources/data/benchmarks by default) for comparison over time:
+
+    python resources/scripts/benchmark_text_output.py
+    python resources/scripts/benchmark_text_output.py --sizes 1000 100000 --previews
+
+Notifications are never sent, and attachment previews are skipped unless --previews is passed.
+
+"""
+import argparse
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_text_fixtures import FIXTURE_FORMAT_VERSION, generate_fixtures, load_manifest  # noqa: E402
+from message_notifier import contacts, database, utils  # noqa: E402
+from message_notifier.power import MEDIA_PREVIEWS_DEFERRED  # noqa: E402
+from message_notifier.text import TextOutput  # noqa: E402
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_FIXTURES_DIR = Path(tempfile.gettempdir()) / "message_notifier_text_fixtures"
+DEFAULT_RESULTS_DIR = PROJECT_ROOT / "resources" / "data" / "benchmarks"
+
+
+class TextOutputBenchmark(object):
+
+    def __init__(self, fixture_manifest: Dict, project_root: Path):
+        self.project_root = project_root
+        self.credentials = {
+            "username": "benchmark",
+            "chat_db_path": fixture_manifest["chat_db_path"],
+            "address_book_dir": fixture_manifest["address_book_dir"],
+        }
+
+    def clear_state(self) -> None:
+        # removes everything the provider caches on disk and in the process between runs
+        shutil.rmtree(self.project_root / "resources" / "data", ignore_errors=True)
+        with contacts.CONTACT_LOOKUPS_LOCK:
+            contacts.CONTACT_LOOKUPS.clear()
+
+    def get_messages(self) -> TextOutput:
+        text_output = TextOutput(self.credentials, self.project_root)
+        text_output.chat_db = database.ReadOnlyDatabase(text_output.chat_db_path)
+        try:
+            # noinspection PyProtectedMember
+            text_output._get_messages()
+        finally:
+            text_output.chat_db.close()
+        return text_output
+
+    def get_console_output(self) -> TextOutput:
+        text_output = TextOutput(self.credentials, self.project_root)
+        text_output.get_console_output()
+        return text_output
+
+
+def time_scenario(scenario: Callable[[], TextOutput], repeat: int, setup: Callable[[], None] = None) -> Dict:
+    seconds = []
+    query_stats = {}
+    unread_count = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        database.reset_query_stats()
+
+        start = time.perf_counter()
+        text_output = scenario()
+        seconds.append(time.perf_counter() - start)
+
+        unread_count = text_output.unread_count
+        if text_output.standard_error:
+            raise RuntimeError(f"TextOutput returned errors: {text_output.standard_error}")
+        query_stats = {
+            stats.query_name: {"executions": stats.executions, "rows": stats.rows, "seconds": stats.seconds}
+            for stats in database.get_query_stats()
+        }
+
+    return {
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "max_seconds": max(seconds),
+        "seconds": seconds,
+        "unread_count": unread_count,
+        "query_stats": query_stats,
+    }
+
+
+def get_fixture_manifest(fixtures_dir: Path, message_count: int, arguments: argparse.Namespace) -> Dict:
+    fixture_dir = fixtures_dir / str(message_count)
+    fixture_parameters = {
+        "message_count": message_count,
+        "unread_fraction": arguments.unread_fraction,
+        "group_chat_count": arguments.group_chats,
+        "attachment_fraction": arguments.attachment_fraction,
+        "attributed_body_fraction": arguments.attributed_body_fraction,
+        "contact_count": arguments.contacts,
+        "unknown_sender_fraction": arguments.unknown_sender_fraction,
+        "address_book_source_count": arguments.address_book_sources,
+        "attachment_files": arguments.previews,
+        "seed": arguments.seed,
+    }
+
+    fixture_manifest = load_manifest(fixture_dir)
+    if (arguments.regenerate or fixture_manifest.get("format_version") != FIXTURE_FORMAT_VERSION
+            or fixture_manifest.get("parameters") != fixture_parameters):
+        print(f"Generating {message_count} message fixtures in {fixture_dir}...", file=sys.stderr)
+        fixture_manifest = generate_fixtures(fixture_dir, **fixture_parameters)
+    return fixture_manifest
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(PROJECT_ROOT), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> int:
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of messages")
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    argument_parser.add_argument("--previews", action="store_true", help="generate attachment previews")
+    argument_parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR)
+    argument_parser.add_argument("--regenerate", action="store_true", help="regenerate the fixtures even if unchanged")
+    argument_parser.add_argument("--output", type=Path, help="JSON results file (default: resources/data/benchmarks)")
+    argument_parser.add_argument("--unread-fraction", type=float, default=0.0005)
+    argument_parser.add_argument("--group-chats", type=int, default=50)
+    argument_parser.add_argument("--attachment-fraction", type=float, default=0.05)
+    argument_parser.add_argument("--attributed-body-fraction", type=float, default=0.3)
+    argument_parser.add_argument("--contacts", type=int, default=500)
+    argument_parser.add_argument("--unknown-sender-fraction", type=float, default=0.1)
+    argument_parser.add_argument("--address-book-sources", type=int, default=2)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    arguments = argument_parser.parse_args()
+
+    # the benchmark must never post notifications (which also only work on macOS)
+    utils.send_macos_notification = lambda *args, **kwargs: None
+    if not arguments.previews:
+        MEDIA_PREVIEWS_DEFERRED.set()
+
+    results = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": get_git_commit(),
+        "python_version": platform.python_version(),
+        "sqlite_version": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "repeat": arguments.repeat,
+        "previews": arguments.previews,
+        "sizes": {},
+    }  # type: Dict
+
+    print(f"{'messages':>10}{'unread':>8}  {'scenario':<30}{'min':>10}{'median':>10}{'max':>10}")
+    for message_count in arguments.sizes:
+        fixture_manifest = get_fixture_manifest(arguments.fixtures_dir, message_count, arguments)
+
+        with tempfile.TemporaryDirectory(prefix="message_notifier_benchmark_") as project_root:
+            benchmark = TextOutputBenchmark(fixture_manifest, Path(project_root))
+            scenario_results = {}  # type: Dict[str, Dict]
+            scenarios = [
+                ("get_messages_cold", benchmark.get_messages, benchmark.clear_state),
+                ("get_messages_warm", benchmark.get_messages, None),
+                ("get_console_output_cold", benchmark.get_console_output, benchmark.clear_state),
+                ("get_console_output_unchanged", benchmark.get_console_output, None),
+            ]
+            for scenario_name, scenario, setup in scenarios:
+                scenario_results[scenario_name] = time_scenario(scenario, arguments.repeat, setup)
+                print(
+                    f"{message_count:>10}{scenario_results[scenario_name]['unread_count']:>8}  {scenario_name:<30}"
+                    f"{scenario_results[scenario_name]['min_seconds'] * 1000:>8.1f}ms"
+                    f"{scenario_results[scenario_name]['median_seconds'] * 1000:>8.1f}ms"
+                    f"{scenario_results[scenario_name]['max_seconds'] * 1000:>8.1f}ms"
+                )
+
+        results["sizes"][str(message_count)] = {
+            "fixtures": fixture_manifest,
+            "scenarios": scenario_results,
+        }
+
+    output_path = arguments.output or (
+        DEFAULT_RESULTS_DIR / f"text_output_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Saved results to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+"""Fuzzes and benchmarks the attributedBody typedstream parser in message_notifier/typedstream.py.
+
+The corpus in resources/fixtures/typedstream contains attributedBody archives laid out the way Messages stores them,
+together with the text each one should decode to (in expected.json). The script checks that every archive decodes to
+its text, that randomly mutated and truncated archives never raise or write to stdout (which would corrupt the menu),
+and times the parser against the previous hex/split implementation:
+
+    python resources/scripts/benchmark_typedstream.py
+    python resources/scripts/benchmark_typedstream.py --write-corpus  # regenerate the corpus
+
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import struct
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from message_notifier.typedstream import decode_attributed_body  # noqa: E402
+
+CORPUS_DIR = PROJECT_ROOT / "resources" / "fixtures" / "typedstream"
+
+CORPUS_TEXTS = {
+    "short": "Hello",
+    "unicode": "Grüße aus Köln 👋🏽 — see you at 5?",
+    "class_names_in_text": "NSString NSNumber NSDictionary are in this text",
+    "long_int16_length": "Lorem ipsum dolor sit amet. " * 12,
+    "long_int32_length": "All work and no play makes Jack a dull boy. " * 1600,
+    "whitespace": "  line one\nline two\r\n",
+}
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ CORPUS • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+def encode_integer(value: int) -> bytes:
+    if -110 <= value <= 127:
+        return struct.pack("<b", value) if value < 0 else bytes([value])
+    elif -0x8000 <= value <= 0x7fff:
+        return b"\x81" + struct.pack("<h", value)
+    return b"\x82" + struct.pack("<i", value)
+
+
+def encode_unshared_string(value: bytes) -> bytes:
+    return encode_integer(len(value)) + value
+
+
+def encode_attributed_body(text: str, string_class_name: bytes = b"NSString") -> bytes:
+    # mirrors the archives Messages writes: an NSMutableAttributedString whose NSString is followed by one attribute run
+    # holding a dictionary with an NSNumber, using references (0x92 + index) for repeated classes and type encodings
+    text_bytes = text.encode("utf-8")
+    return b"".join([
+        b"\x04", encode_unshared_string(b"streamtyped"), encode_integer(1000),
+        b"\x84", encode_unshared_string(b"@"),  # shared string 0: "@"
+        b"\x84",  # object 0: the attributed string
+        b"\x84\x84", encode_unshared_string(b"NSMutableAttributedString"), b"\x00",  # class 1, shared string 1
+        b"\x84\x84", encode_unshared_string(b"NSAttributedString"), b"\x00",  # class 2, shared string 2
+        b"\x84\x84", encode_unshared_string(b"NSObject"), b"\x00",  # class 3, shared string 3
+        b"\x85",
+        b"\x92",  # "@"
+        b"\x84",  # object 4: the string
+        b"\x84\x84", encode_unshared_string(string_class_name), b"\x01", b"\x95",  # class 5 (superclass NSObject)
+        b"\x84", encode_unshared_string(b"+"),  # shared string 5: "+"
+        encode_unshared_string(text_bytes),
+        b"\x86",
+        b"\x84", encode_unshared_string(b"iI"), encode_integer(1), encode_integer(len(text)),
+        b"\x92",  # "@"
+        b"\x84",  # object 6: the attributes dictionary
+        b"\x84\x84", encode_unshared_string(b"NSDictionary"), b"\x00", b"\x95",  # class 7
+        b"\x84", encode_unshared_string(b"i"), encode_integer(1),
+        b"\x92", b"\x84\x97", b"\x97", encode_unshared_string(b"__kIMMessagePartAttributeName"), b"\x86",
+        b"\x92",  # "@"
+        b"\x84",  # the number
+        b"\x84\x84", encode_unshared_string(b"NSNumber"), b"\x00",
+        b"\x84\x84", encode_unshared_string(b"NSValue"), b"\x00", b"\x95",
+        b"\x84", encode_unshared_string(b"*"), b"\x84", encode_unshared_string(b"i"),
+        b"\x9a", encode_integer(0),
+        b"\x86",
+        b"\x86",
+        b"\x86",
+    ])
+
+
+def write_corpus() -> None:
+    CORPUS_DIR.mkdir(parents=True, exist_ok=True)
+    expected = {}
+    for corpus_name, text in CORPUS_TEXTS.items():
+        (CORPUS_DIR / f"{corpus_name}.typedstream").write_bytes(encode_attributed_body(text))
+        expected[corpus_name] = text.strip()
+
+    (CORPUS_DIR / "mutable_string.typedstream").write_bytes(encode_attributed_body("mutable", b"NSMutableString"))
+    expected["mutable_string"] = "mutable"
+
+    with open(CORPUS_DIR / "expected.json", "w") as expected_file:
+        json.dump(expected, expected_file, ensure_ascii=False, indent=2)
+    print(f"Wrote {len(expected)} archives to {CORPUS_DIR}")
+
+
+def load_corpus() -> Dict[str, bytes]:
+    return {
+        corpus_path.stem: corpus_path.read_bytes() for corpus_path in sorted(CORPUS_DIR.glob("*.typedstream"))
+    }
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ CHECKS • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+def legacy_decode_attributed_body(attributed_body_hex: str) -> Optional[str]:
+    # the previous implementation, which needed the SQL query to hex() the attributedBody column
+    try:
+        return (
+            bytes.fromhex(attributed_body_hex)
+            .decode("utf-8", errors="replace")
+            .split("NSNumber")[0]
+            .split("NSString")[1]
+            .split("NSDictionary")[0][6:-12]
+            .replace("�", "")
+            .strip()
+        )
+    except IndexError:
+        return None
+
+
+def check_corpus(corpus: Dict[str, bytes]) -> List[str]:
+    with open(CORPUS_DIR / "expected.json", "r") as expected_file:
+        expected = json.load(expected_file)
+
+    errors = []
+    for corpus_name, attributed_body in corpus.items():
+        decoded = decode_attributed_body(memoryview(attributed_body))
+        if decoded != expected[corpus_name]:
+            errors.append(f"{corpus_name}: expected {expected[corpus_name][:40]!r}, got {(decoded or '')[:40]!r}")
+    return errors
+
+
+def fuzz_corpus(corpus: Dict[str, bytes], iterations: int, seed: int) -> List[str]:
+    random_generator = random.Random(seed)
+    errors = []
+    for iteration in range(iterations):
+        corpus_name, attributed_body = random_generator.choice(sorted(corpus.items()))
+        mutated = bytearray(attributed_body)
+
+        mutation = random_generator.choice(["flip", "truncate", "insert", "tags"])
+        if mutation == "flip":
+            for _ in range(random_generator.randint(1, 8)):
+                mutated[random_generator.randrange(len(mutated))] ^= 1 << random_generator.randrange(8)
+        elif mutation == "truncate":
+            del mutated[random_generator.randrange(len(mutated)):]
+        elif mutation == "insert":
+            position = random_generator.randrange(len(mutated))
+            mutated[position:position] = bytes(random_generator.randrange(256) for _ in range(8))
+        else:
+            for _ in range(random_generator.randint(1, 4)):
+                mutated[random_generator.randrange(len(mutated))] = random_generator.choice(
+                    [0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x92, 0xff]
+                )
+
+        stdout = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(stdout):
+                decoded = decode_attributed_body(memoryview(bytes(mutated)))
+        except Exception as e:
+            errors.append(f"iteration {iteration} ({mutation} of {corpus_name}) raised {repr(e)}")
+            continue
+
+        if stdout.getvalue():
+            errors.append(f"iteration {iteration} ({mutation} of {corpus_name}) wrote to stdout")
+        if decoded is not None and not isinstance(decoded, str):
+            errors.append(f"iteration {iteration} ({mutation} of {corpus_name}) returned {type(decoded)}")
+    return errors
+
+
+def benchmark_corpus(corpus: Dict[str, bytes], repeat: int) -> None:
+    print(f"{'archive':<24}{'bytes':>10}{'typedstream':>16}{'legacy hex/split':>20}")
+    for corpus_name, attributed_body in corpus.items():
+        attributed_body_hex = attributed_body.hex().upper()
+        parser_seconds = min(timeit.repeat(
+            lambda: decode_attributed_body(memoryview(attributed_body)), number=repeat, repeat=3
+        )) / repeat
+        legacy_seconds = min(timeit.repeat(
+            lambda: legacy_decode_attributed_body(attributed_body_hex), number=repeat, repeat=3
+        )) / repeat
+        print(
+            f"{corpus_name:<24}{len(attributed_body):>10}{parser_seconds * 1e6:>14.1f}us{legacy_seconds * 1e6:>18.1f}us"
+        )
+
+
+def main() -> int:
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--write-corpus", action="store_true", help="regenerate the corpus and exit")
+    argument_parser.add_argument("--fuzz-iterations", type=int, default=20000)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--repeat", type=int, default=200)
+    arguments = argument_parser.parse_args()
+
+    if arguments.write_corpus:
+        write_corpus()
+        return 0
+
+    corpus = load_corpus()
+    errors = check_corpus(corpus)
+    errors.extend(fuzz_corpus(corpus, arguments.fuzz_iterations, arguments.seed))
+    benchmark_corpus(corpus, arguments.repeat)
+
+    for error in errors[:50]:
+        print(f"FAILED {error}")
+    if not errors:
+        print(f"Decoded {len(corpus)} archives and {arguments.fuzz_iterations} mutated archives without errors.")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
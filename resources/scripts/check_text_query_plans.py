@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""Checks the SQLite query plans of the iMessage/SMS queries against the chat.db fixture schema.
+
+Every query must reach the message, chat and chat_message_join tables through an index or primary key instead of
+scanning them, so that a refresh stays fast on a chat.db with hundreds of thousands of messages. Run it after changing
+any of the queries in message_notifier/text.py:
+
+    python resources/scripts/check_text_query_plans.py
+
+"""
+import sqlite3
+import sys
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from message_notifier.search import MessageSearchIndex  # noqa: E402
+from message_notifier.text import TextOutput  # noqa: E402
+
+CHAT_DB_SCHEMA_PATH = PROJECT_ROOT / "resources" / "fixtures" / "chat_db_schema.sql"
+
+# query name, query, parameters, plan details that must be present
+EXPECTED_QUERY_PLANS = [
+    (
+        "unread_messages",
+        TextOutput._sqlite_query_get_messages(),
+        (),
+        ["SEARCH message USING COVERING INDEX message_idx_is_read (is_read=? AND is_from_me=?)"]
+    ),
+    (
+        "new_unread_messages",
+        TextOutput._sqlite_query_get_messages(incremental=True),
+        (0,),
+        ["SEARCH message USING COVERING INDEX message_idx_is_read (is_read=? AND is_from_me=?)"]
+    ),
+    (
+        "unread_message_rowids",
+        TextOutput._sqlite_query_get_unread_message_rowids(),
+        ("[1, 2]",),
+        ["SEARCH message USING INTEGER PRIMARY KEY (rowid=?)"]
+    ),
+    (
+        "group_chat_last_message_dates",
+        TextOutput._sqlite_query_get_group_chat_last_message_dates(),
+        ('["chat1"]',),
+        ["SEARCH cht USING COVERING INDEX chat_idx_chat_identifier (chat_identifier=?)", "SEARCH cmj"]
+    ),
+    (
+        "group_chat_participants",
+        TextOutput._sqlite_query_get_group_chat_participants(),
+        ('["chat1"]', 10),
+        ["SEARCH cht USING COVERING INDEX chat_idx_chat_identifier (chat_identifier=?)", "SEARCH cmj"]
+    ),
+    (
+        "search_history_start",
+        MessageSearchIndex._sqlite_query_get_first_recent_message_rowid(),
+        (0,),
+        ["SEARCH message USING COVERING INDEX message_idx_date (date>?)"]
+    ),
+    (
+        "search_index_batch",
+        MessageSearchIndex._sqlite_query_get_messages_after(),
+        (0, 10),
+        ["SEARCH msg USING INTEGER PRIMARY KEY (rowid>?)", "SEARCH cmj"]
+    ),
+]  # type: List[Tuple[str, str, Sequence, List[str]]]
+
+# full scans of these tables grow with the size of the whole message history
+UNEXPECTED_PLAN_DETAILS = ["SCAN message", "SCAN msg", "SCAN chat ", "SCAN cht", "SCAN chat_message_join", "SCAN cmj"]
+
+
+def get_query_plan(connection: sqlite3.Connection, query: str, parameters: Sequence) -> List[str]:
+    return [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", parameters).fetchall()]
+
+
+def check_unread_messages_rows(connection: sqlite3.Connection) -> List[str]:
+    # a message with two attachments is returned once, with its first attachment and the number of attachments
+    connection.executescript("""
+        INSERT INTO handle (ROWID, id, service) VALUES (1, '+15555550100', 'iMessage');
+        INSERT INTO chat (ROWID, guid, chat_identifier) VALUES (1, 'iMessage;-;+15555550100', '+15555550100');
+        INSERT INTO message (ROWID, guid, text, handle_id, date, is_read, is_from_me, cache_has_attachments)
+        VALUES
+            (1, 'message-1', 'first', 1, 1, 0, 0, 1),
+            (2, 'message-2', 'read', 1, 2, 1, 0, 0),
+            (3, 'message-3', 'mine', 0, 3, 0, 1, 0);
+        INSERT INTO chat_message_join (chat_id, message_id, message_date) VALUES (1, 1, 1), (1, 2, 2), (1, 3, 3);
+        INSERT INTO attachment (ROWID, guid, filename, mime_type)
+        VALUES (1, 'attachment-1', '~/a.jpeg', 'image/jpeg'), (2, 'attachment-2', '~/b.png', 'image/png');
+        INSERT INTO message_attachment_join (message_id, attachment_id) VALUES (1, 1), (1, 2);
+    """)
+    rows = connection.execute(TextOutput._sqlite_query_get_messages()).fetchall()
+
+    errors = []
+    if [row[0] for row in rows] != ["message-1"]:
+        errors.append(f"unread_messages: expected only message-1, got {[row[0] for row in rows]}")
+    elif rows[0][9] != "image/jpeg" or rows[0][-1] != 2:
+        errors.append(f"unread_messages: expected first attachment image/jpeg of 2, got {rows[0][9]} of {rows[0][-1]}")
+    return errors
+
+
+def main() -> int:
+    connection = sqlite3.connect(":memory:")
+    with open(CHAT_DB_SCHEMA_PATH, "r") as chat_db_schema_file:
+        connection.executescript(chat_db_schema_file.read())
+
+    errors = []
+    for query_name, query, parameters, expected_plan_details in EXPECTED_QUERY_PLANS:
+        query_plan = get_query_plan(connection, query, parameters)
+        print(f"{query_name}:")
+        for plan_detail in query_plan:
+            print(f"    {plan_detail}")
+
+        for expected_plan_detail in expected_plan_details:
+            if not any(expected_plan_detail in plan_detail for plan_detail in query_plan):
+                errors.append(f"{query_name}: missing '{expected_plan_detail}'")
+        for unexpected_plan_detail in UNEXPECTED_PLAN_DETAILS:
+            if any(plan_detail.startswith(unexpected_plan_detail) for plan_detail in query_plan):
+                errors.append(f"{query_name}: unexpected '{unexpected_plan_detail}'")
+
+    errors.extend(check_unread_messages_rows(connection))
+
+    for error in errors:
+        print(f"FAILED {error}")
+    if not errors:
+        print("All query plans use the expected indexes.")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+
+"""Generates a synthetic Messages chat.db and AddressBook for running the iMessage/SMS provider outside of macOS.
+
+The databases are created from resources/fixtures/chat_db_schema.sql and resources/fixtures/address_book_schema.sql,
+so they have the same tables, columns and indexes as the real ones, and are filled with random (but reproducible for
+the same --seed) contacts, 1:1 and group chats, messages (some only stored as attributedBody typedstream archives, like
+on macOS Ventura and later) and attachments:
+
+    python resources/scripts/generate_text_fixtures.py /tmp/message_notifier_fixtures --messages 100000
+
+To run the plugin against them, add their paths to the "text" section of resources/credentials/private.json:
+
+    "chat_db_path": "/tmp/message_notifier_fixtures/chat.db",
+    "address_book_dir": "/tmp/message_notifier_fixtures/AddressBook"
+
+"""
+import argparse
+import json
+import math
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from benchmark_typedstream import encode_attributed_body  # noqa: E402
+from message_notifier.contacts import format_contact_name  # noqa: E402
+
+CHAT_DB_SCHEMA_PATH = PROJECT_ROOT / "resources" / "fixtures" / "chat_db_schema.sql"
+ADDRESS_BOOK_SCHEMA_PATH = PROJECT_ROOT / "resources" / "fixtures" / "address_book_schema.sql"
+MANIFEST_FILE_NAME = "fixtures.json"
+# increase whenever the same parameters generate different fixtures, so that existing fixtures are regenerated
+FIXTURE_FORMAT_VERSION = 2
+
+# chat.db message dates are nanoseconds since 2001-01-01 (the Apple epoch)
+APPLE_EPOCH_OFFSET_SECONDS = 978307200
+HISTORY_DAYS = 730
+INSERT_BATCH_SIZE = 50000
+
+FIRST_NAMES = [
+    "Ava", "Ben", "Chloé", "Dev", "Emma", "Finn", "Grace", "Hiro", "Isla", "Jonas", "Kai", "Lena", "Mateo", "Nora",
+    "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tariq", "Uma", "Viktor", "Wren", "Xin", "Yara", "Zoë",
+]
+LAST_NAMES = [
+    "Adler", "Brooks", "Castillo", "Dubois", "Eriksen", "Fischer", "García", "Hughes", "Ivanova", "Jensen", "Kowalski",
+    "Lindqvist", "Moreau", "Nakamura", "O'Brien", "Patel", "Rossi", "Schmidt", "Tanaka", "Walker",
+]
+ORGANIZATIONS = ["Dentist", "Pharmacy", "Bike Shop", "Veterinary Clinic", "Pizzeria", "Landlord", "Gym"]
+GROUP_CHAT_NAMES = ["Family", "Hiking crew", "Book club", "Roommates", "Soccer team", "Work friends", None, None]
+WORDS = [
+    "hey", "are", "you", "coming", "tonight", "dinner", "at", "7", "running", "late", "see", "you", "soon", "thanks",
+    "for", "the", "photos", "lunch", "tomorrow", "can't", "wait", "😂", "👍", "did", "get", "my", "message", "call",
+    "me", "when", "free", "sounds", "good", "on", "my", "way", "happy", "birthday", "🎉", "where", "should", "we",
+    "meet", "train", "delayed", "again", "love", "it", "what", "time", "works", "for", "everyone", "Grüße", "café",
+]
+# MIME type -> file extension of the generated attachments
+ATTACHMENT_TYPES = {
+    "image/jpeg": "jpeg", "image/png": "png", "image/heic": "heic", "image/gif": "gif", "video/quicktime": "mov",
+    "text/vcard": "vcf", "application/pdf": "pdf",
+}
+# MIME type -> image format of the attachment files written with --attachment-files
+SAMPLE_IMAGE_FORMATS = {"image/jpeg": "JPEG", "image/png": "PNG", "image/gif": "GIF"}
+# with --attachment-files, attachments only get the MIME types whose files can be written, so that every attachment
+# of an unread message exists on disk (HEIC, QuickTime and PDF files cannot be generated without extra tools)
+SAMPLE_ATTACHMENT_TYPES = {
+    mime_type: extension for mime_type, extension in ATTACHMENT_TYPES.items()
+    if mime_type in SAMPLE_IMAGE_FORMATS or mime_type == "text/vcard"
+}
+SAMPLE_IMAGE_SIZE = (1200, 900)
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ CONTACTS • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ •
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+class SyntheticContact(object):
+
+    def __init__(self, contact_num: int, random_generator: random.Random):
+        self.phone_number = f"+1555{contact_num:07d}"
+        self.email = f"contact{contact_num}@example.com" if random_generator.random() < 0.25 else None
+        if random_generator.random() < 0.1:
+            self.first_name, self.middle_name, self.last_name = None, None, None
+            self.organization = random_generator.choice(ORGANIZATIONS)
+        else:
+            self.first_name = random_generator.choice(FIRST_NAMES)
+            self.middle_name = random_generator.choice(FIRST_NAMES) if random_generator.random() < 0.1 else None
+            self.last_name = random_generator.choice(LAST_NAMES) if random_generator.random() < 0.9 else None
+            self.organization = None
+
+    def get_formatted_phone_number(self) -> str:
+        # the AddressBook keeps numbers the way they were typed in, which the contact lookup has to normalize
+        digits = self.phone_number[2:]
+        return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+
+
+def write_address_book(address_book_dir: Path, contacts: List[SyntheticContact], source_count: int) -> int:
+    # the contacts are spread over the local AddressBook database and one database per account in Sources
+    contact_db_paths = [address_book_dir / "AddressBook-v22.abcddb"]
+    for source_num in range(source_count):
+        source_id = str(uuid.UUID(int=source_num + 1)).upper()
+        contact_db_paths.append(address_book_dir / "Sources" / source_id / "AddressBook-v22.abcddb")
+
+    with open(ADDRESS_BOOK_SCHEMA_PATH, "r") as address_book_schema_file:
+        address_book_schema = address_book_schema_file.read()
+
+    for db_num, contact_db_path in enumerate(contact_db_paths):
+        contact_db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(contact_db_path))
+        connection.executescript(address_book_schema)
+        with connection:
+            source_contacts = contacts[db_num::len(contact_db_paths)]
+            connection.executemany(
+                "INSERT INTO ZABCDRECORD (Z_PK, Z_ENT, Z_OPT, ZFIRSTNAME, ZMIDDLENAME, ZLASTNAME, ZORGANIZATION) "
+                "VALUES (?, 22, 1, ?, ?, ?, ?)",
+                [
+                    (record_pk, contact.first_name, contact.middle_name, contact.last_name, contact.organization)
+                    for record_pk, contact in enumerate(source_contacts, start=1)
+                ]
+            )
+            connection.executemany(
+                "INSERT INTO ZABCDPHONENUMBER (Z_ENT, Z_OPT, ZISPRIMARY, ZOWNER, ZFULLNUMBER, ZLABEL) "
+                "VALUES (18, 1, 1, ?, ?, '_$!<Mobile>!$_')",
+                [
+                    (record_pk, contact.get_formatted_phone_number())
+                    for record_pk, contact in enumerate(source_contacts, start=1)
+                ]
+            )
+            connection.executemany(
+                "INSERT INTO ZABCDEMAILADDRESS (Z_ENT, Z_OPT, ZISPRIMARY, ZOWNER, ZADDRESS, ZADDRESSNORMALIZED) "
+                "VALUES (11, 1, 1, ?, ?, ?)",
+                [
+                    (record_pk, contact.email, contact.email.lower())
+                    for record_pk, contact in enumerate(source_contacts, start=1) if contact.email
+                ]
+            )
+        connection.close()
+    return len(contact_db_paths)
+
+
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ MESSAGES • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ •
+# ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~ • ~
+
+
+def write_sample_image(image_path: Path, image_format: str, seed: int) -> None:
+    # a detailed image (a section of the Mandelbrot set that differs per seed) so that it compresses like a photo
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    offset = (seed % 100) / 100
+    image = Image.effect_mandelbrot(SAMPLE_IMAGE_SIZE, (-2.0 + offset, -1.2, 1.0 + offset, 1.2), 64)
+    image.convert("RGB").save(image_path, format=image_format)
+
+
+def write_sample_vcard(vcard_path: Path, contact: SyntheticContact) -> None:
+    vcard_path.parent.mkdir(parents=True, exist_ok=True)
+    vcard_lines = ["BEGIN:VCARD", "VERSION:3.0"]
+    if contact.organization:
+        vcard_lines.extend([f"FN:{contact.organization}", f"ORG:{contact.organization};"])
+    else:
+        vcard_lines.extend([
+            f"N:{contact.last_name or ''};{contact.first_name};{contact.middle_name or ''};;",
+            f"FN:{format_contact_name(contact.first_name, contact.middle_name, contact.last_name)}",
+        ])
+    vcard_lines.append(f"TEL;type=CELL:{contact.get_formatted_phone_number()}")
+    if contact.email:
+        vcard_lines.append(f"EMAIL;type=INTERNET:{contact.email}")
+    vcard_lines.append("END:VCARD")
+    vcard_path.write_text("\r\n".join(vcard_lines) + "\r\n")
+
+
+def get_chat_db_date(timestamp: float) -> int:
+    return int((timestamp - APPLE_EPOCH_OFFSET_SECONDS) * 1000000000)
+
+
+def generate_fixtures(output_dir: Path, message_count: int = 1000, unread_fraction: float = 0.001,
+                      group_chat_count: int = 20, attachment_fraction: float = 0.05,
+                      attributed_body_fraction: float = 0.3, contact_count: int = 200,
+                      unknown_sender_fraction: float = 0.1, address_book_source_count: int = 1,
+                      attachment_files: bool = False, seed: int = 0) -> Dict:
+    """Writes chat.db, the AddressBook directory and a fixtures.json manifest to output_dir and returns the manifest."""
+    random_generator = random.Random(seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    chat_db_path = output_dir / "chat.db"
+    address_book_dir = output_dir / "AddressBook"
+    for db_file_path in [chat_db_path] + sorted(address_book_dir.glob("**/AddressBook-v22.abcddb*")):
+        db_file_path.unlink(missing_ok=True)
+
+    contacts = [SyntheticContact(contact_num, random_generator) for contact_num in range(contact_count)]
+    address_book_db_count = write_address_book(address_book_dir, contacts, address_book_source_count)
+
+    # handles: every contact's number (and some email addresses for iMessage) plus numbers that are not in the contacts
+    handles = [(contact.phone_number, "iMessage" if random_generator.random() < 0.8 else "SMS") for contact in contacts]
+    handles.extend((contact.email, "iMessage") for contact in contacts if contact.email)
+    handles.extend(
+        (f"+1555{contact_count + unknown_num:07d}", "SMS")
+        for unknown_num in range(max(int(contact_count * unknown_sender_fraction), 1))
+    )
+
+    # chats: one per handle plus group chats with 3 to 8 participants, as (guid, identifier, display name, group id,
+    # participant handle ROWIDs)
+    chats = [
+        (f"{service};-;{handle_id}", handle_id, None, str(uuid.UUID(int=random_generator.getrandbits(128))),
+         [handle_num])
+        for handle_num, (handle_id, service) in enumerate(handles, start=1)
+    ]
+    for group_chat_num in range(group_chat_count):
+        chat_identifier = f"chat{100000000000000000 + group_chat_num}"
+        participants = random_generator.sample(
+            range(1, len(handles) + 1), min(random_generator.randint(3, 8), len(handles))
+        )
+        chats.append((
+            f"iMessage;+;{chat_identifier}",
+            chat_identifier,
+            random_generator.choice(GROUP_CHAT_NAMES),
+            str(uuid.UUID(int=random_generator.getrandbits(128))).upper(),
+            participants
+        ))
+
+    connection = sqlite3.connect(str(chat_db_path))
+    with open(CHAT_DB_SCHEMA_PATH, "r") as chat_db_schema_file:
+        connection.executescript(chat_db_schema_file.read())
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO handle (ROWID, id, service, uncanonicalized_id) VALUES (?, ?, ?, ?)",
+            [
+                (handle_num, handle_id, service, handle_id)
+                for handle_num, (handle_id, service) in enumerate(handles, start=1)
+            ]
+        )
+        connection.executemany(
+            "INSERT INTO chat (ROWID, guid, style, state, chat_identifier, service_name, display_name, group_id) "
+            "VALUES (?, ?, ?, 3, ?, 'iMessage', ?, ?)",
+            [
+                (chat_num, guid, 43 if len(participants) > 1 else 45, chat_identifier, display_name, group_id)
+                for chat_num, (guid, chat_identifier, display_name, group_id, participants) in enumerate(chats, start=1)
+            ]
+        )
+        connection.executemany(
+            "INSERT INTO chat_handle_join (chat_id, handle_id) VALUES (?, ?)",
+            [
+                (chat_num, handle_num)
+                for chat_num, (_, _, _, _, participants) in enumerate(chats, start=1) for handle_num in participants
+            ]
+        )
+
+    now = time.time()
+    message_interval_seconds = HISTORY_DAYS * 86400 / max(message_count, 1)
+    attachment_types = SAMPLE_ATTACHMENT_TYPES if attachment_files else ATTACHMENT_TYPES
+
+    def generate_messages() -> Iterator[Tuple[Tuple, Tuple, List[Tuple]]]:
+        # yields (message row, chat_message_join row, attachment rows) in message ROWID order
+        group_chats = chats[len(handles):]
+        for message_num in range(1, message_count + 1):
+            if group_chats and random_generator.random() < 0.3:
+                chat_num = len(handles) + random_generator.randrange(len(group_chats)) + 1
+            else:
+                chat_num = random_generator.randrange(len(handles)) + 1
+            participants = chats[chat_num - 1][4]
+
+            date = get_chat_db_date(
+                now - (message_count - message_num + random_generator.random()) * message_interval_seconds
+            )
+            is_from_me = int(random_generator.random() < 0.4)
+            handle_id = 0 if is_from_me else random_generator.choice(participants)
+            text = " ".join(random_generator.choice(WORDS) for _ in range(random_generator.randint(1, 30)))
+            attributed_body = encode_attributed_body(text)
+            if random_generator.random() < attributed_body_fraction:
+                text = None
+
+            attachment_rows = []
+            if random_generator.random() < attachment_fraction:
+                for attachment_num in range(1 if random_generator.random() < 0.9 else random_generator.randint(2, 4)):
+                    mime_type = random_generator.choice(list(attachment_types.keys()))
+                    attachment_guid = str(uuid.UUID(int=random_generator.getrandbits(128))).upper()
+                    attachment_rows.append((
+                        attachment_guid,
+                        date,
+                        str(output_dir / "Attachments" / attachment_guid[:2] / attachment_guid /
+                            f"IMG_{message_num:07d}_{attachment_num}.{attachment_types[mime_type]}"),
+                        mime_type,
+                    ))
+
+            message_row = (
+                message_num, str(uuid.UUID(int=random_generator.getrandbits(128))).upper(), text, handle_id,
+                "iMessage", date, is_from_me, int(bool(attachment_rows)), attributed_body
+            )
+            yield message_row, (chat_num, message_num, date), attachment_rows
+
+    attachment_num = 0
+    message_batch, chat_message_join_batch, attachment_batch, message_attachment_join_batch = [], [], [], []
+
+    def insert_batches() -> None:
+        connection.executemany(
+            "INSERT INTO message (ROWID, guid, text, handle_id, service, date, is_read, is_from_me, "
+            "cache_has_attachments, attributedBody) VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?)",
+            message_batch
+        )
+        connection.executemany(
+            "INSERT INTO chat_message_join (chat_id, message_id, message_date) VALUES (?, ?, ?)",
+            chat_message_join_batch
+        )
+        connection.executemany(
+            "INSERT INTO attachment (ROWID, guid, created_date, filename, mime_type) VALUES (?, ?, ?, ?, ?)",
+            attachment_batch
+        )
+        connection.executemany(
+            "INSERT INTO message_attachment_join (message_id, attachment_id) VALUES (?, ?)",
+            message_attachment_join_batch
+        )
+        for batch in (message_batch, chat_message_join_batch, attachment_batch, message_attachment_join_batch):
+            batch.clear()
+
+    with connection:
+        for message_row, chat_message_join_row, attachment_rows in generate_messages():
+            message_batch.append(message_row)
+            chat_message_join_batch.append(chat_message_join_row)
+            for attachment_row in attachment_rows:
+                attachment_num += 1
+                attachment_batch.append((attachment_num,) + attachment_row)
+                message_attachment_join_batch.append((message_row[0], attachment_num))
+            if len(message_batch) >= INSERT_BATCH_SIZE:
+                insert_batches()
+        insert_batches()
+
+        # the most recent messages that were not sent by the user are the unread ones
+        connection.execute("""
+            UPDATE message
+            SET is_read = 0
+            WHERE ROWID IN (SELECT ROWID FROM message WHERE is_from_me = 0 ORDER BY ROWID DESC LIMIT ?)
+        """, (math.ceil(message_count * unread_fraction),))
+
+    unread_attachments = connection.execute("""
+        SELECT atc.filename, atc.mime_type
+        FROM message msg
+        INNER JOIN message_attachment_join maj
+            ON maj.message_id = msg.ROWID
+        INNER JOIN attachment atc
+            ON atc.ROWID = maj.attachment_id
+        WHERE msg.is_read = 0
+            AND msg.is_from_me = 0
+    """).fetchall()
+    actual_unread_count = connection.execute(
+        "SELECT count(*) FROM message WHERE is_read = 0 AND is_from_me = 0"
+    ).fetchone()[0]
+    connection.execute("ANALYZE")
+    connection.close()
+
+    # only the attachments of unread messages are ever read, so only their files are written (vCards are always read,
+    # even while attachment previews are skipped)
+    attachment_file_count = 0
+    for attachment_file_num, (attachment_path, mime_type) in enumerate(unread_attachments):
+        if mime_type == "text/vcard":
+            write_sample_vcard(Path(attachment_path), random_generator.choice(contacts))
+        elif attachment_files and mime_type in SAMPLE_IMAGE_FORMATS:
+            write_sample_image(Path(attachment_path), SAMPLE_IMAGE_FORMATS[mime_type], attachment_file_num)
+        else:
+            continue
+        attachment_file_count += 1
+
+    manifest = {
+        "format_version": FIXTURE_FORMAT_VERSION,
+        "parameters": {
+            "message_count": message_count,
+            "unread_fraction": unread_fraction,
+            "group_chat_count": group_chat_count,
+            "attachment_fraction": attachment_fraction,
+            "attributed_body_fraction": attributed_body_fraction,
+            "contact_count": contact_count,
+            "unknown_sender_fraction": unknown_sender_fraction,
+            "address_book_source_count": address_book_source_count,
+            "attachment_files": attachment_files,
+            "seed": seed,
+        },
+        "chat_db_path": str(chat_db_path),
+        "address_book_dir": str(address_book_dir),
+        "counts": {
+            "messages": message_count,
+            "unread_messages": actual_unread_count,
+            "handles": len(handles),
+            "chats": len(chats),
+            "attachments": attachment_num,
+            "unread_attachments": len(unread_attachments),
+            "attachment_files": attachment_file_count,
+            "address_book_dbs": address_book_db_count,
+        },
+        "generated_at": now,
+    }
+    with open(output_dir / MANIFEST_FILE_NAME, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def load_manifest(output_dir: Path) -> Dict:
+    try:
+        with open(output_dir / MANIFEST_FILE_NAME, "r") as manifest_file:
+            return json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def main() -> int:
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("output_dir", type=Path)
+    argument_parser.add_argument("--messages", type=int, default=1000)
+    argument_parser.add_argument("--unread-fraction", type=float, default=0.001)
+    argument_parser.add_argument("--group-chats", type=int, default=20)
+    argument_parser.add_argument("--attachment-fraction", type=float, default=0.05)
+    argument_parser.add_argument("--attributed-body-fraction", type=float, default=0.3,
+                                 help="fraction of messages whose text is only stored in attributedBody")
+    argument_parser.add_argument("--contacts", type=int, default=200)
+    argument_parser.add_argument("--unknown-sender-fraction", type=float, default=0.1,
+                                 help="number of senders that are not in the contacts, as a fraction of --contacts")
+    argument_parser.add_argument("--address-book-sources", type=int, default=1,
+                                 help="number of account databases in AddressBook/Sources")
+    argument_parser.add_argument("--attachment-files", action="store_true",
+                                 help="also write image files for the JPEG/PNG attachments of unread messages")
+    argument_parser.add_argument("--seed", type=int, default=0)
+    arguments = argument_parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = generate_fixtures(
+        arguments.output_dir,
+        message_count=arguments.messages,
+        unread_fraction=arguments.unread_fraction,
+        group_chat_count=arguments.group_chats,
+        attachment_fraction=arguments.attachment_fraction,
+        attributed_body_fraction=arguments.attributed_body_fraction,
+        contact_count=arguments.contacts,
+        unknown_sender_fraction=arguments.unknown_sender_fraction,
+        address_book_source_count=arguments.address_book_sources,
+        attachment_files=arguments.attachment_files,
+        seed=arguments.seed
+    )
+    print(json.dumps(manifest["counts"], indent=2))
+    print(f"Generated fixtures in {arguments.output_dir} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
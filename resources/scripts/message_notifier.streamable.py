@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Streamable version of plugins/message_notifier.1m.py: symlink this script into the SwiftBar plugin folder INSTEAD of
+# message_notifier.1m.py to keep a single long-running plugin process that only updates the menu when it changes.
+
+# <bitbar.title>Message Notifier (Streamable)</bitbar.title>
+# <bitbar.version>v1.0.0</bitbar.version>
+# <bitbar.author>Wren J. R.</bitbar.author>
+# <bitbar.author.github>uberfastman</bitbar.author.github>
+# <bitbar.desc>Display unread messages from iMessages/SMS, Reddit, and Telegram in the macOS menubar!</bitbar.desc>
+# <bitbar.image>https://github.com/uberfastman/macos-menubar-plugins/raw/develop/resources/images/message_notifier_icon.png</bitbar.image>
+# <bitbar.dependencies>python3,opencv-python,pandas,pillow,praw,prawcore,pymediainfo,pync,python-dateutil,telethon,vobject</bitbar.dependencies>
+# <bitbar.abouturl>https://github.com/uberfastman/macos-menubar-plugins</bitbar.abouturl>
+# <swiftbar.type>streamable</swiftbar.type>
+# <swiftbar.hideAbout>true</swiftbar.hideAbout>
+# <swiftbar.hideRunInTerminal>true</swiftbar.hideRunInTerminal>
+# <swiftbar.hideDisablePlugin>true</swiftbar.hideDisablePlugin>
+
+import sys
+from pathlib import Path
+
+# resolve the symlink from the SwiftBar plugin folder to make the message_notifier package at the project root importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from message_notifier.stream import stream  # noqa: E402
+
+if __name__ == "__main__":
+    stream()
@@ -0,0 +1,4 @@
+#!/bin/sh
+
+# $1 is the Python interpreter running the plugin, the search runs from the project root so the package is importable
+cd "$(dirname "$0")/../.." && exec "$1" -m message_notifier.search --dialog